@@ -0,0 +1,124 @@
+"""
+Allele and copy-number frequencies of one locus across a cohort.
+
+Each worker reads the locus from its files (region_alleles) and returns the
+allele sequence and copy number of every called haplotype. The parent interns
+the sequences to integer codes and counts them with numpy, so aggregating a
+large cohort is a few array operations. Counts are cached per (cohort content
+key, region); rare and novel alleles relative to the sample being viewed are
+derived from the cached counts per request.
+"""
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from proletract.backend.cohort_manifest import is_multi_sample
+from proletract.backend.handles import variant_files
+from proletract.backend.region_index import _to_float_list
+
+# alleles below this cohort frequency are reported as rare
+RARE_ALLELE_FREQUENCY = 0.01
+# loci kept in the frequency cache, can be overridden with PROLETRACT_FREQUENCY_CACHE_SIZE
+FREQUENCY_CACHE_SIZE = int(os.environ.get("PROLETRACT_FREQUENCY_CACHE_SIZE", "1024"))
+
+# (allele sequence, copy number or NaN) per called haplotype of one file
+HaplotypeCalls = List[Tuple[str, float]]
+
+
+def _sample_calls(sample, alleles) -> HaplotypeCalls:
+    gt = sample.get('GT') or ()
+    try:
+        cns = _to_float_list(sample.get('CN'))
+    except (TypeError, ValueError):
+        cns = []
+    calls = []
+    for i, a in enumerate(gt):
+        if a is None or a >= len(alleles) or alleles[a] in ('.', '*'):
+            continue
+        cn = cns[i] if i < len(cns) else (cns[0] if cns else float('nan'))
+        calls.append((alleles[a], cn))
+    return calls
+
+
+def file_samples(info: Dict[str, Any]) -> List[str]:
+    """
+    Sample of each call set region_alleles returns for one manifest entry: the header samples
+    of a joint-called file, the base sample of an h1/h2 haplotype file, else the file's sample
+    """
+    if is_multi_sample(info):
+        return list(info['samples'])
+    suffix = info.get('haplotype_suffix') or ''
+    if info.get('is_haplotype') and suffix[-1:] in ('1', '2') and info.get('base_sample_name'):
+        return [info['base_sample_name']]
+    return [info['sample_name']]
+
+
+def region_alleles(path: str, region: str) -> List[HaplotypeCalls]:
+    """
+    Called haplotypes of every sample of one file at the first record of region (one fetch, also
+    for multi-sample files); empty if the file has no record there (runs on a worker)
+    """
+    with variant_files.open(path) as vcf:
+        rec = next(vcf.fetch(region=region), None)
+        if rec is None:
+            return []
+        alleles = rec.alleles or ()
+        return [_sample_calls(sample, alleles) for sample in rec.samples.values()]
+
+
+def _counts(values: np.ndarray, labels: List[Any], total: int, key: str) -> List[Dict[str, Any]]:
+    out = []
+    for label, count in zip(labels, values):
+        frequency = float(count) / total if total else 0.0
+        out.append({key: label, 'count': int(count), 'frequency': round(frequency, 6),
+                    'percentage': round(frequency * 100, 4)})
+    return out
+
+
+def locus_frequencies(per_sample: Iterable[Tuple[str, Optional[HaplotypeCalls]]]) -> Dict[str, Any]:
+    """
+    Allele and CN counts over every call set's haplotype calls, most frequent first. per_sample
+    pairs each call set with its sample, so the two haplotype files of a sample count as one sample.
+    """
+    codes: Dict[str, int] = {}
+    allele_codes: List[int] = []
+    cns: List[float] = []
+    samples = set()
+    for sample, calls in per_sample:
+        if not calls:
+            continue
+        samples.add(sample)
+        for allele, cn in calls:
+            allele_codes.append(codes.setdefault(allele, len(codes)))
+            cns.append(cn)
+
+    sequences = list(codes)
+    counts = np.bincount(np.asarray(allele_codes, dtype=np.int64), minlength=len(sequences))
+    order = np.lexsort((np.arange(len(counts)), -counts))
+    haplotypes = len(allele_codes)
+    allele_frequencies = _counts(counts[order], [sequences[i] for i in order], haplotypes, 'allele')
+    for entry in allele_frequencies:
+        entry['length'] = len(entry['allele'])
+
+    cns = np.asarray(cns, dtype=np.float64)
+    cns = cns[~np.isnan(cns)]
+    cn_values, cn_counts = np.unique(cns, return_counts=True)
+    cn_frequencies = _counts(cn_counts, [round(float(v), 2) for v in cn_values], len(cns), 'cn')
+
+    return {
+        'total_samples': len(samples),
+        'total_haplotypes': haplotypes,
+        'allele_frequencies': allele_frequencies,
+        'cn_frequencies': cn_frequencies,
+    }
+
+
+def flag_alleles(frequencies: Dict[str, Any], sample_alleles: List[str],
+                 rare_threshold: float = RARE_ALLELE_FREQUENCY) -> Tuple[List[str], List[str]]:
+    """(cohort alleles below rare_threshold, alleles of the sample not seen in the cohort)"""
+    rare = [entry['allele'] for entry in frequencies['allele_frequencies'] if entry['frequency'] < rare_threshold]
+    seen = {entry['allele'] for entry in frequencies['allele_frequencies']}
+    novel = [allele for allele in dict.fromkeys(sample_alleles) if allele and allele not in seen]
+    return rare, novel
+
@@ -0,0 +1,246 @@
+"""
+Persistent per-folder manifest of a cohort's VCF files.
+
+For each file it records the sample name(s) (and haplotype suffix), path,
+size/mtime of the file and its .tbi/.csi index, the contigs that have
+records, and the record count once a full pass over the file has counted
+them. Reopening a cohort stats the files and only re-reads the headers of
+new or changed ones; everything else comes from the manifest.
+Cohort endpoints pair the haplotype files of one sample (sample_h1,
+sample_h2) with pair_haplotype_files() to read them as one diploid sample.
+
+The manifest is a small JSON file stored like the sidecar indexes: in
+PROLETRACT_CACHE_DIR when it is set, otherwise next to the VCFs
+(``.proletract-cohort.json``), falling back to ~/.cache/proletract for
+read-only folders. Other per-cohort files (the region union, see
+cohort_regions.py) are stored the same way and described in the manifest.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from proletract.backend.sidecar import _cache_dir
+
+MANIFEST_VERSION = 2
+COHORT_FILE_PREFIX = '.proletract-cohort'
+
+# what is kept per file, besides the stat signature
+ENTRY_FIELDS = ('filename', 'path', 'sample_name', 'samples', 'base_sample_name', 'is_haplotype',
+                'haplotype_suffix', 'contigs', 'record_count')
+
+
+def is_vcf_name(name: str) -> bool:
+    return name.endswith('.vcf.gz') or name.endswith('.vcf')
+
+
+def file_signature(path: str, size: Optional[int] = None, mtime_ns: Optional[int] = None) -> List[Optional[int]]:
+    """[size, mtime_ns, index size, index mtime_ns] (index parts None when there's no index)"""
+    if size is None or mtime_ns is None:
+        st = os.stat(path)
+        size, mtime_ns = st.st_size, st.st_mtime_ns
+    for ext in ('.csi', '.tbi'):
+        try:
+            ist = os.stat(path + ext)
+        except OSError:
+            continue
+        return [size, mtime_ns, ist.st_size, ist.st_mtime_ns]
+    return [size, mtime_ns, None, None]
+
+
+def is_multi_sample(info: Dict[str, Any]) -> bool:
+    return len(info.get('samples') or ()) > 1
+
+
+def _multi_sample_entries(info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'sample_name': name, 'paths': [info['path']], 'paired': False, 'multi_sample': True}
+            for name in info['samples']]
+
+
+def sample_files(samples: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    One {'sample_name', 'paths': [path], 'multi_sample'} per sample from manifest entries (or
+    sample info): every header sample of a multi-sample (joint-called) file, else the file's sample.
+    """
+    out = []
+    for info in samples:
+        if is_multi_sample(info):
+            out.extend(_multi_sample_entries(info))
+        else:
+            out.append({'sample_name': info['sample_name'], 'paths': [info['path']], 'paired': False,
+                        'multi_sample': False})
+    return out
+
+
+def pair_haplotype_files(samples: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Like sample_files(), but haplotype files are grouped by base_sample_name into
+    {'sample_name': base, 'paths': [h1 path or None, h2 path or None], 'paired': True}.
+    Sorted by sample name.
+    """
+    pairs: Dict[str, Dict[str, Any]] = {}
+    singles = []
+    for info in samples:
+        if is_multi_sample(info):
+            singles.extend(_multi_sample_entries(info))
+            continue
+        suffix = info.get('haplotype_suffix') or ''
+        if info.get('is_haplotype') and suffix[-1:] in ('1', '2'):
+            pair = pairs.setdefault(info['base_sample_name'],
+                                    {'sample_name': info['base_sample_name'], 'paths': [None, None], 'paired': True,
+                                     'multi_sample': False})
+            slot = int(suffix[-1]) - 1
+            # two files for the same haplotype (sample_h1 and sample_hap1): keep the first
+            if pair['paths'][slot] is None:
+                pair['paths'][slot] = info['path']
+                continue
+        singles.append({'sample_name': info['sample_name'], 'paths': [info['path']], 'paired': False,
+                        'multi_sample': False})
+    return sorted([*pairs.values(), *singles], key=lambda entry: entry['sample_name'])
+
+
+def cohort_file_candidates(folder: str, suffix: str) -> List[Path]:
+    """Places a per-cohort file may live, same preference order as the sidecar indexes"""
+    path = Path(folder).resolve()
+    digest = hashlib.sha1(str(path).encode()).hexdigest()[:16]
+    in_cache = _cache_dir() / f"{path.name}.{digest}.cohort{suffix}"
+    in_folder = path / f"{COHORT_FILE_PREFIX}{suffix}"
+    if os.environ.get("PROLETRACT_CACHE_DIR"):
+        return [in_cache, in_folder]
+    return [in_folder, in_cache]
+
+
+def manifest_candidates(folder: str) -> List[Path]:
+    return cohort_file_candidates(folder, '.json')
+
+
+def write_first_writable(candidates: List[Path], write: Callable[[BinaryIO], None]) -> Optional[Path]:
+    """write(f) into a temp file at the first writable candidate and rename it into place"""
+    for target in candidates:
+        tmp_path = None
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=target.name, suffix='.tmp', dir=str(target.parent))
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+            return target
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            continue
+    return None
+
+
+class CohortManifest:
+    """filename -> entry for the VCFs of one folder, kept in sync with the disk by refresh()"""
+
+    def __init__(self, folder: str, entries: Optional[Dict[str, Dict[str, Any]]] = None,
+                 extras: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.folder = str(folder)
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+        # name -> description of other per-cohort files (e.g. 'regions', see cohort_regions.py)
+        self.extras: Dict[str, Dict[str, Any]] = extras or {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, folder: str) -> 'CohortManifest':
+        """Manifest from disk, or an empty one if there is none (or it is for another folder/version)"""
+        resolved = str(Path(folder).resolve())
+        for candidate in manifest_candidates(folder):
+            try:
+                with open(candidate) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data.get('version') == MANIFEST_VERSION and data.get('folder') == resolved:
+                return cls(folder, data.get('files') or {}, data.get('extras') or {})
+        return cls(folder)
+
+    def save(self) -> Optional[Path]:
+        """Write to the first writable location if anything changed, returns the path written"""
+        with self._lock:
+            if not self._dirty:
+                return None
+            payload = json.dumps({
+                'version': MANIFEST_VERSION,
+                'folder': str(Path(self.folder).resolve()),
+                'files': self.entries,
+                'extras': self.extras,
+            }).encode()
+            self._dirty = False
+        target = write_first_writable(manifest_candidates(self.folder), lambda f: f.write(payload))
+        if target is None:
+            print(f"Warning: could not write a cohort manifest for {self.folder}")
+        return target
+
+    def refresh(self, read_headers: Callable[[List[str]], Iterable[Optional[Dict[str, Any]]]]) -> Tuple[int, int]:
+        """
+        Stat the folder's VCFs and bring the manifest up to date. read_headers(paths) is
+        called once with the new/changed files and yields their entries (None for files
+        that can't be read). Returns (files re-read, files dropped).
+        """
+        on_disk: Dict[str, List[Optional[int]]] = {}
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if is_vcf_name(entry.name) and entry.is_file():
+                    st = entry.stat()
+                    on_disk[entry.name] = file_signature(entry.path, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            stale = [name for name in on_disk
+                     if name not in self.entries or self.entries[name].get('signature') != on_disk[name]]
+            dropped = [name for name in self.entries if name not in on_disk]
+            for name in dropped:
+                del self.entries[name]
+            if dropped:
+                self._dirty = True
+
+        if stale:
+            paths = [str(Path(self.folder) / name) for name in stale]
+            fresh = {}
+            for entry in read_headers(paths):
+                if entry is not None:
+                    fresh[entry['filename']] = {k: entry.get(k) for k in ENTRY_FIELDS}
+            with self._lock:
+                for name in stale:
+                    self.entries.pop(name, None)
+                    if name in fresh:
+                        self.entries[name] = {**fresh[name], 'signature': on_disk[name]}
+                self._dirty = True
+        return len(stale), len(dropped)
+
+    def samples(self) -> List[Dict[str, Any]]:
+        """Entries sorted by filename, in the shape /api/population/load returns as sample_info"""
+        with self._lock:
+            return [{k: v for k, v in self.entries[name].items() if k != 'signature'}
+                    for name in sorted(self.entries)]
+
+    def set_record_count(self, path: str, record_count: int, signature: List[Optional[int]]):
+        """Remember a record count from a full pass over the file, if the file is still the one listed"""
+        name = os.path.basename(path)
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is not None and entry.get('signature') == signature and entry.get('record_count') != record_count:
+                entry['record_count'] = record_count
+                self._dirty = True
+
+    def content_key(self) -> str:
+        """Digest of the listed files and their signatures, changes whenever any file does"""
+        with self._lock:
+            listing = [[name, self.entries[name].get('signature')] for name in sorted(self.entries)]
+        return hashlib.sha1(json.dumps(listing).encode()).hexdigest()
+
+    def get_extra(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.extras.get(name)
+
+    def set_extra(self, name: str, value: Dict[str, Any]):
+        with self._lock:
+            self.extras[name] = value
+            self._dirty = True
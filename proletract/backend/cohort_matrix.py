@@ -0,0 +1,367 @@
+"""
+Memory-mapped locus x sample matrix of a cohort, for cross-sample queries
+(which samples are expanded here, what's the CN distribution) without
+opening every sample VCF at request time.
+
+The matrix is built by a "consolidate" job and stored in column chunks of up
+to MATRIX_CHUNK_SAMPLES samples. Each chunk has its own sorted locus keys
+(contig + start << 32 | stop, like cohort_regions.py) and one .npy file per
+value column, shaped (loci, samples) so a locus is one contiguous row:
+
+    cn_h1, cn_h2                  float32, NaN when missing
+    genotype                      int16 code into the cohort genotype table, -1 when missing
+    allele_len_h1, allele_len_h2  int32 bp, -1 when missing
+
+Values are taken per GT slot: a haplotype the call doesn't have (the second
+one of a single-haplotype file, a '.' allele) is missing, not a copy of h1.
+A joint-called file gives one column per header sample.
+
+Chunks only depend on their own files: adding samples builds new chunks,
+a changed or removed file rebuilds just the chunk it was in. The chunk list
+is kept in the cohort manifest (extras['matrix']).
+"""
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pysam
+
+from proletract.backend.cohort_manifest import (
+    CohortManifest, cohort_file_candidates, file_signature, is_multi_sample
+)
+from proletract.backend.cohort_regions import contig_sort_key
+from proletract.backend.region_index import genotype_string, parse_region
+
+# samples per chunk (the unit of incremental rebuilds)
+MATRIX_CHUNK_SAMPLES = 64
+MATRIX_SUFFIX = '.matrix'
+# bumped when the stored values change meaning, matrices of older versions are rebuilt
+MATRIX_VERSION = 3
+
+# column -> (dtype, missing value)
+MATRIX_COLUMNS: Dict[str, Tuple[str, Any]] = {
+    'cn_h1': ('float32', np.nan),
+    'cn_h2': ('float32', np.nan),
+    'genotype': ('int16', -1),
+    'allele_len_h1': ('int32', -1),
+    'allele_len_h2': ('int32', -1),
+}
+
+
+class SampleValues:
+    """One sample's values per locus: contig i covers keys/values[offsets[i]:offsets[i + 1]], keys sorted"""
+
+    def __init__(self, path: str, signature, contigs: List[str], offsets: np.ndarray, keys: np.ndarray,
+                 values: Dict[str, np.ndarray], genotypes: List[str], sample: Optional[str] = None):
+        self.path = path
+        self.signature = signature
+        # header sample of the column, None for a file without samples
+        self.sample = sample
+        self.contigs = contigs
+        self.offsets = offsets
+        self.keys = keys
+        self.values = values
+        # genotype codes in values['genotype'] index this file-local table
+        self.genotypes = genotypes
+
+
+def _slot_floats(value) -> List[float]:
+    """CN values by haplotype slot, NaN for missing ones (_to_float_list drops them, shifting the slots)"""
+    if value is None:
+        return []
+    if not isinstance(value, (tuple, list)):
+        value = str(value).split(',')
+    out = []
+    for v in value:
+        try:
+            out.append(float(v))
+        except (TypeError, ValueError):
+            out.append(float('nan'))
+    return out
+
+
+def call_values(rec, call) -> Tuple[float, float, str, int, int]:
+    """(cn_h1, cn_h2, genotype, allele_len_h1, allele_len_h2) of one sample's call, NaN / -1 for an absent haplotype"""
+    gt = call.get('GT') or ()
+    cns = _slot_floats(call.get('CN'))
+    alleles = rec.alleles or ()
+    cn, length = [float('nan')] * 2, [-1] * 2
+    for k in range(2):
+        allele = gt[k] if k < len(gt) else None
+        # without a GT the CN values are all there is to go by
+        called = allele is not None if gt else k < len(cns)
+        if called and k < len(cns):
+            cn[k] = cns[k]
+        if allele is not None and allele < len(alleles):
+            length[k] = len(alleles[allele])
+    return cn[0], cn[1], genotype_string(gt), length[0], length[1]
+
+
+def sample_values(path: str) -> List[SampleValues]:
+    """
+    Read every record of one VCF into SampleValues, one per header sample, so a joint-called
+    file gives a column for each of its samples from a single pass (runs on a worker)
+    """
+    signature = file_signature(path)
+    genotype_lookup: Dict[str, int] = {}
+    # contig -> (locus keys, per sample the (cn_h1, cn_h2, genotype code, len_h1, len_h2) of each key)
+    rows: Dict[str, Tuple[List[int], List[List[Tuple[float, float, int, int, int]]]]] = {}
+    vcf = pysam.VariantFile(path)
+    try:
+        samples: List[Optional[str]] = list(vcf.header.samples) or [None]
+        missing = (float('nan'), float('nan'), genotype_string(None), -1, -1)
+        for rec in vcf.fetch():
+            keys, per_sample = rows.setdefault(rec.chrom, ([], [[] for _ in samples]))
+            keys.append(rec.pos << 32 | rec.stop)
+            for j, column in enumerate(per_sample):
+                cn_h1, cn_h2, genotype, len_h1, len_h2 = call_values(rec, rec.samples[j]) if len(rec.samples) else missing
+                code = genotype_lookup.setdefault(genotype, len(genotype_lookup))
+                column.append((cn_h1, cn_h2, code, len_h1, len_h2))
+    finally:
+        vcf.close()
+
+    contigs = list(rows)
+    offsets = np.zeros(len(contigs) + 1, dtype=np.int64)
+    key_parts, firsts = [], []
+    for i, chrom in enumerate(contigs):
+        # sorted, first record wins when a locus appears twice
+        keys, first = np.unique(np.array(rows[chrom][0], dtype=np.uint64), return_index=True)
+        key_parts.append(keys)
+        firsts.append(first)
+        offsets[i + 1] = offsets[i] + len(keys)
+    keys = np.concatenate(key_parts) if key_parts else np.zeros(0, dtype=np.uint64)
+    genotypes = list(genotype_lookup)
+
+    out = []
+    for j, sample in enumerate(samples):
+        value_parts = {name: [] for name in MATRIX_COLUMNS}
+        for chrom, first in zip(contigs, firsts):
+            for name, column in zip(MATRIX_COLUMNS, zip(*rows[chrom][1][j])):
+                value_parts[name].append(np.asarray(column, dtype=MATRIX_COLUMNS[name][0])[first])
+        values = {name: np.concatenate(parts) if parts else np.zeros(0, dtype=MATRIX_COLUMNS[name][0])
+                  for name, parts in value_parts.items()}
+        out.append(SampleValues(path, signature, contigs, offsets, keys, values, genotypes, sample))
+    return out
+
+
+class MatrixChunk:
+    """One memory-mapped chunk: sorted locus keys per contig and a (loci, samples) array per column"""
+
+    def __init__(self, directory: str, meta: Dict[str, Any]):
+        self.meta = meta
+        self.id = meta['id']
+        self.files: List[str] = meta['files']
+        self.sample_names: List[str] = meta['sample_names']
+        self.contigs = {chrom: i for i, (chrom, _) in enumerate(meta['contigs'])}
+        self.offsets = np.zeros(len(meta['contigs']) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([count for _, count in meta['contigs']])
+        self.keys = np.load(os.path.join(directory, f"{self.id}.keys.npy"), mmap_mode='r')
+        self.columns = {name: np.load(os.path.join(directory, f"{self.id}.{name}.npy"), mmap_mode='r')
+                        for name in MATRIX_COLUMNS}
+
+    def row(self, chrom: str, key: int) -> Optional[int]:
+        i = self.contigs.get(chrom)
+        if i is None:
+            return None
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        j = lo + int(np.searchsorted(self.keys[lo:hi], np.uint64(key)))
+        return j if j < hi and int(self.keys[j]) == key else None
+
+
+def matrix_directory(folder: str) -> Optional[Path]:
+    """First candidate directory for the matrix files that we can write to"""
+    for candidate in cohort_file_candidates(folder, MATRIX_SUFFIX):
+        try:
+            candidate.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            continue
+        if os.access(candidate, os.W_OK):
+            return candidate
+    return None
+
+
+def write_chunk(directory: Path, samples: List[SampleValues], names: List[str],
+                genotypes: List[str]) -> Dict[str, Any]:
+    """Build one chunk from its samples' values; genotypes is the cohort table (new genotypes get appended)"""
+    chunk_id = f"chunk-{uuid.uuid4().hex[:12]}"
+    contigs = sorted({c for sample in samples for c in sample.contigs}, key=contig_sort_key)
+    contig_keys = []
+    for chrom in contigs:
+        runs = []
+        for sample in samples:
+            if chrom in sample.contigs:
+                i = sample.contigs.index(chrom)
+                runs.append(sample.keys[sample.offsets[i]:sample.offsets[i + 1]])
+        contig_keys.append(np.unique(np.concatenate(runs)))
+    offsets = np.zeros(len(contigs) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(k) for k in contig_keys])
+    keys = np.concatenate(contig_keys) if contig_keys else np.zeros(0, dtype=np.uint64)
+    np.save(directory / f"{chunk_id}.keys.npy", keys)
+
+    n_loci = len(keys)
+    lookup = {g: i for i, g in enumerate(genotypes)}
+    columns = {}
+    for name, (dtype, missing) in MATRIX_COLUMNS.items():
+        columns[name] = np.lib.format.open_memmap(directory / f"{chunk_id}.{name}.npy", mode='w+',
+                                                  dtype=dtype, shape=(n_loci, len(samples)))
+        columns[name][:] = missing
+    for j, sample in enumerate(samples):
+        remap = np.array([lookup.setdefault(g, len(lookup)) for g in sample.genotypes], dtype=np.int16)
+        for i, chrom in enumerate(sample.contigs):
+            c = contigs.index(chrom)
+            lo, hi = sample.offsets[i], sample.offsets[i + 1]
+            rows = offsets[c] + np.searchsorted(contig_keys[c], sample.keys[lo:hi])
+            for name in MATRIX_COLUMNS:
+                values = sample.values[name][lo:hi]
+                columns[name][rows, j] = remap[values] if name == 'genotype' else values
+    for column in columns.values():
+        column.flush()
+    genotypes[:] = sorted(lookup, key=lookup.get)
+
+    return {
+        'id': chunk_id,
+        # per column, so a joint-called file is listed once for each of its samples
+        'files': [os.path.basename(sample.path) for sample in samples],
+        'signatures': [sample.signature for sample in samples],
+        'sample_names': names,
+        'contigs': [[chrom, len(k)] for chrom, k in zip(contigs, contig_keys)],
+    }
+
+
+class CohortMatrix:
+    """All chunks of a cohort; samples are in chunk order"""
+
+    def __init__(self, meta: Dict[str, Any]):
+        self.meta = meta
+        self.directory = meta['dir']
+        self.genotypes: List[str] = meta['genotypes']
+        self.chunks = [MatrixChunk(self.directory, chunk) for chunk in meta['chunks']]
+        self.sample_names = [name for chunk in self.chunks for name in chunk.sample_names]
+        self.files = [f for chunk in self.chunks for f in chunk.files]
+        self.signatures = [s for chunk in meta['chunks'] for s in chunk['signatures']]
+
+    @classmethod
+    def from_manifest(cls, manifest: CohortManifest) -> Optional['CohortMatrix']:
+        meta = manifest.get_extra('matrix')
+        if not meta or not meta.get('chunks'):
+            return None
+        try:
+            return cls(meta)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def stale_files(self, manifest: CohortManifest) -> int:
+        """Files added, changed or removed since the matrix was built"""
+        current = {name: entry.get('signature') for name, entry in manifest.entries.items()}
+        built = dict(zip(self.files, self.signatures))
+        changed = sum(1 for name, sig in current.items() if built.get(name) != sig)
+        return changed + sum(1 for name in built if name not in current)
+
+    def locus(self, region: str) -> Optional[Dict[str, np.ndarray]]:
+        """Every column across all samples at one locus, plus 'present'; None for a bad region string"""
+        parsed = parse_region(region)
+        if parsed is None:
+            return None
+        chrom, start, stop = parsed
+        key = start << 32 | stop
+        out = {name: [] for name in MATRIX_COLUMNS}
+        for chunk in self.chunks:
+            row = chunk.row(chrom, key)
+            for name, (dtype, missing) in MATRIX_COLUMNS.items():
+                out[name].append(np.array(chunk.columns[name][row]) if row is not None
+                                 else np.full(len(chunk.sample_names), missing, dtype=dtype))
+        result = {name: np.concatenate(parts) if parts else np.zeros(0, dtype=MATRIX_COLUMNS[name][0])
+                  for name, parts in out.items()}
+        # every record has a genotype code (./. included), so this marks the samples that have the locus
+        result['present'] = result['genotype'] >= 0
+        return result
+
+
+def plan_chunks(manifest: CohortManifest, previous: Optional[Dict[str, Any]],
+                chunk_samples: int = MATRIX_CHUNK_SAMPLES) -> Tuple[List[Dict[str, Any]], List[List[str]], List[str]]:
+    """
+    (chunks to keep, groups of filenames to build, chunk ids to delete). A chunk is kept when all
+    its files are still there unchanged (and it was built by this MATRIX_VERSION); the other
+    files go into new chunks of up to chunk_samples samples (a joint-called file counts all of
+    its samples, and is never split across chunks).
+    """
+    current = {name: entry.get('signature') for name, entry in manifest.entries.items()}
+    same_version = (previous or {}).get('version') == MATRIX_VERSION
+    keep, drop = [], []
+    covered = set()
+    for chunk in (previous or {}).get('chunks', []):
+        if same_version and all(current.get(f) == s for f, s in zip(chunk['files'], chunk['signatures'])):
+            keep.append(chunk)
+            covered.update(chunk['files'])
+        else:
+            drop.append(chunk['id'])
+    pending = sorted(name for name in current if name not in covered)
+    groups: List[List[str]] = []
+    size = 0
+    for name in pending:
+        n = max(len(manifest.entries[name].get('samples') or ()), 1)
+        if not groups or size + n > chunk_samples:
+            groups.append([])
+            size = 0
+        groups[-1].append(name)
+        size += n
+    return keep, groups, drop
+
+
+def _column_name(entry: Dict[str, Any], values: SampleValues) -> str:
+    # header sample for joint-called files, else the file's sample name as listed everywhere else
+    return values.sample if is_multi_sample(entry) and values.sample is not None else entry['sample_name']
+
+
+def consolidate(manifest: CohortManifest,
+                read_values: Callable[[List[str]], Iterable[Optional[List[SampleValues]]]],
+                on_progress: Optional[Callable[..., None]] = None,
+                chunk_samples: int = MATRIX_CHUNK_SAMPLES) -> Dict[str, Any]:
+    """
+    Bring the cohort's matrix up to date with the manifest. read_values(paths) yields the
+    SampleValues of each file of one chunk (None for unreadable ones). Returns a summary.
+    """
+    previous = manifest.get_extra('matrix')
+    directory = matrix_directory(manifest.folder)
+    if directory is None:
+        raise OSError(f"no writable location for the cohort matrix of {manifest.folder}")
+    if previous and previous.get('dir') != str(directory):
+        previous = None
+    keep, groups, drop = plan_chunks(manifest, previous, chunk_samples)
+    genotypes = list(previous['genotypes']) if keep else []
+    total = sum(len(group) for group in groups)
+    done = 0
+    if on_progress is not None:
+        on_progress(units_done=0, units_total=total, chunks_kept=len(keep), chunks_total=len(keep) + len(groups))
+
+    built = []
+    for group in groups:
+        samples = [s for values in read_values([str(Path(manifest.folder) / name) for name in group])
+                   for s in values or ()]
+        # keep the chunk's samples in filename order (header order within a file)
+        samples.sort(key=lambda s: os.path.basename(s.path))
+        names = [_column_name(manifest.entries[os.path.basename(s.path)], s) for s in samples]
+        if samples:
+            built.append(write_chunk(directory, samples, names, genotypes))
+        done += len(group)
+        if on_progress is not None:
+            on_progress(units_done=done, units_total=total)
+
+    meta = {'version': MATRIX_VERSION, 'dir': str(directory), 'genotypes': genotypes, 'chunks': keep + built}
+    manifest.set_extra('matrix', meta)
+    manifest.save()
+    for chunk_id in drop:
+        for name in ['keys', *MATRIX_COLUMNS]:
+            try:
+                os.unlink(directory / f"{chunk_id}.{name}.npy")
+            except OSError:
+                pass
+    return {
+        'samples': sum(len(chunk['sample_names']) for chunk in meta['chunks']),
+        'chunks': len(meta['chunks']),
+        'chunks_built': len(built),
+        'chunks_kept': len(keep),
+        'chunks_dropped': len(drop),
+    }
@@ -0,0 +1,237 @@
+"""
+Union of the regions of every file in a cohort, for the region list and search.
+
+Each worker reduces one file to sorted unique uint64 keys per contig,
+key = start << 32 | stop, so ordering keys is ordering by (start, stop).
+The parent then merges the sorted runs contig by contig, one coordinate
+window at a time: for each window it slices every run with a binary search,
+merges the slices and appends the unique keys to the output file. Memory is
+bounded by one window across all files, not by the size of the union.
+
+Worker results are kept in memory up to MERGE_MEMORY_BYTES and spilled to
+temporary .npy files beyond that (the merge reads them memory-mapped). The
+merged union is written next to the cohort manifest and reused until a file
+of the cohort changes.
+"""
+import os
+import shutil
+import tempfile
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+import pysam
+
+from proletract.backend.cohort_manifest import CohortManifest, cohort_file_candidates, file_signature, write_first_writable
+
+# coordinate window merged at a time
+MERGE_WINDOW_BP = 1_000_000
+# worker results kept in memory before they are spilled to disk,
+# can be overridden with PROLETRACT_MERGE_MEMORY_MB
+MERGE_MEMORY_BYTES = int(os.environ.get("PROLETRACT_MERGE_MEMORY_MB", "256")) * 1024 * 1024
+REGIONS_SUFFIX = '.regions'
+
+_POS_MASK = np.uint64(0xFFFFFFFF)
+
+
+def contig_sort_key(chrom: str) -> Tuple[int, str]:
+    """chr1..chr22, chrX, chrY, chrM, then everything else (same order the region list always had)"""
+    name = chrom.replace('chr', '').replace('Chr', '').replace('CHR', '')
+    try:
+        return (int(name), chrom)
+    except ValueError:
+        return ({'X': 23, 'Y': 24, 'M': 25, 'MT': 25}.get(name.upper(), 999), chrom)
+
+
+def unpack(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(starts, stops) of packed keys"""
+    keys = np.asarray(keys, dtype=np.uint64)
+    return (keys >> np.uint64(32)).astype(np.int64), (keys & _POS_MASK).astype(np.int64)
+
+
+class FileKeys:
+    """Sorted unique region keys of one file, grouped by contig (contig i is keys[offsets[i]:offsets[i + 1]])"""
+
+    def __init__(self, path: str, contigs: List[str], offsets: np.ndarray, keys: np.ndarray,
+                 record_count: int, signature: Optional[List[Optional[int]]]):
+        self.path = path
+        self.contigs = contigs
+        self.offsets = offsets
+        self.keys = keys
+        self.record_count = record_count
+        self.signature = signature
+
+    def contig(self, chrom: str) -> np.ndarray:
+        try:
+            i = self.contigs.index(chrom)
+        except ValueError:
+            return self.keys[:0]
+        return self.keys[self.offsets[i]:self.offsets[i + 1]]
+
+    def spill(self, directory: str, n: int):
+        """Move the keys to a .npy file in directory and memory-map them back"""
+        target = os.path.join(directory, f"{n}.npy")
+        np.save(target, np.asarray(self.keys))
+        self.keys = np.load(target, mmap_mode='r')
+
+
+def file_region_keys(path: str) -> FileKeys:
+    """Read every record of one VCF and reduce it to FileKeys (runs on a worker)"""
+    signature = file_signature(path)
+    per_contig: Dict[str, array] = {}
+    record_count = 0
+    vcf = pysam.VariantFile(path)
+    try:
+        for rec in vcf.fetch():
+            keys = per_contig.get(rec.chrom)
+            if keys is None:
+                keys = per_contig[rec.chrom] = array('Q')
+            keys.append(rec.pos << 32 | rec.stop)
+            record_count += 1
+    finally:
+        vcf.close()
+    contigs = list(per_contig)
+    # files are coordinate sorted already, unique() also covers the ones that aren't
+    runs = [np.unique(np.frombuffer(per_contig[c], dtype=np.uint64)) for c in contigs]
+    offsets = np.zeros(len(runs) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(r) for r in runs])
+    keys = np.concatenate(runs) if runs else np.zeros(0, dtype=np.uint64)
+    return FileKeys(path, contigs, offsets, keys, record_count, signature)
+
+
+def merge_runs(runs: List[np.ndarray], out: BinaryIO, window_bp: int = MERGE_WINDOW_BP) -> int:
+    """Write the sorted union of sorted unique key runs to out, one start-coordinate window at a time"""
+    runs = [r for r in runs if len(r)]
+    if not runs:
+        return 0
+    first = min(int(r[0]) >> 32 for r in runs) // window_bp
+    last = max(int(r[-1]) >> 32 for r in runs) // window_bp
+    # keys below bounds[w] belong to windows up to w; ends[i, w] is where run i crosses bounds[w]
+    bounds = np.arange(first + 1, last + 2, dtype=np.uint64) * np.uint64(window_bp)
+    bounds = np.minimum(bounds, np.uint64(0xFFFFFFFF)) << np.uint64(32)
+    ends = np.empty((len(runs), len(bounds) + 1), dtype=np.int64)
+    for i, run in enumerate(runs):
+        ends[i, 0] = 0
+        ends[i, 1:] = np.searchsorted(run, bounds, side='left')
+        ends[i, -1] = len(run)
+    written = 0
+    for w in range(len(bounds)):
+        active = np.flatnonzero(ends[:, w + 1] > ends[:, w])
+        if not len(active):
+            continue
+        pieces = [runs[i][ends[i, w]:ends[i, w + 1]] for i in active]
+        merged = np.unique(np.concatenate(pieces)) if len(pieces) > 1 else np.asarray(pieces[0])
+        out.write(merged.astype(np.uint64, copy=False).tobytes())
+        written += len(merged)
+    return written
+
+
+class RegionUnion:
+    """Merged cohort regions: contigs in display order, each with its sorted unique keys"""
+
+    def __init__(self, contigs: List[str], offsets: np.ndarray, keys: np.ndarray, content_key: Optional[str] = None):
+        self.contigs = contigs
+        self.offsets = offsets
+        self.keys = keys
+        self.content_key = content_key
+
+    def __len__(self):
+        return int(self.offsets[-1]) if len(self.offsets) else 0
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(contig code, start, stop) per region, for RegionSearch"""
+        codes = np.repeat(np.arange(len(self.contigs), dtype=np.int16), np.diff(self.offsets))
+        starts, stops = unpack(self.keys)
+        return codes, starts.astype(np.int32), stops.astype(np.int32)
+
+    def regions(self) -> List[str]:
+        """'chrom:start-stop' strings in order"""
+        starts, stops = unpack(self.keys)
+        starts, stops = starts.tolist(), stops.tolist()
+        out = []
+        for i, chrom in enumerate(self.contigs):
+            lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+            out.extend(f"{chrom}:{a}-{b}" for a, b in zip(starts[lo:hi], stops[lo:hi]))
+        return out
+
+
+def build_union(folder: str, parts: List[FileKeys], content_key: str,
+                window_bp: int = MERGE_WINDOW_BP) -> Tuple[RegionUnion, Optional[Path]]:
+    """Merge per-file keys into the cohort's region file, returns the union and where it was written"""
+    contigs = sorted({c for part in parts for c in part.contigs}, key=contig_sort_key)
+    counts: List[int] = []
+
+    def write(f):
+        counts.clear()
+        for chrom in contigs:
+            counts.append(merge_runs([part.contig(chrom) for part in parts], f, window_bp))
+
+    target = write_first_writable(cohort_file_candidates(folder, REGIONS_SUFFIX), write)
+    offsets = np.zeros(len(contigs) + 1, dtype=np.int64)
+    if target is None:
+        # nowhere to persist it, merge into a temp file just for this process
+        print(f"Warning: could not write the region union for {folder}")
+        with tempfile.TemporaryFile() as f:
+            write(f)
+            f.seek(0)
+            keys = np.frombuffer(f.read(), dtype=np.uint64)
+    else:
+        keys = np.memmap(target, dtype=np.uint64, mode='r') if os.path.getsize(target) else np.zeros(0, dtype=np.uint64)
+    offsets[1:] = np.cumsum(counts)
+    return RegionUnion(contigs, offsets, keys, content_key), target
+
+
+def load_union(manifest: CohortManifest) -> Optional[RegionUnion]:
+    """The persisted union of the manifest's cohort, if it is still for the same files"""
+    meta = manifest.get_extra('regions')
+    if not meta or meta.get('content_key') != manifest.content_key():
+        return None
+    path = meta.get('path')
+    total = sum(count for _, count in meta['contigs'])
+    try:
+        if os.path.getsize(path) != total * 8:
+            return None
+        keys = np.memmap(path, dtype=np.uint64, mode='r') if total else np.zeros(0, dtype=np.uint64)
+    except (OSError, TypeError, ValueError):
+        return None
+    offsets = np.zeros(len(meta['contigs']) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([count for _, count in meta['contigs']])
+    return RegionUnion([chrom for chrom, _ in meta['contigs']], offsets, keys, meta['content_key'])
+
+
+def describe_union(union: RegionUnion, path: Path) -> Dict[str, object]:
+    """What goes in the manifest for a written union"""
+    counts = np.diff(union.offsets).tolist()
+    return {'path': str(path), 'content_key': union.content_key, 'contigs': [list(x) for x in zip(union.contigs, counts)]}
+
+
+class SpillingCollector:
+    """Holds FileKeys as they arrive, spilling their keys to a temp dir past max_bytes"""
+
+    def __init__(self, max_bytes: int = MERGE_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.parts: List[FileKeys] = []
+        self.in_memory = 0
+        self._spill_dir: Optional[str] = None
+
+    def add(self, part: FileKeys):
+        self.parts.append(part)
+        self.in_memory += part.keys.nbytes
+        if self.in_memory > self.max_bytes:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix='proletract-merge-')
+            for i, held in enumerate(self.parts):
+                if not isinstance(held.keys, np.memmap):
+                    held.spill(self._spill_dir, i)
+            self.in_memory = 0
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill_dir is not None
+
+    def close(self):
+        self.parts = []
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
@@ -0,0 +1,156 @@
+"""
+Pool of open pysam.VariantFile handles for single-record lookups.
+
+Opening a VariantFile parses the header and loads the .tbi/.csi index, which
+for region detail requests costs much more than the fetch itself. Handles are
+kept open per path and reused:
+
+- a handle is checked out by one caller at a time (pysam handles aren't thread-safe),
+  concurrent callers on the same file get extra handles
+- at most max_open handles stay open, least recently used ones are closed first
+- handles are dropped when the file or its index changes on disk (size/mtime)
+- a forked child (process pool worker) starts with an empty pool instead of
+  sharing the parent's file descriptors
+"""
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pysam
+
+# handles kept open per process, can be overridden with PROLETRACT_MAX_OPEN_VCFS
+MAX_OPEN_FILES = int(os.environ.get("PROLETRACT_MAX_OPEN_VCFS", "64"))
+
+_Signature = Tuple[Tuple[int, int], Optional[Tuple[int, int]]]
+
+
+def _file_signature(path: str) -> _Signature:
+    """(size, mtime) of the file and of its index, if it has one"""
+    st = os.stat(path)
+    index_sig = None
+    for ext in ('.csi', '.tbi'):
+        try:
+            ist = os.stat(path + ext)
+        except OSError:
+            continue
+        index_sig = (ist.st_size, ist.st_mtime_ns)
+        break
+    return (st.st_size, st.st_mtime_ns), index_sig
+
+
+class VariantFilePool:
+    """Thread-safe LRU pool of idle VariantFile handles keyed by path"""
+
+    def __init__(self, max_open: int = MAX_OPEN_FILES):
+        self.max_open = max_open
+        # path -> (signature, idle handles), least recently used path first
+        self._idle: 'OrderedDict[str, Tuple[_Signature, List[pysam.VariantFile]]]' = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # handles inherited from the parent share file offsets with it, forget them
+        # (and the lock, another thread may have held it at fork time)
+        self._idle = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _acquire(self, path: str) -> Tuple[pysam.VariantFile, _Signature]:
+        signature = _file_signature(path)
+        stale: List[pysam.VariantFile] = []
+        with self._lock:
+            entry = self._idle.get(path)
+            if entry is not None and entry[0] != signature:
+                # file was rewritten since these were opened
+                stale = entry[1]
+                self._idle_count -= len(stale)
+                del self._idle[path]
+                entry = None
+            if entry is not None and entry[1]:
+                handle = entry[1].pop()
+                self._idle_count -= 1
+                self._idle.move_to_end(path)
+                self.hits += 1
+            else:
+                handle = None
+                self.misses += 1
+        for old in stale:
+            old.close()
+        if handle is None:
+            handle = pysam.VariantFile(path)
+        return handle, signature
+
+    def _release(self, path: str, handle: pysam.VariantFile, signature: _Signature):
+        evicted: List[pysam.VariantFile] = []
+        with self._lock:
+            entry = self._idle.get(path)
+            if entry is not None and entry[0] != signature:
+                evicted.extend(entry[1])
+                self._idle_count -= len(entry[1])
+                entry = None
+            if entry is None:
+                entry = (signature, [])
+            entry[1].append(handle)
+            self._idle[path] = entry
+            self._idle.move_to_end(path)
+            self._idle_count += 1
+            # close least recently used handles until we're back under the limit
+            while self._idle_count > self.max_open:
+                lru_path, (_, lru_handles) = next(iter(self._idle.items()))
+                evicted.append(lru_handles.pop(0))
+                self._idle_count -= 1
+                if not lru_handles:
+                    del self._idle[lru_path]
+        for old in evicted:
+            old.close()
+
+    @contextmanager
+    def open(self, path: str) -> Iterator[pysam.VariantFile]:
+        """Check out a handle for path; it goes back to the pool when the block exits"""
+        path = str(path)
+        handle, signature = self._acquire(path)
+        try:
+            yield handle
+        except (ValueError, KeyError):
+            # bad region / missing field, the handle itself is fine
+            self._release(path, handle, signature)
+            raise
+        except BaseException:
+            # don't reuse a handle that failed halfway through something
+            handle.close()
+            raise
+        self._release(path, handle, signature)
+
+    def invalidate(self, path: Optional[str] = None):
+        """Close the idle handles of one file (or of all files)"""
+        with self._lock:
+            if path is None:
+                dropped = [h for _, handles in self._idle.values() for h in handles]
+                self._idle.clear()
+            else:
+                _, dropped = self._idle.pop(str(path), (None, []))
+            self._idle_count -= len(dropped)
+        for handle in dropped:
+            handle.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'open_files': len(self._idle),
+                'open_handles': self._idle_count,
+                'max_open': self.max_open,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+# shared pool for the backend (one per process)
+variant_files = VariantFilePool()
@@ -0,0 +1,115 @@
+"""
+Background jobs with progress reporting (VCF loads and other long scans).
+
+A job runs on a worker thread so the event loop keeps serving other
+requests; endpoints look it up by id to report progress.
+"""
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+
+class Job:
+    """One background task and its progress counters"""
+
+    def __init__(self, kind: str, target: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.target = target
+        self.status = "running"  # running | done | error
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def update(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+
+    def finish(self, result: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            self.status = "done"
+            self.result = result
+            self.finished_at = time.time()
+        self._done.set()
+
+    def fail(self, error: str):
+        with self._lock:
+            self.status = "error"
+            self.error = error
+            self.finished_at = time.time()
+        self._done.set()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def eta_seconds(self) -> Optional[float]:
+        """Linear estimate from the fraction done (units of work if the job has them, else bytes)"""
+        if self.finished:
+            return 0.0
+        done = self.progress.get("units_done")
+        total = self.progress.get("units_total")
+        if not done or not total:
+            done = self.progress.get("bytes_read")
+            total = self.progress.get("total_bytes")
+        if not done or not total:
+            return None
+        elapsed = time.time() - self.started_at
+        return max(0.0, elapsed * (total - done) / done)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            eta = self.eta_seconds()
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "target": self.target,
+                "status": self.status,
+                "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 2),
+                "eta_seconds": round(eta, 1) if eta is not None else None,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobRegistry:
+    """Thread-safe lookup of jobs by id, and of the running job per target"""
+
+    # finished jobs are kept around for a while so clients can still read the final status
+    KEEP_FINISHED_SECONDS = 3600
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, target: str) -> Job:
+        job = Job(kind, target)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def running(self, kind: str, target: str) -> Optional[Job]:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.target == target and not job.finished:
+                    return job
+        return None
+
+    def _prune(self):
+        cutoff = time.time() - self.KEEP_FINISHED_SECONDS
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
@@ -3,21 +3,62 @@ FastAPI backend for ProleTRact React application
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
 import pysam
 from pathlib import Path
 import uvicorn
 import re
-from concurrent.futures import ProcessPoolExecutor, as_completed
-import multiprocessing
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager
+from proletract.backend.region_index import (
+    PARALLEL_SCAN_MIN_BYTES, FilterKey, RegionIndex, filter_key, genotype_string, parse_region,
+    plan_scan_chunks, scan_vcf, scan_vcf_parallel
+)
+from proletract.backend.cohort_frequency import (
+    FREQUENCY_CACHE_SIZE, RARE_ALLELE_FREQUENCY, file_samples, flag_alleles, locus_frequencies,
+    region_alleles
+)
+from proletract.backend.cohort_manifest import CohortManifest, pair_haplotype_files, sample_files
+from proletract.backend.cohort_matrix import CohortMatrix, consolidate, sample_values
+from proletract.backend.cohort_regions import (
+    RegionUnion, SpillingCollector, build_union, describe_union, file_region_keys, load_union
+)
+from proletract.backend.handles import variant_files
+from proletract.backend.jobs import Job, JobRegistry
+from proletract.backend.record_cache import PREFETCH_NEIGHBOURS, RecordCache, fingerprint_key
+from proletract.backend.pathogenic_index import PathogenicIndex
+from proletract.backend.region_search import (
+    DEFAULT_RESULTS as DEFAULT_SEARCH_RESULTS, RegionSearch, clamp_limit
+)
+from proletract.backend.segments import segment_sequence
+from proletract.backend.sidecar import file_fingerprint, load_sidecar, write_sidecar
+from proletract.backend.workers import WorkerPool
 # pandas is only imported when we need it for the pathogenic catalog stuff
 
-# how many workers to use for processing cohorts
-# using all CPU cores since parsing VCF records is CPU intensive
-COHORT_WORKERS = multiprocessing.cpu_count()
+# worker processes for all the CPU-bound work (cohort parsing, parallel scans), as many as
+# PROLETRACT_WORKERS (or the number of CPUs). Per-file tasks always go to the same worker so
+# its open VCF handles get reused. Lives as long as the app, see lifespan()
+worker_pool = WorkerPool()
+# background VCF load jobs, scans run on these threads so the event loop stays free
+_load_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vcf-load")
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="region-prefetch")
 
-app = FastAPI(title="ProleTRact API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # fork the workers now, before the first cohort request needs them
+    worker_pool.start()
+    print(f"Started worker pool with {worker_pool.max_workers} workers")
+    yield
+    _prefetch_executor.shutdown(wait=False, cancel_futures=True)
+    _load_executor.shutdown(wait=False, cancel_futures=True)
+    worker_pool.shutdown()
+
+app = FastAPI(title="ProleTRact API", lifespan=lifespan)
 
 # CORS stuff so the react frontend can talk to us
 app.add_middleware(
@@ -29,245 +70,350 @@ app.add_middleware(
 )
 
 # in-memory cache (should probably use redis or a db in production but this works for now)
+# vcf_path -> RegionIndex (columnar per-record summary, see region_index.py)
 vcf_cache = {}
 # cache for cohort sample names
 cohort_sample_cache = {}
-# cache for cohort regions
+# cache for cohort regions: folder_path -> RegionUnion (see cohort_regions.py)
 cohort_regions_cache = {}
+# resolved folder -> CohortManifest (persistent per-file sample info, see cohort_manifest.py)
+cohort_manifests = {}
+# resolved folder -> CohortMatrix (consolidated locus x sample values, see cohort_matrix.py)
+cohort_matrix_cache = {}
+# search indexes for the region autocomplete, built on first search:
+# vcf_path -> (RegionIndex, RegionSearch), folder_path -> (RegionUnion, RegionSearch)
+vcf_search_cache = {}
+cohort_search_cache = {}
+load_jobs = JobRegistry()
+# parsed region records, keyed by file fingerprint + region (see record_cache.py)
+record_cache = RecordCache()
+# (cohort content key, region) -> allele/CN counts at the locus (see cohort_frequency.py)
+frequency_cache = RecordCache(FREQUENCY_CACHE_SIZE)
+# vcf_path -> FilterKey of the list the user last browsed, neighbours are prefetched in that order
+_active_filters = {}
+# file fingerprint key -> /api/vcf/statistics response
+_statistics_cache = {}
+STATISTICS_CACHE_SIZE = 16
+# quantiles reported for copy numbers and allele lengths
+STATISTICS_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+STATISTICS_QUANTILE_KEYS = tuple(f"p{int(round(q * 100))}" for q in STATISTICS_QUANTILES)
 
-def parse_record_assembly(vcf_file: str, region: str) -> Optional[Dict[str, Any]]:
+def parse_record_assembly(vcf_file: str, region: str, sample=0) -> Optional[Dict[str, Any]]:
     """
     Parse an assembly VCF record (single haplotype per file).
-    Used for population VCF files (h1/h2 files).
+    Used for population VCF files (h1/h2 files). sample is a header sample index or name.
     """
     try:
-        vcf = pysam.VariantFile(vcf_file)
-        record_iter = vcf.fetch(region=region)
-        rec = next(record_iter, None)
-        vcf.close()
-        
-        if rec is None:
-            return None
-        
-        # get motif ids for the ALT allele (this is a single haplotype file)
-        ids_h = rec.samples[0].get("MI", None)
-        if ids_h is None:
-            ids_h_list = []
-        elif isinstance(ids_h, (tuple, list)):
-            ids_h_list = [str(x) for x in ids_h if x]
-        else:
-            ids_h_list = str(ids_h).split("_") if ids_h else []
-        
-        # get motif ids for the REF allele
-        ids_ref = rec.info.get('MOTIF_IDs_REF', [])
-        if isinstance(ids_ref, (tuple, list)):
-            ids_ref = [str(x) for x in ids_ref if x]
-        elif ids_ref:
-            ids_ref = str(ids_ref).split("_")
-        else:
-            ids_ref = []
-        
-        # copy numbers for ref and alt alleles
-        ref_CN = rec.info.get('CN_ref', 0)
-        CN_H = rec.samples[0].get('CN', 0)
-        if isinstance(CN_H, (tuple, list)):
-            CN_H = CN_H[0] if len(CN_H) > 0 else 0
-        
-        # get motif names from INFO field
-        motif_names = rec.info.get('MOTIFS', [])
-        if isinstance(motif_names, tuple):
-            motif_names = list(motif_names)
-        elif not isinstance(motif_names, list):
-            motif_names = [motif_names] if motif_names else []
-        
-        alt_allele = rec.alts[0] if rec.alts and rec.alts[0] != '.' else ''
-        
-        # get the span of the motifs
-        spans = rec.samples[0].get('SP', "")
-        if spans is None:
-            spans = ""
-        
-        # get the genotype
-        gt = rec.samples[0].get('GT', (0,))
-        if isinstance(gt, (tuple, list)):
-            gt_str = str(gt[0]) if len(gt) > 0 else "0"
-        else:
-            gt_str = str(gt)
-        
-        record = {
-            'chr': rec.chrom,
-            'pos': rec.pos,
-            'stop': rec.stop,
-            'motifs': motif_names,
-            'motif_ids_h': ids_h_list,
-            'motif_ids_ref': ids_ref,
-            'ref_CN': ref_CN,
-            'CN_H': CN_H,
-            'spans': spans,
-            'ref_allele': rec.ref,
-            'alt_allele': alt_allele,
-            'gt': gt_str,
-            'id': rec.id,
-        }
-        return record
+        with variant_files.open(vcf_file) as vcf:
+            rec = next(vcf.fetch(region=region), None)
+            if rec is None:
+                return None
+            return _parse_assembly_record(rec, sample)
     except Exception as e:
         print(f"Error parsing assembly record: {e}")
         return None
 
-def parse_record(vcf_file: str, region: str) -> Optional[Dict[str, Any]]:
+def _parse_assembly_record(rec, sample=0) -> Dict[str, Any]:
+    """Turn one record of a single-haplotype (assembly) VCF into the response dict (sample: index or name)"""
+    call = rec.samples[sample]
+    # get motif ids for the ALT allele (this is a single haplotype file)
+    ids_h = call.get("MI", None)
+    if ids_h is None:
+        ids_h_list = []
+    elif isinstance(ids_h, (tuple, list)):
+        ids_h_list = [str(x) for x in ids_h if x]
+    else:
+        ids_h_list = str(ids_h).split("_") if ids_h else []
+
+    # get motif ids for the REF allele
+    ids_ref = rec.info.get('MOTIF_IDs_REF', [])
+    if isinstance(ids_ref, (tuple, list)):
+        ids_ref = [str(x) for x in ids_ref if x]
+    elif ids_ref:
+        ids_ref = str(ids_ref).split("_")
+    else:
+        ids_ref = []
+
+    # copy numbers for ref and alt alleles
+    ref_CN = rec.info.get('CN_ref', 0)
+    CN_H = call.get('CN', 0)
+    if isinstance(CN_H, (tuple, list)):
+        CN_H = CN_H[0] if len(CN_H) > 0 else 0
+
+    # get motif names from INFO field
+    motif_names = rec.info.get('MOTIFS', [])
+    if isinstance(motif_names, tuple):
+        motif_names = list(motif_names)
+    elif not isinstance(motif_names, list):
+        motif_names = [motif_names] if motif_names else []
+
+    alt_allele = rec.alts[0] if rec.alts and rec.alts[0] != '.' else ''
+
+    # get the span of the motifs
+    spans = call.get('SP', "")
+    if spans is None:
+        spans = ""
+
+    # get the genotype
+    gt = call.get('GT', (0,))
+    if isinstance(gt, (tuple, list)):
+        gt_str = str(gt[0]) if len(gt) > 0 else "0"
+    else:
+        gt_str = str(gt)
+
+    record = {
+        'chr': rec.chrom,
+        'pos': rec.pos,
+        'stop': rec.stop,
+        'motifs': motif_names,
+        'motif_ids_h': ids_h_list,
+        'motif_ids_ref': ids_ref,
+        'ref_CN': ref_CN,
+        'CN_H': CN_H,
+        'spans': spans,
+        'ref_allele': rec.ref,
+        'alt_allele': alt_allele,
+        'gt': gt_str,
+        'id': rec.id,
+        'segments': {'h': segment_sequence(alt_allele, spans, ids_h_list)},
+    }
+    return record
+
+def parse_record(vcf_file: str, region: str, sample=0) -> Optional[Dict[str, Any]]:
     """
     Parse a single VCF record for a specified region.
     Similar to parsers.parse_record in the original ProleTRact.
+    sample is a header sample index or name, for multi-sample VCFs.
     """
     try:
-        vcf = pysam.VariantFile(vcf_file)
-        record_iter = vcf.fetch(region=region)
-        rec = next(record_iter, None)
-        vcf.close()
-        
-        if rec is None:
-            return None
-        
-        # parse motif IDs for h1 and h2
-        mi = rec.samples[0].get('MI', None)
-        if mi is None:
-            ids_h1 = []
-            ids_h2 = []
-        elif isinstance(mi, tuple):
-            ids_h1 = mi[0].split("_") if mi[0] else []
-            ids_h2 = mi[1].split("_") if len(mi) > 1 and mi[1] else []
-        else:
-            ids_h1 = str(mi).split("_") if mi else []
-            ids_h2 = ids_h1.copy()
-        
-        # figure out which alleles each haplotype has using the GT field
-        ref_allele = rec.ref
-        gt = rec.samples[0].get('GT', (0, 0))
-        if not isinstance(gt, (tuple, list)):
-            gt = (0, 0)
-        
-        # get all alleles - ref is 0, alt[0] is 1, alt[1] is 2, etc
-        all_alleles = [ref_allele]
-        if rec.alts:
-            all_alleles.extend([alt for alt in rec.alts if alt != '.'])
-        
-        # figure out which allele each haplotype has from the GT
-        gt_h1 = gt[0] if len(gt) > 0 else 0
-        gt_h2 = gt[1] if len(gt) > 1 else gt_h1
-        
-        # get the actual sequences for each haplotype
-        alt_allele1 = all_alleles[gt_h1] if gt_h1 < len(all_alleles) else ref_allele
-        alt_allele2 = all_alleles[gt_h2] if gt_h2 < len(all_alleles) else ref_allele
-        
-        # Debug: Log sequence lengths for NA13509 sample
-        if 'NA13509' in str(vcf_file):
-            print(f"DEBUG NA13509: GT={gt}, all_alleles count={len(all_alleles)}")
-            print(f"DEBUG NA13509: alt_allele1 length={len(alt_allele1) if alt_allele1 else 0}, alt_allele2 length={len(alt_allele2) if alt_allele2 else 0}")
-            if len(all_alleles) > 1:
-                print(f"DEBUG NA13509: ALT[0] length={len(all_alleles[1]) if len(all_alleles) > 1 else 0}")
-            if len(all_alleles) > 2:
-                print(f"DEBUG NA13509: ALT[1] length={len(all_alleles[2]) if len(all_alleles) > 2 else 0}")
-        
-        # removed debug logging, it was too slow
-        
-        # even if both haplotypes have the same allele sequence, we still show both
-        # because they might have different motif IDs
-        
-        # copy numbers for h1 and h2
-        CNs = rec.samples[0].get('CN', (0, 0))
-        if isinstance(CNs, tuple):
-            CN_H1 = str(CNs[0]) if len(CNs) > 0 else None
-            CN_H2 = str(CNs[1]) if len(CNs) > 1 else None
-        else:
-            CN_H1 = str(CNs)
-            CN_H2 = str(CNs)
-        
-        # parse the span info
-        SP_field = rec.samples[0].get('SP', None)
-        if SP_field is None:
-            spans_h1 = ""
-            spans_h2 = ""
-        elif isinstance(SP_field, tuple):
-            spans_h1 = SP_field[0] if len(SP_field) > 0 and SP_field[0] is not None else ""
-            spans_h2 = SP_field[1] if len(SP_field) > 1 and SP_field[1] is not None else spans_h1
-        else:
-            spans_h1 = str(SP_field) if SP_field else ""
-            spans_h2 = spans_h1
-        
-        # replace None with empty string
-        ref_span = rec.info.get('REF_SPAN', None)
-        spans = [
-            str(ref_span) if ref_span is not None else "",
-            spans_h1 if spans_h1 else "",
-            spans_h2 if spans_h2 else ""
-        ]
-        
-        # get motif names from INFO field
-        motif_names = rec.info.get('MOTIFS', [])
-        if isinstance(motif_names, tuple):
-            motif_names = list(motif_names)
-        elif not isinstance(motif_names, list):
-            motif_names = [motif_names] if motif_names else []
-        
-        # get motif IDs for the ref allele
-        motif_ids_ref = rec.info.get('MOTIF_IDs_REF', "")
-        if motif_ids_ref:
-            if isinstance(motif_ids_ref, (tuple, list)):
-                motif_ids_ref = "_".join(str(x) for x in motif_ids_ref)
-            motif_ids_ref = str(motif_ids_ref).split("_")
-        else:
-            motif_ids_ref = []
-        
-        # make a genotype string (we already got gt above)
-        gt_str = '/'.join([str(i) for i in gt]) if isinstance(gt, (tuple, list)) else str(gt)
-        
-        # get supporting reads
-        supporting_reads = rec.samples[0].get('DP', None)
-        if supporting_reads is None:
-            supporting_reads_h1 = 0
-            supporting_reads_h2 = 0
-        elif isinstance(supporting_reads, tuple):
-            supporting_reads_h1 = supporting_reads[0] if len(supporting_reads) > 0 else 0
-            supporting_reads_h2 = supporting_reads[1] if len(supporting_reads) > 1 else supporting_reads_h1
-        else:
-            supporting_reads_h1 = int(supporting_reads) if supporting_reads else 0
-            supporting_reads_h2 = supporting_reads_h1
-        
-        # build the final record dict
-        record = {
-            'chr': rec.chrom,
-            'pos': rec.pos,
-            'stop': rec.stop,
-            'motifs': motif_names,
-            'motif_ids_h1': ids_h1,
-            'motif_ids_h2': ids_h2,
-            'motif_ids_ref': motif_ids_ref,
-            'ref_CN': rec.info.get('CN_ref', None),
-            'CN_H1': CN_H1,
-            'CN_H2': CN_H2,
-            'spans': spans,
-            'ref_allele': ref_allele,
-            'alt_allele1': alt_allele1,
-            'alt_allele2': alt_allele2,
-            'gt': gt_str,
-            'supported_reads_h1': supporting_reads_h1,
-            'supported_reads_h2': supporting_reads_h2,
-            'id': rec.id,
-        }
-        
-        # Debug: Verify sequences are not truncated for NA13509
-        if 'NA13509' in str(vcf_file):
-            print(f"DEBUG NA13509 record: alt_allele1 length={len(alt_allele1) if alt_allele1 else 0}, alt_allele2 length={len(alt_allele2) if alt_allele2 else 0}")
-            print(f"DEBUG NA13509 record: alt_allele1 preview={alt_allele1[:50] if alt_allele1 else 'None'}...")
-            print(f"DEBUG NA13509 record: alt_allele2 preview={alt_allele2[:50] if alt_allele2 else 'None'}...")
-        
-        return record
+        with variant_files.open(vcf_file) as vcf:
+            rec = next(vcf.fetch(region=region), None)
+            if rec is None:
+                return None
+            return _parse_diploid_record(rec, sample)
     except Exception as e:
         print(f"Error parsing record: {e}")
         return None
 
+def _called_allele(all_alleles: List[str], allele: Optional[int]) -> str:
+    """Sequence of one GT allele index; '' for a no-call, the ref for an index past the alts"""
+    if allele is None:
+        return ''
+    return all_alleles[allele] if allele < len(all_alleles) else all_alleles[0]
+
+def _parse_diploid_record(rec, sample=0) -> Dict[str, Any]:
+    """Turn one record of a diploid (read-based) VCF into the response dict (sample: index or name)"""
+    call = rec.samples[sample]
+    # parse motif IDs for h1 and h2
+    mi = call.get('MI', None)
+    if mi is None:
+        ids_h1 = []
+        ids_h2 = []
+    elif isinstance(mi, tuple):
+        ids_h1 = mi[0].split("_") if mi[0] else []
+        ids_h2 = mi[1].split("_") if len(mi) > 1 and mi[1] else []
+    else:
+        ids_h1 = str(mi).split("_") if mi else []
+        ids_h2 = ids_h1.copy()
+
+    # figure out which alleles each haplotype has using the GT field
+    ref_allele = rec.ref
+    gt = call.get('GT', (0, 0))
+    if not isinstance(gt, (tuple, list)):
+        gt = (0, 0)
+
+    # get all alleles - ref is 0, alt[0] is 1, alt[1] is 2, etc
+    all_alleles = [ref_allele]
+    if rec.alts:
+        all_alleles.extend([alt for alt in rec.alts if alt != '.'])
+
+    # figure out which allele each haplotype has from the GT
+    gt_h1 = gt[0] if len(gt) > 0 else 0
+    gt_h2 = gt[1] if len(gt) > 1 else gt_h1
+
+    # get the actual sequences for each haplotype (a no-call '.' has none)
+    alt_allele1 = _called_allele(all_alleles, gt_h1)
+    alt_allele2 = _called_allele(all_alleles, gt_h2)
+
+    # removed debug logging, it was too slow
+
+    # even if both haplotypes have the same allele sequence, we still show both
+    # because they might have different motif IDs
+
+    # copy numbers for h1 and h2
+    CNs = call.get('CN', (0, 0))
+    if isinstance(CNs, tuple):
+        CN_H1 = str(CNs[0]) if len(CNs) > 0 else None
+        CN_H2 = str(CNs[1]) if len(CNs) > 1 else None
+    else:
+        CN_H1 = str(CNs)
+        CN_H2 = str(CNs)
+
+    # parse the span info
+    SP_field = call.get('SP', None)
+    if SP_field is None:
+        spans_h1 = ""
+        spans_h2 = ""
+    elif isinstance(SP_field, tuple):
+        spans_h1 = SP_field[0] if len(SP_field) > 0 and SP_field[0] is not None else ""
+        spans_h2 = SP_field[1] if len(SP_field) > 1 and SP_field[1] is not None else spans_h1
+    else:
+        spans_h1 = str(SP_field) if SP_field else ""
+        spans_h2 = spans_h1
+
+    # replace None with empty string
+    ref_span = rec.info.get('REF_SPAN', None)
+    spans = [
+        str(ref_span) if ref_span is not None else "",
+        spans_h1 if spans_h1 else "",
+        spans_h2 if spans_h2 else ""
+    ]
+
+    # get motif names from INFO field
+    motif_names = rec.info.get('MOTIFS', [])
+    if isinstance(motif_names, tuple):
+        motif_names = list(motif_names)
+    elif not isinstance(motif_names, list):
+        motif_names = [motif_names] if motif_names else []
+
+    # get motif IDs for the ref allele
+    motif_ids_ref = rec.info.get('MOTIF_IDs_REF', "")
+    if motif_ids_ref:
+        if isinstance(motif_ids_ref, (tuple, list)):
+            motif_ids_ref = "_".join(str(x) for x in motif_ids_ref)
+        motif_ids_ref = str(motif_ids_ref).split("_")
+    else:
+        motif_ids_ref = []
+
+    # make a genotype string (we already got gt above)
+    gt_str = genotype_string(gt)
+
+    # get supporting reads
+    supporting_reads = call.get('DP', None)
+    if supporting_reads is None:
+        supporting_reads_h1 = 0
+        supporting_reads_h2 = 0
+    elif isinstance(supporting_reads, tuple):
+        supporting_reads_h1 = supporting_reads[0] if len(supporting_reads) > 0 else 0
+        supporting_reads_h2 = supporting_reads[1] if len(supporting_reads) > 1 else supporting_reads_h1
+    else:
+        supporting_reads_h1 = int(supporting_reads) if supporting_reads else 0
+        supporting_reads_h2 = supporting_reads_h1
+
+    # build the final record dict
+    record = {
+        'chr': rec.chrom,
+        'pos': rec.pos,
+        'stop': rec.stop,
+        'motifs': motif_names,
+        'motif_ids_h1': ids_h1,
+        'motif_ids_h2': ids_h2,
+        'motif_ids_ref': motif_ids_ref,
+        'ref_CN': rec.info.get('CN_ref', None),
+        'CN_H1': CN_H1,
+        'CN_H2': CN_H2,
+        'spans': spans,
+        'ref_allele': ref_allele,
+        'alt_allele1': alt_allele1,
+        'alt_allele2': alt_allele2,
+        'gt': gt_str,
+        'supported_reads_h1': supporting_reads_h1,
+        'supported_reads_h2': supporting_reads_h2,
+        'id': rec.id,
+        'segments': {
+            'ref': segment_sequence(ref_allele, spans[0], motif_ids_ref),
+            'h1': segment_sequence(alt_allele1, spans[1], ids_h1),
+            'h2': segment_sequence(alt_allele2, spans[2], ids_h2),
+        },
+    }
+
+    return record
+
+def _diploid_genotype(gt_h1: str, gt_h2: str, ids_h1: List[str], ids_h2: List[str]) -> str:
+    """
+    Genotype of a sample from its two haplotype files. Alt indexes of separate files aren't
+    comparable, so two alt haplotypes are 1/1 only when their motif IDs match (else 1/2).
+    """
+    if gt_h1 == '.' or gt_h2 == '.':
+        return f"{gt_h1}/{gt_h2}"
+    g1 = int(gt_h1) if gt_h1.isdigit() else 0
+    g2 = int(gt_h2) if gt_h2.isdigit() else 0
+    if g1 == 1 and g2 == 1:
+        return '1/1' if ids_h1 == ids_h2 else '1/2'
+    if g1 > g2:
+        g1, g2 = g2, g1
+    return f"{g1}/{g2}"
+
+def _parse_haplotype(rec) -> Dict[str, Any]:
+    """_parse_assembly_record plus the called sequence and REF_SPAN, for pairing"""
+    record = _parse_assembly_record(rec)
+    gt = rec.samples[0].get('GT', (None,))
+    allele = gt[0] if isinstance(gt, (tuple, list)) and gt else None
+    alleles = rec.alleles or ()
+    if allele is None or allele >= len(alleles):
+        record['gt'] = '.'
+        record['allele'] = ''
+    else:
+        record['allele'] = alleles[allele] if alleles[allele] != '.' else ''
+    record['ref_span'] = rec.info.get('REF_SPAN', None)
+    return record
+
+def _merge_haplotype_records(h1: Optional[Dict[str, Any]], h2: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """One diploid-shaped record (same keys as _parse_diploid_record) from a sample's two haplotype records"""
+    base = h1 or h2
+    empty = {'motifs': [], 'motif_ids_h': [], 'CN_H': None, 'spans': "", 'allele': '', 'gt': '.'}
+    h1 = h1 or empty
+    h2 = h2 or empty
+    ref_span = base['ref_span']
+    spans = [str(ref_span) if ref_span is not None else "", str(h1['spans'] or ""), str(h2['spans'] or "")]
+    return {
+        'chr': base['chr'],
+        'pos': base['pos'],
+        'stop': base['stop'],
+        'motifs': list(dict.fromkeys(h1['motifs'] + h2['motifs'])),
+        'motif_ids_h1': h1['motif_ids_h'],
+        'motif_ids_h2': h2['motif_ids_h'],
+        'motif_ids_ref': base['motif_ids_ref'],
+        'ref_CN': base['ref_CN'],
+        'CN_H1': str(h1['CN_H']) if h1['CN_H'] is not None else None,
+        'CN_H2': str(h2['CN_H']) if h2['CN_H'] is not None else None,
+        'spans': spans,
+        'ref_allele': base['ref_allele'],
+        'alt_allele1': h1['allele'],
+        'alt_allele2': h2['allele'],
+        'gt': _diploid_genotype(h1['gt'], h2['gt'], h1['motif_ids_h'], h2['motif_ids_h']),
+        'supported_reads_h1': 0,
+        'supported_reads_h2': 0,
+        'id': base['id'],
+        'segments': {
+            'ref': segment_sequence(base['ref_allele'], spans[0], base['motif_ids_ref']),
+            'h1': segment_sequence(h1['allele'], spans[1], h1['motif_ids_h']),
+            'h2': segment_sequence(h2['allele'], spans[2], h2['motif_ids_h']),
+        },
+    }
+
+def parse_haplotype_pair(h1_path: Optional[str], h2_path: Optional[str], region: str) -> Optional[Dict[str, Any]]:
+    """Diploid-shaped record of a sample whose haplotypes are in two assembly VCFs (None if neither has the region)"""
+    haplotypes = []
+    for path in (h1_path, h2_path):
+        record = None
+        if path:
+            try:
+                with variant_files.open(path) as vcf:
+                    rec = next(vcf.fetch(region=region), None)
+                    if rec is not None:
+                        record = _parse_haplotype(rec)
+            except Exception as e:
+                print(f"Error parsing haplotype record from {path}: {e}")
+        haplotypes.append(record)
+    if haplotypes[0] is None and haplotypes[1] is None:
+        return None
+    return _merge_haplotype_records(*haplotypes)
+
 class VCFLoadRequest(BaseModel):
     vcf_path: str
+    rebuild_index: bool = False  # ignore the sidecar index and rescan the file
+    background: bool = False  # return a job id immediately instead of waiting for the scan
 
 class FilterRequest(BaseModel):
     vcf_path: str
@@ -302,6 +448,7 @@ class FilterResponse(BaseModel):
     current_page: int
     total_pages: int
     available_genotypes: Optional[List[str]] = None
+    loading: bool = False  # True while the VCF is still being scanned (partial results)
 
 @app.get("/")
 async def root():
@@ -413,6 +560,9 @@ async def clear_vcf_cache(vcf_path: Optional[str] = None):
     """Clear VCF cache for a specific file or all files"""
     try:
         if vcf_path:
+            vcf_search_cache.pop(vcf_path, None)
+            variant_files.invalidate(vcf_path)
+            record_cache.clear(vcf_path)
             if vcf_path in vcf_cache:
                 del vcf_cache[vcf_path]
                 return {"success": True, "message": f"Cache cleared for {vcf_path}"}
@@ -420,290 +570,242 @@ async def clear_vcf_cache(vcf_path: Optional[str] = None):
                 return {"success": False, "message": "VCF not found in cache"}
         else:
             vcf_cache.clear()
+            vcf_search_cache.clear()
+            variant_files.invalidate()
+            record_cache.clear()
             return {"success": True, "message": "All VCF caches cleared"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _load_summary(index: RegionIndex, index_source: str) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "total_regions": len(index),
+        "available_genotypes": index.available_genotypes,
+        "available_chromosomes": index.available_chromosomes,
+        "index_source": index_source,
+        "message": f"Loaded {len(index):,} regions"
+    }
+
+def _annotate_pathogenic(index: RegionIndex) -> RegionIndex:
+    """Join the index against the pathogenic catalog once (per-row catalog hit + exceeds-threshold bit)"""
+    if index.pathogenic_exceeds is None:
+        hit, exceeds = get_pathogenic_index().join(index.chroms, index.chrom_codes, index.pos, index.stop, index.cn_max)
+        index.set_pathogenic_flags(hit, exceeds)
+    return index
+
+def _scan_index(vcf_path: str, fingerprint: Dict[str, Any], on_progress=None, on_partial=None) -> RegionIndex:
+    """Scan a VCF into a RegionIndex and write its sidecar (doesn't register the file as loaded)"""
+    total_bytes = Path(vcf_path).stat().st_size
+    # big indexed files are split per contig (and into windows within long contigs)
+    # and scanned on a process pool, small or unindexed ones in a single pass
+    chunks = plan_scan_chunks(vcf_path) if total_bytes >= PARALLEL_SCAN_MIN_BYTES and worker_pool.max_workers > 1 else []
+    if len(chunks) > 1:
+        print(f"Scanning {len(chunks)} chunks with {min(worker_pool.max_workers, len(chunks))} workers...")
+        index = scan_vcf_parallel(vcf_path, chunks, worker_pool, on_progress=on_progress, on_partial=on_partial)
+    else:
+        vcf = pysam.VariantFile(vcf_path)
+        # fetch() without args, so we get ALL records
+        print("Reading all records from VCF file...")
+        index = scan_vcf(vcf, on_progress=on_progress, on_partial=on_partial)
+        vcf.close()
+    index.fingerprint = fingerprint
+
+    # persist it so the next load (or a backend restart) doesn't have to rescan
+    sidecar_path = write_sidecar(vcf_path, index, fingerprint)
+    if sidecar_path is not None:
+        print(f"Wrote sidecar index: {sidecar_path}")
+    return index
+
+def _run_load_job(job: Job, vcf_path: str, fingerprint: Dict[str, Any]):
+    """Scan a VCF into a RegionIndex on a worker thread, publishing partial results as it goes"""
+    try:
+        total_bytes = Path(vcf_path).stat().st_size
+        job.update(records_scanned=0, bytes_read=0, total_bytes=total_bytes, current_contig=None)
+
+        def on_partial(partial: RegionIndex):
+            # make what we have so far available to the filter endpoints
+            partial.fingerprint = fingerprint
+            partial.loading = True
+            vcf_cache[vcf_path] = partial
+
+        print(f"Loading VCF file: {vcf_path}")
+        index = _annotate_pathogenic(_scan_index(vcf_path, fingerprint, on_progress=job.update, on_partial=on_partial))
+        print(f"Total regions loaded: {len(index):,} ({index.nbytes / 1e6:.1f} MB columnar index, from scan)")
+        vcf_cache[vcf_path] = index
+        job.update(records_scanned=len(index), bytes_read=total_bytes, current_contig=None)
+        job.finish(_load_summary(index, "scan"))
+    except Exception as e:
+        print(f"Error loading VCF: {e}")
+        import traceback
+        traceback.print_exc()
+        cached = vcf_cache.get(vcf_path)
+        if cached is not None and cached.loading:
+            del vcf_cache[vcf_path]
+        job.fail(str(e))
+
+def _start_load(vcf_path: str, rebuild_index: bool = False) -> Tuple[Optional[RegionIndex], Optional[Job], Optional[str]]:
+    """
+    Index for vcf_path from memory or from its sidecar -> (index, None, source), otherwise
+    the running (or newly started) load job that will produce it -> (None, job, None)
+    """
+    job = load_jobs.running("vcf-load", vcf_path)
+    if job is not None:
+        return None, job, None
+
+    # reuse what we already have if the file on disk hasn't changed since
+    fingerprint = file_fingerprint(vcf_path)
+    index = vcf_cache.get(vcf_path)
+    if index is not None and index.fingerprint == fingerprint and not rebuild_index:
+        return index, None, "memory"
+
+    # clear cache for this vcf to make sure we get fresh data
+    vcf_cache.pop(vcf_path, None)
+    index = None if rebuild_index else load_sidecar(vcf_path, fingerprint)
+    if index is not None:
+        print(f"Loaded {len(index):,} regions from sidecar index for {vcf_path}")
+        vcf_cache[vcf_path] = _annotate_pathogenic(index)
+        return index, None, "sidecar"
+
+    job = load_jobs.create("vcf-load", vcf_path)
+    _load_executor.submit(_run_load_job, job, vcf_path, fingerprint)
+    return None, job, None
+
+async def _wait_for_load(job: Job):
+    # wait without blocking the event loop so other requests keep being served
+    while not job.finished:
+        await asyncio.sleep(0.2)
+    if job.status == "error":
+        raise HTTPException(status_code=500, detail=job.error)
+
 @app.post("/api/vcf/load")
 async def load_vcf(request: VCFLoadRequest):
-    """Load and parse VCF file - uses same approach as statistics to ensure consistency"""
+    """
+    Load and parse VCF file - uses same approach as statistics to ensure consistency.
+    The scan runs as a background job; with background=true this returns the job id
+    right away (poll /api/vcf/load/{job_id}), otherwise it waits for the job to finish.
+    """
     try:
         if not Path(request.vcf_path).exists():
             raise HTTPException(status_code=404, detail="VCF file not found")
-        
-        # clear cache for this vcf to make sure we get fresh data
-        if request.vcf_path in vcf_cache:
-            del vcf_cache[request.vcf_path]
-        
-        print(f"Loading VCF file: {request.vcf_path}")
-        vcf = pysam.VariantFile(request.vcf_path)
-        records = []
-        region_genotypes = {}
-        
-        # use the same approach as the stats endpoint - fetch() without args
-        # this way we get ALL records, same as what stats shows
-        # stats can read 1.2M+ regions like this so we should be fine
-        print("Reading all records from VCF file...")
-        record_count = 0
-        chromosomes_seen = set()
-        for rec in vcf.fetch():
-            record_count += 1
-            region_str = f"{rec.chrom}:{rec.pos}-{rec.stop}"
-            chromosomes_seen.add(rec.chrom)
-            
-            # motif size (max length of motifs in INFO)
-            motifs = rec.info.get('MOTIFS', [])
-            if isinstance(motifs, tuple):
-                motifs = list(motifs)
-            elif not isinstance(motifs, list):
-                motifs = [motifs] if motifs else []
-            motif_sizes = [len(str(m)) for m in motifs if m]
-            motif_size = max(motif_sizes) if motif_sizes else 0
-            
-            # copy number (max of CN from samples, or CN_ref from INFO)
-            cn_max_val = 0
-            try:
-                cn_ref = rec.info.get('CN_ref')
-                if cn_ref is not None:
-                    cn_max_val = max(cn_max_val, float(cn_ref))
-                cn = rec.samples[0].get('CN')
-                if cn is not None:
-                    if isinstance(cn, (tuple, list)):
-                        for c in cn:
-                            if c is not None:
-                                cn_max_val = max(cn_max_val, float(c))
-                    else:
-                        cn_max_val = max(cn_max_val, float(cn))
-            except (TypeError, ValueError, KeyError, IndexError):
-                pass
-            
-            records.append({
-                'id': rec.id,
-                'region': region_str,
-                'chrom': rec.chrom,
-                'pos': rec.pos,
-                'stop': rec.stop,
-                'motif_size': motif_size,
-                'cn_max': cn_max_val
-            })
-            
-            # extract the genotype
-            try:
-                gt = rec.samples[0]['GT']
-                if gt is not None:
-                    gt_str = '/'.join([str(i) for i in gt]) if isinstance(gt, (tuple, list)) else str(gt)
-                else:
-                    gt_str = './.'
-                region_genotypes[region_str] = gt_str
-            except (KeyError, IndexError, AttributeError):
-                region_genotypes[region_str] = './.'
-            
-            # print progress every 100k records
-            if record_count % 100000 == 0:
-                print(f"  Loaded {record_count:,} regions...")
-        
-        vcf.close()
-        
-        print(f"Total regions loaded: {len(records):,}")
-        
-        # cache the results
-        vcf_cache[request.vcf_path] = {
-            'records': records,
-            'region_genotypes': region_genotypes
-        }
-        
-        available_genotypes = sorted(set(region_genotypes.values()))
-        # Natural sort: chr1, chr2, ..., chr22, chrX, chrY, chrM
-        def chrom_sort_key(c):
-            s = str(c).replace('chr', '').replace('Chr', '')
-            if s == 'X': return (23, 'X')
-            if s == 'Y': return (24, 'Y')
-            if s in ('M', 'MT'): return (25, s)
-            try: return (int(s), s)
-            except ValueError: return (999, s)
-        available_chromosomes = sorted(chromosomes_seen, key=chrom_sort_key)
-        
-        return {
-            "success": True,
-            "total_regions": len(records),
-            "available_genotypes": available_genotypes,
-            "available_chromosomes": available_chromosomes,
-            "message": f"Loaded {len(records):,} regions"
-        }
+
+        index, job, index_source = _start_load(request.vcf_path, request.rebuild_index)
+        if index is not None:
+            return _load_summary(index, index_source)
+
+        if request.background:
+            return {
+                "success": True,
+                "job_id": job.id,
+                "status": job.status,
+                "message": "Loading started"
+            }
+
+        await _wait_for_load(job)
+        return {**job.result, "job_id": job.id}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error loading VCF: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/vcf/load/{job_id}")
+async def get_load_job_status(job_id: str):
+    """Progress of a background VCF load (records scanned, bytes read, current contig, ETA)"""
+    job = load_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Load job not found")
+    return job.to_dict()
+
+@app.get("/api/vcf/load/{job_id}/events")
+async def stream_load_job_status(job_id: str, interval: float = 0.5):
+    """Same as /api/vcf/load/{job_id} but as a server-sent event stream until the job ends"""
+    job = load_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Load job not found")
+
+    async def events():
+        while True:
+            finished = job.finished
+            yield f"data: {json.dumps(job.to_dict())}\n\n"
+            if finished:
+                yield "event: done\ndata: {}\n\n"
+                break
+            await asyncio.sleep(max(0.1, interval))
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+def _page_response(index: RegionIndex, rows: np.ndarray, page: int, page_size: int) -> FilterResponse:
+    """Slice one page out of the matching rows and format it"""
+    total_matching = len(rows)
+    start_idx = page * page_size
+    end_idx = start_idx + page_size
+    result_records = [RegionInfo(**index.row_info(int(r))) for r in rows[start_idx:end_idx]]
+    total_pages = (total_matching // page_size) + (1 if total_matching % page_size > 0 else 0)
+    return FilterResponse(
+        records=result_records,
+        total_matching=total_matching,
+        total_regions=len(index),
+        current_page=page,
+        total_pages=total_pages,
+        available_genotypes=index.available_genotypes,
+        loading=index.loading
+    )
+
+def _active_rows(vcf_path: str, index: RegionIndex, key: FilterKey) -> np.ndarray:
+    """Row numbers matching key, remembered as the order the user is browsing vcf_path in (for prefetching)"""
+    _active_filters[vcf_path] = key
+    return index.filtered_rows(key)
+
+def _genotype_filtered_rows(vcf_path: str, index: RegionIndex, genotype_list: Optional[List[str]]) -> np.ndarray:
+    """Row numbers that pass the (optional) genotype filter"""
+    return _active_rows(vcf_path, index, filter_key(genotypes=genotype_list))
+
 @app.post("/api/vcf/filter", response_model=FilterResponse)
 async def filter_regions(request: FilterRequest):
     """Filter regions with server-side pagination"""
     try:
         if request.vcf_path not in vcf_cache:
             raise HTTPException(status_code=404, detail="VCF not loaded. Load VCF first.")
-        
-        cache = vcf_cache[request.vcf_path]
-        records = cache['records']
-        region_genotypes = cache['region_genotypes']
-        
-        # apply genotype filter if specified
-        if request.genotype_filter:
-            filtered = [
-                r for r in records
-                if region_genotypes.get(r['region'], './.') in request.genotype_filter
-            ]
-        else:
-            filtered = records
-        
-        total_matching = len(filtered)
-        
-        # pagination
-        start_idx = request.page * request.page_size
-        end_idx = start_idx + request.page_size
-        page_records = filtered[start_idx:end_idx]
-        
-        # format the response
-        result_records = [
-            RegionInfo(
-                id=r['id'],
-                region=r['region'],
-                genotype=region_genotypes.get(r['region'], './.')
-            )
-            for r in page_records
-        ]
-        
-        total_pages = (total_matching // request.page_size) + (1 if total_matching % request.page_size > 0 else 0)
-        available_genotypes = sorted(set(region_genotypes.values()))
-        
-        return FilterResponse(
-            records=result_records,
-            total_matching=total_matching,
-            total_regions=len(records),
-            current_page=request.page,
-            total_pages=total_pages,
-            available_genotypes=available_genotypes
-        )
+
+        index = vcf_cache[request.vcf_path]
+        rows = _genotype_filtered_rows(request.vcf_path, index, request.genotype_filter)
+        return _page_response(index, rows, request.page, request.page_size)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def _is_pathogenic(region_str: str, cn_max: float, catalog) -> bool:
-    """Check if region is pathogenic (overlaps catalog and CN >= threshold)."""
-    if catalog is None:
-        return False
-    try:
-        parts = region_str.split(':')
-        if len(parts) < 2:
-            return False
-        chrom = parts[0]
-        pos_end = parts[1].split('-')
-        if len(pos_end) < 2:
-            return False
-        start = int(pos_end[0])
-        end = int(pos_end[1])
-        chr_norm = chrom if chrom.startswith('chr') else f'chr{chrom}'
-        if isinstance(catalog, list):
-            for entry in catalog:
-                if entry.get('chrom') not in (chrom, chr_norm):
-                    continue
-                if (entry['start'] <= end) and (entry['end'] >= start):
-                    thresh = entry.get('pathogenic_min')
-                    if thresh is not None and cn_max >= float(thresh):
-                        return True
-            return False
-        import pandas as pd
-        if isinstance(catalog, pd.DataFrame) and not catalog.empty:
-            chr_matches = catalog[(catalog['chrom'] == chrom) | (catalog['chrom'] == chr_norm)]
-            for _, row in chr_matches.iterrows():
-                if (row['start'] <= end) and (row['end'] >= start):
-                    thresh = row.get('pathogenic_min')
-                    if pd.notna(thresh) and cn_max >= float(thresh):
-                        return True
-        return False
-    except Exception:
-        return False
-
 @app.post("/api/vcf/filter-advanced", response_model=FilterResponse)
 async def filter_regions_advanced(request: FilterAdvancedRequest):
     """Filter regions with advanced criteria (motif size, CN, chromosomes, genotypes, pathogenic)."""
     try:
         if request.vcf_path not in vcf_cache:
             raise HTTPException(status_code=404, detail="VCF not loaded. Load VCF first.")
-        
-        cache = vcf_cache[request.vcf_path]
-        records = cache['records']
-        region_genotypes = cache['region_genotypes']
-        
-        # Build filtered list
-        filtered = []
-        pathogenic_catalog = load_pathogenic_catalog() if request.pathogenic_only else None
-        
-        for r in records:
-            region_str = r['region']
-            gt = region_genotypes.get(region_str, './.')
-            
-            # genotype filter
-            if request.genotypes and len(request.genotypes) > 0:
-                if gt not in request.genotypes:
-                    continue
-            
-            # chromosome filter
-            if request.chromosomes and len(request.chromosomes) > 0:
-                chrom = r.get('chrom', '')
-                if chrom not in request.chromosomes:
-                    continue
-            
-            # motif size filter
-            motif_size = r.get('motif_size', 0)
-            if request.motif_size_min is not None and motif_size < request.motif_size_min:
-                continue
-            if request.motif_size_max is not None and motif_size > request.motif_size_max:
-                continue
-            
-            # copy number filter
-            cn_max = r.get('cn_max', 0)
-            if request.cn_min is not None and cn_max < request.cn_min:
-                continue
-            if request.cn_max is not None and cn_max > request.cn_max:
-                continue
-            
-            # pathogenic filter
-            if request.pathogenic_only:
-                if not _is_pathogenic(region_str, cn_max, pathogenic_catalog):
-                    continue
-            
-            # annotated_regions filter (frontend sends client-filtered list)
-            if request.annotated_regions and len(request.annotated_regions) > 0:
-                if region_str not in request.annotated_regions:
-                    continue
-            
-            filtered.append(r)
-        
-        total_matching = len(filtered)
-        start_idx = request.page * request.page_size
-        end_idx = start_idx + request.page_size
-        page_records = filtered[start_idx:end_idx]
-        
-        result_records = [
-            RegionInfo(
-                id=r['id'],
-                region=r['region'],
-                genotype=region_genotypes.get(r['region'], './.')
-            )
-            for r in page_records
-        ]
-        
-        total_pages = (total_matching // request.page_size) + (1 if total_matching % request.page_size > 0 else 0)
-        available_genotypes = sorted(set(region_genotypes.values()))
-        
-        return FilterResponse(
-            records=result_records,
-            total_matching=total_matching,
-            total_regions=len(records),
-            current_page=request.page,
-            total_pages=total_pages,
-            available_genotypes=available_genotypes
+
+        index = vcf_cache[request.vcf_path]
+
+        # all criteria are evaluated as vectorized masks over the index columns, and the
+        # matching rows are cached per normalized filter so changing page is just a slice
+        # (annotated_regions is the client-filtered list the frontend sends)
+        key = filter_key(
+            genotypes=request.genotypes,
+            chromosomes=request.chromosomes,
+            motif_size_min=request.motif_size_min,
+            motif_size_max=request.motif_size_max,
+            cn_min=request.cn_min,
+            cn_max=request.cn_max,
+            pathogenic_only=request.pathogenic_only,
+            annotated_regions=request.annotated_regions,
         )
+        if key.pathogenic_only:
+            # normally already done at load, this covers partial results of a running load
+            _annotate_pathogenic(index)
+        rows = _active_rows(request.vcf_path, index, key)
+
+        return _page_response(index, rows, request.page, request.page_size)
     except HTTPException:
         raise
     except Exception as e:
@@ -711,19 +813,61 @@ async def filter_regions_advanced(request: FilterAdvancedRequest):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/vcf/pathogenic-loci")
+async def get_pathogenic_loci(vcf_path: str, exceeds_only: bool = True):
+    """
+    Loci of a loaded VCF that overlap the pathogenic catalog, from the join done at load time.
+    By default only the ones whose CN reaches the pathogenic threshold.
+    """
+    try:
+        if vcf_path not in vcf_cache:
+            raise HTTPException(status_code=404, detail="VCF not loaded. Load VCF first.")
+
+        index = _annotate_pathogenic(vcf_cache[vcf_path])
+        pathogenic_index = get_pathogenic_index()
+        selected = index.pathogenic_exceeds if exceeds_only else index.pathogenic_hit >= 0
+
+        loci = []
+        for row in np.flatnonzero(selected):
+            row = int(row)
+            entry_id = int(index.pathogenic_hit[row])
+            entry = pathogenic_index.entries[entry_id]
+            threshold = pathogenic_index.threshold(entry_id)
+            loci.append({
+                **index.row_info(row),
+                "cn_max": float(index.cn_max[row]),
+                "exceeds_threshold": bool(index.pathogenic_exceeds[row]),
+                "catalog_region": f"{entry['chrom']}:{entry['start']}-{entry['end']}",
+                "gene": str(entry["gene"]) if entry.get("gene") is not None else None,
+                "disease": str(entry["disease"]) if entry.get("disease") is not None else None,
+                "inheritance": str(entry["inheritance"]) if entry.get("inheritance") is not None else None,
+                "motif": str(entry["motif"]) if entry.get("motif") is not None else None,
+                "pathogenic_threshold": int(threshold) if threshold is not None else None
+            })
+
+        return {
+            "success": True,
+            "loci": loci,
+            "count": len(loci),
+            "loading": index.loading
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/vcf/regions")
 async def get_all_regions(vcf_path: str):
     """Get all available regions for autocomplete"""
     try:
         if not Path(vcf_path).exists():
             raise HTTPException(status_code=404, detail="VCF file not found")
-        
+
         if vcf_path not in vcf_cache:
             raise HTTPException(status_code=404, detail="VCF not loaded. Load VCF first.")
-        
-        cache = vcf_cache[vcf_path]
-        regions = [r['region'] for r in cache['records']]
-        
+
+        regions = vcf_cache[vcf_path].regions()
+
         return {
             "success": True,
             "regions": regions
@@ -733,49 +877,76 @@ async def get_all_regions(vcf_path: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _catalog_genes_matching(query: str, limit: int) -> List[Dict[str, Any]]:
+    """Pathogenic catalog entries whose gene matches a search query (coordinates never do)"""
+    if ':' in query:
+        return []
+    pathogenic_index = get_pathogenic_index()
+    return [pathogenic_index.entries[i] for i in pathogenic_index.find_genes(query, clamp_limit(limit))]
+
+def _region_search(vcf_path: str, index: RegionIndex) -> RegionSearch:
+    """Search index for a loaded VCF, built on first use and rebuilt when the file is reloaded"""
+    cached = vcf_search_cache.get(vcf_path)
+    if cached is None or cached[0] is not index:
+        cached = (index, RegionSearch.from_index(index))
+        vcf_search_cache[vcf_path] = cached
+    return cached[1]
+
+@app.get("/api/vcf/search")
+async def search_regions(vcf_path: str, q: str, limit: int = DEFAULT_SEARCH_RESULTS):
+    """
+    Top matches for a partial region query - chr4:31 (position prefix), chr4:3100-3200
+    (overlap), a gene name or a record ID prefix - instead of shipping every region
+    to the browser. limit is capped (region_search.MAX_RESULTS).
+    """
+    try:
+        if vcf_path not in vcf_cache:
+            raise HTTPException(status_code=404, detail="VCF not loaded. Load VCF first.")
+
+        index = vcf_cache[vcf_path]
+        results = _region_search(vcf_path, index).search(q, limit, genes=_catalog_genes_matching(q, limit))
+        return {
+            "success": True,
+            "query": q,
+            "results": results,
+            "count": len(results),
+            "loading": index.loading
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/vcf/region-page")
 async def get_region_page(vcf_path: str, region: str, genotype_filter: Optional[str] = None, page_size: int = 50):
     """Find which page a specific region is on"""
     try:
         if not Path(vcf_path).exists():
             raise HTTPException(status_code=404, detail="VCF file not found")
-        
+
         if vcf_path not in vcf_cache:
             raise HTTPException(status_code=404, detail="VCF not loaded. Load VCF first.")
-        
-        cache = vcf_cache[vcf_path]
-        records = cache['records']
-        region_genotypes = cache['region_genotypes']
-        
+
+        index = vcf_cache[vcf_path]
+
         # Apply genotype filter
-        genotype_list = None
-        if genotype_filter:
-            genotype_list = genotype_filter.split(',')
-            filtered = [
-                r for r in records
-                if region_genotypes.get(r['region'], './.') in genotype_list
-            ]
-        else:
-            filtered = records
-        
+        genotype_list = genotype_filter.split(',') if genotype_filter else None
+        rows = _genotype_filtered_rows(vcf_path, index, genotype_list)
+
         # Find the index of the region
-        region_index = None
-        for idx, r in enumerate(filtered):
-            if r['region'] == region:
-                region_index = idx
-                break
-        
+        region_index = index.find_row(region, rows)
+
         if region_index is None:
             raise HTTPException(status_code=404, detail="Region not found in filtered results")
-        
+
         # Calculate page number (0-indexed)
         page_number = region_index // page_size
-        
+
         return {
             "success": True,
             "page": page_number,
             "index": region_index,
-            "total_matching": len(filtered)
+            "total_matching": len(rows)
         }
     except HTTPException:
         raise
@@ -788,57 +959,85 @@ async def get_region_by_index(vcf_path: str, region_index: int, genotype_filter:
     try:
         if not Path(vcf_path).exists():
             raise HTTPException(status_code=404, detail="VCF file not found")
-        
+
         if vcf_path not in vcf_cache:
             raise HTTPException(status_code=404, detail="VCF not loaded. Load VCF first.")
-        
-        cache = vcf_cache[vcf_path]
-        records = cache['records']
-        region_genotypes = cache['region_genotypes']
-        
+
+        index = vcf_cache[vcf_path]
+
         # Apply genotype filter
-        if genotype_filter:
-            genotype_list = genotype_filter.split(',')
-            filtered = [
-                r for r in records
-                if region_genotypes.get(r['region'], './.') in genotype_list
-            ]
-        else:
-            filtered = records
-        
+        genotype_list = genotype_filter.split(',') if genotype_filter else None
+        rows = _genotype_filtered_rows(vcf_path, index, genotype_list)
+
         # Validate index
-        if region_index < 0 or region_index >= len(filtered):
-            raise HTTPException(status_code=404, detail=f"Region index {region_index} out of range (0-{len(filtered)-1})")
-        
-        # Get the region at this index
-        target_region = filtered[region_index]
-        
+        if region_index < 0 or region_index >= len(rows):
+            raise HTTPException(status_code=404, detail=f"Region index {region_index} out of range (0-{len(rows)-1})")
+
         # Calculate page number (0-indexed)
         page_number = region_index // page_size
-        
+
         return {
             "success": True,
-            "region": target_region['region'],
+            "region": index.region(int(rows[region_index])),
             "page": page_number,
             "index": region_index,
-            "total_matching": len(filtered)
+            "total_matching": len(rows)
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _prefetch_records(vcf_path: str, file_key: Tuple, regions: List[str]):
+    """Parse regions into the record cache (runs on the prefetch threads)"""
+    for region in regions:
+        try:
+            record = parse_record(vcf_path, region)
+            if record is not None:
+                record_cache.put((file_key, region), record, prefetched=True)
+        finally:
+            record_cache.release((file_key, region))
+
+def _prefetch_neighbours(vcf_path: str, region_str: str, file_key: Tuple):
+    """Queue the regions around region_str (in the order the user is browsing) for prefetching"""
+    index = vcf_cache.get(vcf_path)
+    if index is None:
+        return
+    rows = index.filtered_rows(_active_filters.get(vcf_path, FilterKey()))
+    rank = index.find_row(region_str, rows)
+    if rank is None:
+        return
+    # closest first: i+1, i-1, i+2, i-2, ...
+    neighbours = []
+    for offset in range(1, PREFETCH_NEIGHBOURS + 1):
+        for i in (rank + offset, rank - offset):
+            if 0 <= i < len(rows):
+                neighbours.append(index.region(int(rows[i])))
+    todo = [region for region in neighbours if record_cache.claim((file_key, region))]
+    if todo:
+        _prefetch_executor.submit(_prefetch_records, vcf_path, file_key, todo)
+
 @app.get("/api/vcf/region/{region_str}")
 async def get_region_data(region_str: str, vcf_path: str):
-    """Get detailed data for a specific region"""
+    """Get detailed data for a specific region (cached, neighbours are prefetched)"""
     try:
         if not Path(vcf_path).exists():
             raise HTTPException(status_code=404, detail="VCF file not found")
-        
-        record = parse_record(vcf_path, region_str)
+
+        file_key = fingerprint_key(file_fingerprint(vcf_path))
+        record = record_cache.get((file_key, region_str))
         if record is None:
-            raise HTTPException(status_code=404, detail="Region not found")
-        
+            record = parse_record(vcf_path, region_str)
+            if record is None:
+                raise HTTPException(status_code=404, detail="Region not found")
+            record_cache.put((file_key, region_str), record)
+
+        try:
+            _prefetch_neighbours(vcf_path, region_str, file_key)
+        except Exception as e:
+            # prefetching is best effort, never fail the request over it
+            print(f"Warning: region prefetch failed: {e}")
+
         return {
             "success": True,
             "record": record
@@ -848,199 +1047,281 @@ async def get_region_data(region_str: str, vcf_path: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/vcf/statistics")
-async def get_vcf_statistics(vcf_path: str):
-    """Get comprehensive statistics about the VCF file"""
+class RegionBatchRequest(BaseModel):
+    vcf_path: str
+    regions: List[str] = []
+    ids: List[str] = []  # TandemTwister record IDs, looked up in the loaded index
+    stream: bool = False  # NDJSON, one line per record as it is read, then a summary line
+
+# most regions (+ ids) accepted in one batch request
+MAX_BATCH_REGIONS = 10000
+
+def _batch_queries(request: RegionBatchRequest) -> List[Tuple[str, Optional[str]]]:
+    """(what was asked for, region to read) for every requested region and record ID"""
+    queries = [(region, region) for region in request.regions]
+    if request.ids:
+        index = vcf_cache.get(request.vcf_path)
+        if index is None:
+            raise HTTPException(status_code=404, detail="VCF not loaded. Load VCF first to look up record IDs.")
+        search = _region_search(request.vcf_path, index)
+        for record_id in request.ids:
+            rows = search.rows_with_id(record_id)
+            queries.append((record_id, index.region(int(rows[0])) if len(rows) else None))
+    return queries
+
+def _read_region_batch(vcf_path: str, regions: List[str]):
+    """
+    Yield (region, record) for regions in genomic order, read over one pooled handle
+    so the fetches are forward seeks in the same file. Record is None if not found.
+    """
+    file_key = fingerprint_key(file_fingerprint(vcf_path))
+    with variant_files.open(vcf_path) as vcf:
+        contig_order = {contig: i for i, contig in enumerate(vcf.header.contigs)}
+
+        def genomic_order(region):
+            parsed = parse_region(region)
+            if parsed is None:
+                return (len(contig_order) + 1, 0, 0)
+            return (contig_order.get(parsed[0], len(contig_order)), parsed[1], parsed[2])
+
+        for region in sorted(set(regions), key=genomic_order):
+            record = record_cache.get((file_key, region))
+            if record is None:
+                try:
+                    rec = next(vcf.fetch(region=region), None)
+                except ValueError:
+                    # unknown contig or malformed region
+                    rec = None
+                if rec is not None:
+                    try:
+                        record = _parse_diploid_record(rec)
+                    except Exception as e:
+                        # same as parse_record: this region is reported missing, the batch goes on
+                        print(f"Error parsing record at {region}: {e}")
+                    else:
+                        record_cache.put((file_key, region), record)
+            yield region, record
+
+@app.post("/api/vcf/region-batch")
+async def get_region_batch(request: RegionBatchRequest):
+    """
+    Detailed data for many regions (and/or record IDs) in one request. The regions are
+    read in genomic order over a single open handle; with stream=true the records are
+    sent as NDJSON while they are read.
+    """
     try:
-        if not Path(vcf_path).exists():
+        if not Path(request.vcf_path).exists():
             raise HTTPException(status_code=404, detail="VCF file not found")
-        
-        vcf = pysam.VariantFile(vcf_path)
-        
-        # Collect statistics
-        total_regions = 0
-        motif_size_counts = {}  # max_motif_size -> count
-        motif_lengths = []  # all motif lengths for distribution
-        regions_by_chromosome = {}
-        genotype_counts = {}  # genotype -> count
-        
-        # Get all chromosomes from the VCF header to ensure we read all records
-        # This is important for large indexed VCF files where fetch() without args might miss records
-        chromosomes = list(vcf.header.contigs.keys())
-        
-        # If we have chromosomes, iterate through each one explicitly
-        # This ensures we read ALL records, even in very large indexed VCF files
-        if chromosomes:
-            for chrom in chromosomes:
-                try:
-                    for rec in vcf.fetch(chrom):
-                        total_regions += 1
-                        
-                        # Get motifs from INFO field
-                        motifs = rec.info.get('MOTIFS', [])
-                        if isinstance(motifs, tuple):
-                            motifs = list(motifs)
-                        elif not isinstance(motifs, list):
-                            motifs = [motifs] if motifs else []
-                        
-                        # Calculate max motif size for this region
-                        max_motif_size = 0
-                        if motifs:
-                            motif_lengths_in_region = [len(str(m)) for m in motifs if m]
-                            if motif_lengths_in_region:
-                                max_motif_size = max(motif_lengths_in_region)
-                                motif_lengths.extend(motif_lengths_in_region)
-                        
-                        # Categorize motif size
-                        if max_motif_size == 0:
-                            category = "Unknown"
-                        elif max_motif_size <= 10:
-                            category = str(max_motif_size)
-                        else:
-                            category = ">10"
-                        motif_size_counts[category] = motif_size_counts.get(category, 0) + 1
-                        
-                        # Count by chromosome
-                        chrom_name = rec.chrom
-                        regions_by_chromosome[chrom_name] = regions_by_chromosome.get(chrom_name, 0) + 1
-                        
-                        # Extract genotype information
-                        if len(rec.samples) > 0 and 'GT' in rec.samples[0]:
-                            gt = rec.samples[0]['GT']
-                            if gt is not None:
-                                if isinstance(gt, tuple):
-                                    gt_str = '/'.join([str(g) if g is not None else '.' for g in gt])
-                                elif isinstance(gt, list):
-                                    gt_str = '/'.join([str(g) if g is not None else '.' for g in gt])
-                                else:
-                                    gt_str = str(gt)
-                                genotype_counts[gt_str] = genotype_counts.get(gt_str, 0) + 1
-                except (ValueError, KeyError):
-                    # Skip chromosomes that don't exist or can't be fetched
-                    continue
-        else:
-            # Fallback: if no chromosomes in header, use fetch() without arguments
-            for rec in vcf.fetch():
-                total_regions += 1
-                
-                # Get motifs from INFO field
-                motifs = rec.info.get('MOTIFS', [])
-                if isinstance(motifs, tuple):
-                    motifs = list(motifs)
-                elif not isinstance(motifs, list):
-                    motifs = [motifs] if motifs else []
-                
-                # Calculate max motif size for this region
-                max_motif_size = 0
-                if motifs:
-                    motif_lengths_in_region = [len(str(m)) for m in motifs if m]
-                    if motif_lengths_in_region:
-                        max_motif_size = max(motif_lengths_in_region)
-                        motif_lengths.extend(motif_lengths_in_region)
-                
-                # Categorize motif size
-                if max_motif_size == 0:
-                    category = "Unknown"
-                elif max_motif_size <= 10:
-                    category = str(max_motif_size)
-                else:
-                    category = ">10"
-                motif_size_counts[category] = motif_size_counts.get(category, 0) + 1
-                
-                # Count by chromosome
-                chrom = rec.chrom
-                regions_by_chromosome[chrom] = regions_by_chromosome.get(chrom, 0) + 1
-                
-                # Extract genotype information
-                if len(rec.samples) > 0 and 'GT' in rec.samples[0]:
-                    gt = rec.samples[0]['GT']
-                    if gt is not None:
-                        if isinstance(gt, tuple):
-                            gt_str = '/'.join([str(g) if g is not None else '.' for g in gt])
-                        elif isinstance(gt, list):
-                            gt_str = '/'.join([str(g) if g is not None else '.' for g in gt])
+        if len(request.regions) + len(request.ids) > MAX_BATCH_REGIONS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_REGIONS} regions per batch")
+
+        queries = _batch_queries(request)
+        regions = [region for _, region in queries if region is not None]
+        missing = [query for query, region in queries if region is None]
+
+        if request.stream:
+            queries_by_region: Dict[str, List[str]] = {}
+            for query, region in queries:
+                if region is not None:
+                    queries_by_region.setdefault(region, []).append(query)
+
+            def ndjson():
+                found = 0
+                for region, record in _read_region_batch(request.vcf_path, regions):
+                    for query in queries_by_region[region]:
+                        if record is None:
+                            missing.append(query)
                         else:
-                            gt_str = str(gt)
-                        genotype_counts[gt_str] = genotype_counts.get(gt_str, 0) + 1
-        
-        vcf.close()
-        
-        # Calculate average and max motif sizes
-        avg_motif_size = sum(motif_lengths) / len(motif_lengths) if motif_lengths else 0
-        max_overall_motif_size = max(motif_lengths) if motif_lengths else 0
-        
-        # Bin motif lengths for histogram (to avoid sending huge arrays to frontend)
-        motif_length_histogram = {}
-        if motif_lengths:
-            min_len = min(motif_lengths)
-            max_len = max(motif_lengths)
-            
-            if min_len == max_len:
-                # All values are the same
-                motif_length_histogram = {str(int(min_len)): len(motif_lengths)}
-            else:
-                # Determine number of bins (between 15 and 30 for good histogram visualization)
-                num_bins = min(30, max(15, int(len(motif_lengths) ** 0.5)))
-                
-                # Round min/max to nice numbers for cleaner bins
-                # Use floor for min, ceiling for max to ensure all data is included
-                min_rounded = int(min_len)
-                max_rounded = int(max_len) + 1
-                range_size = max_rounded - min_rounded
-                
-                # Calculate bin width (ensure it's at least 1)
-                bin_width = max(1.0, range_size / num_bins)
-                # Round bin width to a nice number
-                if bin_width < 5:
-                    bin_width = round(bin_width)
-                else:
-                    bin_width = round(bin_width / 5) * 5
-                
-                # Create bins and count values
-                bins_dict = {}
-                for length in motif_lengths:
-                    # Calculate which bin this value belongs to
-                    bin_idx = int((length - min_rounded) / bin_width)
-                    bin_idx = min(bin_idx, num_bins - 1)  # Ensure it's within range
-                    
-                    # Calculate actual bin boundaries
-                    bin_start = min_rounded + (bin_idx * bin_width)
-                    bin_end = bin_start + bin_width
-                    
-                    # For the last bin, extend to include max value
-                    if bin_idx == num_bins - 1:
-                        bin_end = max_rounded
-                    
-                    # Create clean label
-                    bin_start_int = int(bin_start)
-                    bin_end_int = int(bin_end)
-                    
-                    if bin_end_int - bin_start_int <= 1:
-                        bin_label = str(bin_start_int)
-                    else:
-                        bin_label = f"{bin_start_int}-{bin_end_int-1}"
-                    
-                    bins_dict[bin_label] = bins_dict.get(bin_label, 0) + 1
-                
-                # Only include bins with data (for cleaner visualization)
-                motif_length_histogram = {k: v for k, v in bins_dict.items() if v > 0}
-        
+                            found += 1
+                        yield json.dumps({"query": query, "region": region, "record": record}) + "\n"
+                yield json.dumps({"done": True, "count": found, "missing": missing}) + "\n"
+
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+        loop = asyncio.get_running_loop()
+        records = await loop.run_in_executor(None, lambda: dict(_read_region_batch(request.vcf_path, regions)))
+        results = []
+        for query, region in queries:
+            record = records.get(region) if region is not None else None
+            if region is not None and record is None:
+                missing.append(query)
+            results.append({"query": query, "region": region, "record": record})
         return {
             "success": True,
-            "total_regions": total_regions,
-            "num_chromosomes": len(regions_by_chromosome),
-            "avg_motif_size": round(avg_motif_size, 1),
-            "max_motif_size": max_overall_motif_size,
-            "motif_size_counts": motif_size_counts,
-            "motif_length_histogram": motif_length_histogram,  # Changed from motif_lengths array to binned histogram
-            "regions_by_chromosome": regions_by_chromosome,
-            "genotype_counts": genotype_counts
+            "records": results,
+            "count": len(results) - len(missing),
+            "missing": missing
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters of the region record cache and the open VCF handle pool"""
+    return {
+        "success": True,
+        "region_records": record_cache.stats(),
+        "population_frequencies": frequency_cache.stats(),
+        "vcf_handles": variant_files.stats(),
+        "workers": worker_pool.stats()
+    }
+
+def _counts_in_file_order(codes: np.ndarray, label) -> Dict[str, int]:
+    """Count per code, keyed by label(code) in order of first appearance (like a scan through the file)"""
+    if not len(codes):
+        return {}
+    values, first_rows, counts = np.unique(codes, return_index=True, return_counts=True)
+    return {label(int(values[i])): int(counts[i]) for i in np.argsort(first_rows)}
+
+def _motif_size_category(size: int) -> str:
+    if size == 0:
+        return "Unknown"
+    return str(size) if size <= 10 else ">10"
+
+def _motif_length_histogram(motif_length_counts: Dict[int, int]) -> Dict[str, int]:
+    """Bin motif lengths for histogram (to avoid sending huge arrays to frontend)"""
+    total = sum(motif_length_counts.values())
+    if not total:
+        return {}
+    min_len = min(motif_length_counts)
+    max_len = max(motif_length_counts)
+
+    if min_len == max_len:
+        # All values are the same
+        return {str(int(min_len)): total}
+
+    # Determine number of bins (between 15 and 30 for good histogram visualization)
+    num_bins = min(30, max(15, int(total ** 0.5)))
+
+    # Round min/max to nice numbers for cleaner bins
+    # Use floor for min, ceiling for max to ensure all data is included
+    min_rounded = int(min_len)
+    max_rounded = int(max_len) + 1
+    range_size = max_rounded - min_rounded
+
+    # Calculate bin width (ensure it's at least 1)
+    bin_width = max(1.0, range_size / num_bins)
+    # Round bin width to a nice number
+    if bin_width < 5:
+        bin_width = round(bin_width)
+    else:
+        bin_width = round(bin_width / 5) * 5
+
+    # Create bins and count values
+    bins_dict = {}
+    for length in sorted(motif_length_counts):
+        # Calculate which bin this value belongs to
+        bin_idx = int((length - min_rounded) / bin_width)
+        bin_idx = min(bin_idx, num_bins - 1)  # Ensure it's within range
+
+        # Calculate actual bin boundaries
+        bin_start = min_rounded + (bin_idx * bin_width)
+        bin_end = bin_start + bin_width
+
+        # For the last bin, extend to include max value
+        if bin_idx == num_bins - 1:
+            bin_end = max_rounded
+
+        # Create clean label
+        bin_start_int = int(bin_start)
+        bin_end_int = int(bin_end)
+
+        if bin_end_int - bin_start_int <= 1:
+            bin_label = str(bin_start_int)
+        else:
+            bin_label = f"{bin_start_int}-{bin_end_int-1}"
+
+        bins_dict[bin_label] = bins_dict.get(bin_label, 0) + motif_length_counts[length]
+
+    # Only include bins with data (for cleaner visualization)
+    return {k: v for k, v in bins_dict.items() if v > 0}
+
+async def _statistics_index(vcf_path: str) -> RegionIndex:
+    """
+    Index to compute statistics from, without registering the file as loaded: the loaded
+    index if it is current, else the sidecar, else a scan (which writes the sidecar)
+    """
+    job = load_jobs.running("vcf-load", vcf_path)
+    if job is not None:
+        await _wait_for_load(job)
+    fingerprint = file_fingerprint(vcf_path)
+    index = vcf_cache.get(vcf_path)
+    if index is not None and index.fingerprint == fingerprint and not index.loading:
+        return index
+    index = load_sidecar(vcf_path, fingerprint)
+    if index is None:
+        loop = asyncio.get_running_loop()
+        index = await loop.run_in_executor(_load_executor, _scan_index, vcf_path, fingerprint)
+    return index
+
+def _statistics_from_index(index: RegionIndex) -> Dict[str, Any]:
+    """Dashboard statistics as vectorized counts over the loaded index columns"""
+    motif_lengths = index.motif_lengths()
+    motif_length_counts = motif_lengths.items()
+
+    # motif size category per region: 0 -> Unknown, 1..10, 11 -> >10
+    categories = np.minimum(index.motif_size, 11)
+    regions_by_chromosome = _counts_in_file_order(index.chrom_codes, lambda c: index.chroms[c])
+
+    # copy number quantiles are exact, the per-haplotype values are index columns anyway
+    cn_values = np.concatenate([index.cn_h1, index.cn_h2])
+    cn_values = cn_values[~np.isnan(cn_values)]
+    if len(cn_values):
+        cn_quantiles = dict(zip(STATISTICS_QUANTILE_KEYS,
+                                (round(float(v), 2) for v in np.quantile(cn_values, STATISTICS_QUANTILES))))
+    else:
+        cn_quantiles = dict.fromkeys(STATISTICS_QUANTILE_KEYS)
+    allele_summary = index.allele_length_summary()
+    allele_mean = allele_summary.mean()
+
+    return {
+        "success": True,
+        "total_regions": len(index),
+        "num_chromosomes": len(regions_by_chromosome),
+        "avg_motif_size": round(motif_lengths.mean(), 1),
+        "max_motif_size": motif_lengths.max(),
+        "motif_size_counts": _counts_in_file_order(categories, _motif_size_category),
+        "motif_length_histogram": _motif_length_histogram(motif_length_counts),  # Changed from motif_lengths array to binned histogram
+        "regions_by_chromosome": regions_by_chromosome,
+        # './.' calls are counted as './.' (so are records without a GT field, the index doesn't tell them apart)
+        "genotype_counts": _counts_in_file_order(index.genotype_codes, lambda g: index.genotypes[g]),
+        "cn_quantiles": cn_quantiles,
+        # allele length quantiles are approximate (within 1%), mean and max are exact
+        "allele_length": {
+            "mean": round(allele_mean, 1) if allele_mean is not None else None,
+            "max": int(allele_summary.max) if allele_summary.max is not None else None,
+            "quantiles": index.allele_lengths().quantiles(STATISTICS_QUANTILES),
+        },
+    }
+
+@app.get("/api/vcf/statistics")
+async def get_vcf_statistics(vcf_path: str):
+    """
+    Get comprehensive statistics about the VCF file. Computed from the loaded region
+    index, or from the sidecar (scanning the file if there is none) without loading the
+    file, and memoized per file fingerprint, so opening the dashboard doesn't rescan the file.
+    """
+    try:
+        if not Path(vcf_path).exists():
+            raise HTTPException(status_code=404, detail="VCF file not found")
+
+        index = await _statistics_index(vcf_path)
+
+        stats_key = fingerprint_key(index.fingerprint)
+        stats = _statistics_cache.get(stats_key)
+        if stats is None:
+            stats = _statistics_from_index(index)
+            _statistics_cache[stats_key] = stats
+            while len(_statistics_cache) > STATISTICS_CACHE_SIZE:
+                _statistics_cache.pop(next(iter(_statistics_cache)))
+        return stats
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 class PopulationLoadRequest(BaseModel):
     folder_path: str
 
@@ -1049,10 +1330,10 @@ def process_vcf_file_for_loading(args):
     file_path_str = args
     try:
         file_path = Path(file_path_str)
-        # Open VCF to extract sample name from header
-        vcf = pysam.VariantFile(str(file_path))
-        samples = list(vcf.header.samples)
-        vcf.close()
+        # Open VCF to extract sample name from header (and the contigs with records, from its index)
+        with variant_files.open(str(file_path)) as vcf:
+            samples = list(vcf.header.samples)
+            contigs = list(vcf.index) if vcf.index is not None else None
         
         # Use sample name from VCF header, or filename if no samples
         if samples:
@@ -1067,157 +1348,315 @@ def process_vcf_file_for_loading(args):
         return {
             'filename': file_path.name,
             'sample_name': sample_name,
+            # all header samples, joint-called files have more than one
+            'samples': samples,
             'base_sample_name': base_name if is_haplotype else sample_name,
             'is_haplotype': is_haplotype,
             'haplotype_suffix': hap_suffix if is_haplotype else '',
-            'path': str(file_path)
+            'path': str(file_path),
+            'contigs': contigs,
+            # only known after a full pass over the file (see extract_regions_from_vcf_file)
+            'record_count': None
         }
     except Exception as e:
         # Skip files that can't be opened
         print(f"Warning: Could not read VCF header from {file_path_str}: {e}")
         return None
 
-@app.post("/api/population/load")
-async def load_population_vcf_files(request: PopulationLoadRequest):
-    """Load population/cohort VCF files from a folder with parallel processing"""
+def _read_cohort_headers(paths: List[str]):
+    """Sample info for each file, read on the file's worker (yields None for unreadable files)"""
+    future_to_file = {worker_pool.submit(process_vcf_file_for_loading, path, affinity=path): path for path in paths}
+    for future in as_completed(future_to_file):
+        try:
+            yield future.result()
+        except Exception as e:
+            print(f"Error processing {future_to_file[future]}: {e}")
+            yield None
+
+def _cohort_manifest(folder_path: str) -> CohortManifest:
+    key = str(Path(folder_path).resolve())
+    manifest = cohort_manifests.get(key)
+    if manifest is None:
+        manifest = cohort_manifests[key] = CohortManifest.load(folder_path)
+    return manifest
+
+def _refresh_cohort_manifest(folder_path: str) -> Tuple[CohortManifest, int, int]:
+    """Bring the folder's manifest up to date (stat every file, re-read changed headers) and cache its sample info"""
+    manifest = _cohort_manifest(folder_path)
+    rescanned, dropped = manifest.refresh(_read_cohort_headers)
+    manifest.save()
+    cohort_sample_cache[str(folder_path)] = manifest.samples()
+    return manifest, rescanned, dropped
+
+def _cohort_sample_info(folder_path: str) -> List[Dict[str, Any]]:
+    """Sample info from the in-memory cache, else from the (refreshed) manifest"""
+    cached = cohort_sample_cache.get(str(folder_path))
+    if cached is not None:
+        return cached
+    return _refresh_cohort_manifest(folder_path)[0].samples()
+
+@app.post("/api/population/load")
+async def load_population_vcf_files(request: PopulationLoadRequest):
+    """Load population/cohort VCF files from a folder with parallel processing"""
+    try:
+        folder_path = Path(request.folder_path)
+        if not folder_path.exists() or not folder_path.is_dir():
+            raise HTTPException(status_code=404, detail="Folder not found or is not a directory")
+        
+        # headers are only read for files that are new or changed since the manifest was written
+        manifest, rescanned, dropped = _refresh_cohort_manifest(str(folder_path))
+        sample_info = manifest.samples()
+        if not sample_info:
+            raise HTTPException(status_code=404, detail="No VCF files found in the folder")
+        vcf_files = [info['filename'] for info in sample_info]
+        print(f"Cohort manifest: {len(sample_info)} files, {rescanned} header(s) read, {dropped} dropped")
+
+        return {
+            "success": True,
+            "file_count": len(vcf_files),
+            "files": vcf_files,
+            "sample_info": sample_info,
+            "folder_path": str(folder_path),
+            "headers_read": rescanned
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _collect_population_regions(folder_path: str) -> Tuple[RegionUnion, bool]:
+    """
+    Union of the regions of all files in the cohort folder, in chromosome/position order, and
+    whether it came from the in-memory cache. Built by a windowed k-way merge of per-file sorted
+    keys (see cohort_regions.py) and persisted next to the cohort manifest.
+    """
+    folder = Path(folder_path)
+    if not folder.exists():
+        raise HTTPException(status_code=404, detail="Population folder not found")
+
+    # VCF files of the folder, from the (stat-validated) cohort manifest
+    manifest = _refresh_cohort_manifest(folder_path)[0]
+    content_key = manifest.content_key()
+
+    # Check cache first
+    cache_key = str(folder_path)
+    cached = cohort_regions_cache.get(cache_key)
+    if cached is not None and cached.content_key == content_key:
+        return cached, True
+
+    union = load_union(manifest)
+    if union is None:
+        file_paths = [info['path'] for info in manifest.samples()]
+        if not file_paths:
+            raise HTTPException(status_code=404, detail="No VCF files found in the folder")
+
+        # each worker reduces its files to sorted per-contig keys, the merge runs here
+        collector = SpillingCollector()
+        try:
+            future_to_file = {worker_pool.submit(file_region_keys, file_path, affinity=file_path): file_path
+                              for file_path in file_paths}
+            for future in as_completed(future_to_file):
+                try:
+                    part = future.result()
+                except Exception as e:
+                    print(f"Error extracting regions from {future_to_file[future]}: {e}")
+                    continue
+                collector.add(part)
+                manifest.set_record_count(part.path, part.record_count, part.signature)
+            union, target = build_union(folder_path, collector.parts, content_key)
+            if collector.spilled:
+                print(f"Region merge for {folder_path} spilled to disk")
+        finally:
+            collector.close()
+        if target is not None:
+            manifest.set_extra('regions', describe_union(union, target))
+        manifest.save()
+        print(f"Merged {len(union):,} cohort regions from {len(file_paths)} files")
+
+    cohort_regions_cache[cache_key] = union
+    return union, False
+
+@app.get("/api/population/regions")
+async def get_population_regions(folder_path: str):
+    """Get all available regions from all VCF files in a cohort folder for autocomplete"""
+    try:
+        union, cached = _collect_population_regions(folder_path)
+        regions = union.regions()
+        return {
+            "success": True,
+            "regions": regions,
+            "count": len(regions),
+            "cached": cached
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/population/search")
+async def search_population_regions(folder_path: str, q: str, limit: int = DEFAULT_SEARCH_RESULTS):
+    """Top matches for a partial region query (chr4:31, chr4:3100-3200, gene) across a cohort"""
+    try:
+        union, _ = _collect_population_regions(folder_path)
+        cached = cohort_search_cache.get(str(folder_path))
+        if cached is None or cached[0] is not union:
+            cached = (union, RegionSearch(union.contigs, *union.columns()))
+            cohort_search_cache[str(folder_path)] = cached
+        results = cached[1].search(q, limit, genes=_catalog_genes_matching(q, limit))
+        return {
+            "success": True,
+            "query": q,
+            "results": results,
+            "count": len(results)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class ConsolidateRequest(BaseModel):
+    folder_path: str
+    background: bool = True  # return a job id immediately instead of waiting for the build
+
+def _read_sample_values(paths: List[str]):
+    """SampleValues of each file (one per header sample), read on the file's worker (None for unreadable files)"""
+    future_to_file = {worker_pool.submit(sample_values, path, affinity=path): path for path in paths}
+    for future in as_completed(future_to_file):
+        try:
+            yield future.result()
+        except Exception as e:
+            print(f"Error reading {future_to_file[future]} for the cohort matrix: {e}")
+            yield None
+
+def _run_consolidate_job(job: Job, folder_path: str):
+    """Build (or incrementally update) the cohort matrix on a worker thread"""
+    try:
+        manifest = _refresh_cohort_manifest(folder_path)[0]
+        summary = consolidate(manifest, _read_sample_values, on_progress=job.update)
+        cohort_matrix_cache.pop(str(Path(folder_path).resolve()), None)
+        print(f"Consolidated cohort {folder_path}: {summary}")
+        job.finish({"success": True, "folder_path": folder_path, **summary})
+    except Exception as e:
+        print(f"Error consolidating cohort: {e}")
+        import traceback
+        traceback.print_exc()
+        job.fail(str(e))
+
+def _cohort_matrix(folder_path: str) -> Tuple[CohortMatrix, int]:
+    """
+    Loaded matrix of the cohort (404 if never built) and how many files differ from it,
+    as of the manifest's last refresh (/api/population/load or a consolidation)
+    """
+    manifest = _cohort_manifest(folder_path)
+    key = str(Path(folder_path).resolve())
+    matrix = cohort_matrix_cache.get(key)
+    if matrix is None or matrix.meta is not manifest.get_extra('matrix'):
+        matrix = CohortMatrix.from_manifest(manifest)
+        if matrix is None:
+            raise HTTPException(status_code=404,
+                                detail="Cohort matrix not built yet, run /api/population/consolidate first")
+        cohort_matrix_cache[key] = matrix
+    return matrix, matrix.stale_files(manifest)
+
+def _json_floats(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(v) else round(float(v), 2) for v in values]
+
+def _json_ints(values: np.ndarray) -> List[Optional[int]]:
+    return [None if v < 0 else int(v) for v in values]
+
+@app.post("/api/population/consolidate")
+async def consolidate_population(request: ConsolidateRequest):
+    """
+    Build the cohort's locus x sample matrix (CN per haplotype, genotype, allele length) so
+    cross-sample queries don't parse every VCF. Only chunks with new or changed files are
+    rebuilt. Runs as a background job, poll /api/population/consolidate/{job_id}.
+    """
+    try:
+        folder = Path(request.folder_path)
+        if not folder.exists() or not folder.is_dir():
+            raise HTTPException(status_code=404, detail="Folder not found or is not a directory")
+        job = load_jobs.running("cohort-consolidate", str(folder))
+        if job is None:
+            job = load_jobs.create("cohort-consolidate", str(folder))
+            _load_executor.submit(_run_consolidate_job, job, str(folder))
+        if request.background:
+            return {
+                "success": True,
+                "job_id": job.id,
+                "status": job.status,
+                "message": "Consolidation started"
+            }
+        await _wait_for_load(job)
+        return {**job.result, "job_id": job.id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/population/consolidate/{job_id}")
+async def get_consolidate_job_status(job_id: str):
+    """Progress of a cohort consolidation job (files read, chunks kept/total)"""
+    job = load_jobs.get(job_id)
+    if job is None or job.kind != "cohort-consolidate":
+        raise HTTPException(status_code=404, detail="Consolidation job not found")
+    return job.to_dict()
+
+@app.get("/api/population/matrix/locus")
+async def get_population_matrix_locus(folder_path: str, region: str):
+    """All samples' values at one locus, sliced from the consolidated cohort matrix"""
     try:
-        folder_path = Path(request.folder_path)
-        if not folder_path.exists() or not folder_path.is_dir():
-            raise HTTPException(status_code=404, detail="Folder not found or is not a directory")
-        
-        # Find all VCF files (.vcf.gz or .vcf)
-        all_vcf_files = [f for f in folder_path.iterdir() 
-                        if f.is_file() and (f.name.endswith('.vcf.gz') or f.name.endswith('.vcf'))]
-        
-        if not all_vcf_files:
-            raise HTTPException(status_code=404, detail="No VCF files found in the folder")
-        
-        vcf_files = []
-        sample_info = []
-        
-        # Process files in parallel using ProcessPoolExecutor for true parallelism
-        file_paths = [str(f) for f in all_vcf_files]
-        
-        with ProcessPoolExecutor(max_workers=COHORT_WORKERS) as executor:
-            # Submit all tasks
-            future_to_file = {executor.submit(process_vcf_file_for_loading, file_path): file_path 
-                            for file_path in file_paths}
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_file):
-                try:
-                    result = future.result()
-                    if result is not None:
-                        vcf_files.append(result['filename'])
-                        sample_info.append(result)
-                except Exception as e:
-                    file_path = future_to_file[future]
-                    print(f"Error processing {file_path}: {e}")
-                    continue
-        
-        # Cache sample info for fast access later
-        cohort_sample_cache[str(folder_path)] = sample_info
-        
+        matrix, stale = _cohort_matrix(folder_path)
+        values = matrix.locus(region)
+        if values is None:
+            raise HTTPException(status_code=400, detail="Invalid region format")
         return {
             "success": True,
-            "file_count": len(vcf_files),
-            "files": vcf_files,
-            "sample_info": sample_info,
-            "folder_path": str(folder_path)
+            "region": region,
+            "samples": matrix.sample_names,
+            "present": values['present'].tolist(),
+            "cn_h1": _json_floats(values['cn_h1']),
+            "cn_h2": _json_floats(values['cn_h2']),
+            "genotype": [matrix.genotypes[g] if g >= 0 else None for g in values['genotype']],
+            "allele_length_h1": _json_ints(values['allele_len_h1']),
+            "allele_length_h2": _json_ints(values['allele_len_h2']),
+            "stale_files": stale
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def extract_regions_from_vcf_file(args):
-    """Helper function to extract regions from a single VCF file - used for parallel processing"""
-    vcf_file_path = args
-    try:
-        regions = set()
-        vcf = pysam.VariantFile(str(vcf_file_path))
-        for rec in vcf.fetch():
-            region_str = f"{rec.chrom}:{rec.pos}-{rec.stop}"
-            regions.add(region_str)
-        vcf.close()
-        return list(regions)
-    except Exception as e:
-        print(f"Warning: Could not read regions from {vcf_file_path}: {e}")
-        return []
-
-@app.get("/api/population/regions")
-async def get_population_regions(folder_path: str):
-    """Get all available regions from all VCF files in a cohort folder for autocomplete"""
+@app.get("/api/population/matrix/expanded")
+async def get_population_expanded_samples(folder_path: str, region: str, cn_min: float):
+    """Samples whose larger haplotype CN at the locus is at least cn_min, plus the locus CN distribution"""
     try:
-        folder = Path(folder_path)
-        if not folder.exists():
-            raise HTTPException(status_code=404, detail="Population folder not found")
-        
-        # Check cache first
-        cache_key = str(folder_path)
-        if cache_key in cohort_regions_cache:
-            cached_regions = cohort_regions_cache[cache_key]
-            return {
-                "success": True,
-                "regions": cached_regions,
-                "count": len(cached_regions),
-                "cached": True
-            }
-        
-        # Find all VCF files in the folder (.vcf.gz or .vcf)
-        vcf_files = list(folder.glob("*.vcf.gz")) + list(folder.glob("*.vcf"))
-        
-        if not vcf_files:
-            raise HTTPException(status_code=404, detail="No VCF files found in the folder")
-        
-        # Process files in parallel - MUCH faster than sequential
-        all_regions = set()
-        file_paths = [str(f) for f in vcf_files]
-        
-        # Use ProcessPoolExecutor for parallel processing
-        with ProcessPoolExecutor(max_workers=COHORT_WORKERS) as executor:
-            future_to_file = {executor.submit(extract_regions_from_vcf_file, file_path): file_path 
-                            for file_path in file_paths}
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_file):
-                try:
-                    regions = future.result()
-                    all_regions.update(regions)
-                except Exception as e:
-                    file_path = future_to_file[future]
-                    print(f"Error extracting regions from {file_path}: {e}")
-                    continue
-        
-        # Sort regions properly by chromosome and position
-        def sort_region(region_str):
-            """Parse region string and return sortable tuple"""
-            match = re.match(r'^([^:]+):(\d+)-(\d+)$', region_str)
-            if not match:
-                return (999, '', 0, 0)
-            chr_name = match.group(1)
-            start = int(match.group(2))
-            end = int(match.group(3))
-            # Extract numeric part of chromosome for proper sorting
-            chr_num_str = chr_name.replace('chr', '').replace('Chr', '').replace('CHR', '')
-            try:
-                chr_num = int(chr_num_str)
-            except ValueError:
-                # Handle X, Y, M, etc.
-                chr_map = {'X': 23, 'Y': 24, 'M': 25, 'MT': 25}
-                chr_num = chr_map.get(chr_num_str.upper(), 999)
-            return (chr_num, chr_name, start, end)
-        
-        sorted_regions = sorted(list(all_regions), key=sort_region)
-        
-        # Cache the results
-        cohort_regions_cache[cache_key] = sorted_regions
-        
+        matrix, stale = _cohort_matrix(folder_path)
+        values = matrix.locus(region)
+        if values is None:
+            raise HTTPException(status_code=400, detail="Invalid region format")
+        cn = np.fmax(values['cn_h1'], values['cn_h2'])
+        called = ~np.isnan(cn)
+        expanded = np.flatnonzero(called & (cn >= cn_min))
+        expanded = expanded[np.argsort(-cn[expanded], kind='stable')]
+        haplotype_cn = np.concatenate([values['cn_h1'], values['cn_h2']])
+        haplotype_cn = haplotype_cn[~np.isnan(haplotype_cn)]
+        if len(haplotype_cn):
+            quantiles = dict(zip(STATISTICS_QUANTILE_KEYS,
+                                 (round(float(v), 2) for v in np.quantile(haplotype_cn, STATISTICS_QUANTILES))))
+        else:
+            quantiles = dict.fromkeys(STATISTICS_QUANTILE_KEYS)
         return {
             "success": True,
-            "regions": sorted_regions,
-            "count": len(sorted_regions),
-            "cached": False
+            "region": region,
+            "cn_min": cn_min,
+            "samples_called": int(called.sum()),
+            "expanded": [{"sample": matrix.sample_names[i], "cn_max": round(float(cn[i]), 2)} for i in expanded],
+            "cn_distribution": {
+                "quantiles": quantiles,
+                "mean": round(float(haplotype_cn.mean()), 2) if len(haplotype_cn) else None,
+                "max": round(float(haplotype_cn.max()), 2) if len(haplotype_cn) else None
+            },
+            "stale_files": stale
         }
     except HTTPException:
         raise
@@ -1230,15 +1669,13 @@ def get_sample_id_only(args):
     # REMOVED: Debug logging was causing significant performance issues
     try:
         vcf_file = Path(vcf_file_path)
-        # Extract sample name from VCF header
-        vcf = pysam.VariantFile(str(vcf_file))
-        samples = list(vcf.header.samples)
-        
-        # Check if region exists (quick check without full parsing)
-        record_iter = vcf.fetch(region=region_str)
-        rec = next(record_iter, None)
-        vcf.close()
-        
+        with variant_files.open(str(vcf_file)) as vcf:
+            # Extract sample name from VCF header
+            samples = list(vcf.header.samples)
+
+            # Check if region exists (quick check without full parsing)
+            rec = next(vcf.fetch(region=region_str), None)
+
         if rec is None:
             return None
         
@@ -1288,80 +1725,118 @@ def is_haplotype_specific_name(name: str):
     
     return (False, name, '')
 
-def process_single_vcf_file(args):
-    """Helper function to process a single VCF file - used for parallel processing"""
-    vcf_file_path, region_str, cohort_mode = args
-    try:
-        vcf_file = Path(vcf_file_path)
-        # Extract sample name from VCF header
-        vcf = pysam.VariantFile(str(vcf_file))
-        samples = list(vcf.header.samples)
-        vcf.close()
-        
-        # Use sample name from VCF header, or filename if no samples
-        if samples:
-            sample_name = samples[0]  # Use first sample name
-        else:
-            # Fallback to filename without extension
-            sample_name = vcf_file.stem.replace('.vcf', '')
-        
-        # Parse region to check chromosome
-        region_parts = region_str.split(':')
-        chrom = region_parts[0] if len(region_parts) > 0 else ''
-        is_sex_chrom = chrom.upper() in ['X', 'Y', 'CHRX', 'CHRY']
-        
-        # Use the mode parameter to determine parsing strategy
-        # cohort_mode can be 'cohort-read' (diploid) or 'cohort-assembly' (single haplotype)
-        record = None
+# header sample names of the VCFs this process has parsed regions from: path -> (size, mtime_ns, names)
+_file_sample_names: Dict[str, Tuple[int, int, List[str]]] = {}
+
+def _is_sex_chromosome(chrom: str) -> bool:
+    return chrom.upper() in ['X', 'Y', 'CHRX', 'CHRY']
+
+def parse_cohort_records(vcf_file: str, region_str: str, cohort_mode: Optional[str] = None,
+                         sample_names: Optional[List[str]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    (sample name, parsed record) for every sample of the file (or only sample_names) at the first
+    record of region_str, opening and fetching once however many samples the file has.
+    cohort_mode 'cohort-read' parses it as diploid, 'cohort-assembly' as a single haplotype; without
+    a mode the layout is detected from this record's GT (sex chromosomes are always single haplotype).
+    The header sample names are remembered per file until it changes.
+    """
+    st = os.stat(vcf_file)
+    cached = _file_sample_names.get(vcf_file)
+    if cached is not None and cached[:2] != (st.st_size, st.st_mtime_ns):
+        cached = None
+    with variant_files.open(vcf_file) as vcf:
+        if cached is None:
+            # Use sample names from VCF header, or filename if no samples
+            names = list(vcf.header.samples) or [Path(vcf_file).stem.replace('.vcf', '')]
+            cached = _file_sample_names[vcf_file] = (st.st_size, st.st_mtime_ns, names)
+        names = cached[2]
+        rec = next(vcf.fetch(region=region_str), None)
+        if rec is None:
+            return []
+
         if cohort_mode == 'cohort-read':
-            # Read-based mode: use diploid parsing (parse_record)
-            record = parse_record(str(vcf_file), region_str)
-        elif cohort_mode == 'cohort-assembly':
-            # Assembly-based mode: use assembly parsing (parse_record_assembly)
-            record = parse_record_assembly(str(vcf_file), region_str)
+            parse = _parse_diploid_record
+        elif cohort_mode == 'cohort-assembly' or _is_sex_chromosome(rec.chrom):
+            parse = _parse_assembly_record
+        else:
+            # per record: a missing call ('.') reads as haploid even in a diploid file
+            gt = rec.samples[0].get('GT', None) if len(rec.samples) > 0 else None
+            is_diploid_gt = isinstance(gt, (tuple, list)) and len(gt) == 2
+            parse = _parse_diploid_record if is_diploid_gt else _parse_assembly_record
+
+        if sample_names is None:
+            indexes = range(len(names))
         else:
-            # Fallback: auto-detect based on GT field (for backward compatibility)
+            wanted = set(sample_names)
+            indexes = [i for i, name in enumerate(names) if name in wanted]
+        records = []
+        for i in indexes:
             try:
-                vcf_check = pysam.VariantFile(str(vcf_file))
-                record_iter = vcf_check.fetch(region=region_str)
-                rec_check = next(record_iter, None)
-                vcf_check.close()
-                
-                if rec_check:
-                    gt_check = rec_check.samples[0].get('GT', None)
-                    is_diploid_gt = isinstance(gt_check, (tuple, list)) and len(gt_check) == 2
-                    
-                    if is_sex_chrom:
-                        record = parse_record_assembly(str(vcf_file), region_str)
-                    elif is_diploid_gt:
-                        record = parse_record(str(vcf_file), region_str)
-                    else:
-                        record = parse_record_assembly(str(vcf_file), region_str)
-                else:
-                    if is_sex_chrom:
-                        record = parse_record_assembly(str(vcf_file), region_str)
-                    else:
-                        record = parse_record(str(vcf_file), region_str)
-                        if not record:
-                            record = parse_record_assembly(str(vcf_file), region_str)
+                records.append((names[i], parse(rec, i)))
             except Exception as e:
-                # Fallback: try diploid first, then assembly
-                if is_sex_chrom:
-                    record = parse_record_assembly(str(vcf_file), region_str)
-                else:
-                    record = parse_record(str(vcf_file), region_str)
-                    if not record:
-                        record = parse_record_assembly(str(vcf_file), region_str)
-        
-        if record:
-            # REMOVED: Debug logging was causing significant performance issues
-            # Return with sample name
-            return (sample_name, record)
-        return None
+                # only this sample is skipped, the rest of the file is still returned
+                print(f"Warning: Could not parse sample {names[i]} of {vcf_file} for region {region_str}: {e}")
+        return records
+
+def process_single_vcf_file(args):
+    """
+    Helper function to process a single VCF file - used for parallel processing.
+    args is (path, region, cohort_mode) or (path, region, cohort_mode, sample names) for part of
+    a multi-sample file; returns a list of (sample name, record), one per sample with the region.
+    """
+    vcf_file_path, region_str, cohort_mode = args[:3]
+    sample_names = args[3] if len(args) > 3 else None
+    try:
+        # cohort_mode can be 'cohort-read' (diploid), 'cohort-assembly' (single haplotype) or None (auto-detect)
+        return parse_cohort_records(str(vcf_file_path), region_str, cohort_mode, sample_names)
     except Exception as e:
         # Skip files that can't be parsed or don't have the region
         print(f"Warning: Could not parse {vcf_file_path} for region {region_str}: {e}")
-        return None
+        return []
+
+def process_haplotype_pair(args):
+    """Worker task: both haplotype files of one sample -> [(sample name, diploid-shaped record)]"""
+    sample_name, h1_path, h2_path, region_str = args
+    record = parse_haplotype_pair(h1_path, h2_path, region_str)
+    return [(sample_name, record)] if record else []
+
+def _cohort_tasks(folder_path: str, region_str: str, mode: Optional[str], paired: bool,
+                  sample_names: Optional[List[str]] = None) -> List[Tuple[Any, tuple, str]]:
+    """
+    (worker task, args, affinity path) for the samples of the cohort, or only sample_names. Every
+    task returns a list of (sample name, record). With paired, the haplotype files of one sample
+    are one task returning a diploid record; multi-sample files are one task for all their samples.
+    """
+    samples = _cohort_sample_info(folder_path)
+    entries = pair_haplotype_files(samples) if paired else sample_files(samples)
+    if sample_names is not None:
+        by_name = {entry['sample_name']: entry for entry in entries}
+        entries = [by_name[name] for name in dict.fromkeys(sample_names) if name in by_name]
+    jobs = []
+    multi_sample: Dict[str, List[str]] = {}
+    for entry in entries:
+        paths = entry['paths']
+        if entry['multi_sample']:
+            multi_sample.setdefault(paths[0], []).append(entry['sample_name'])
+        elif len(paths) == 1:
+            jobs.append((process_single_vcf_file, (paths[0], region_str, mode), paths[0]))
+        else:
+            # both haplotypes are read on the worker of the first one
+            path = paths[0] or paths[1]
+            jobs.append((process_haplotype_pair, (entry['sample_name'], paths[0], paths[1], region_str), path))
+    for path, names in multi_sample.items():
+        # one fetch gives the record of every sample in the file
+        jobs.append((process_single_vcf_file, (path, region_str, mode, None if sample_names is None else names), path))
+    return jobs
+
+def _task_files(jobs: List[Tuple[Any, tuple, str]]) -> int:
+    """VCF files the cohort tasks read (a paired task reads both haplotype files)"""
+    return sum(sum(1 for path in args[1:3] if path) if task is process_haplotype_pair else 1
+               for task, args, _ in jobs)
+
+def _submit_cohort_tasks(jobs: List[Tuple[Any, tuple, str]]):
+    """Submit each task to the worker of its file, future -> file path"""
+    return {worker_pool.submit(task, args, affinity=path): path for task, args, path in jobs}
 
 def get_sample_names_from_one_file(folder_path: str):
     """Get all sample names from one VCF file in the folder (fast - just reads headers)"""
@@ -1402,26 +1877,13 @@ def get_sample_names_from_one_file(folder_path: str):
         print(f"Error getting sample names: {e}")
         return []
 
-def get_sample_name_from_file(vcf_file_path: str):
-    """Helper to get sample name from a single VCF file header (for parallel processing)"""
-    try:
-        vcf_file = Path(vcf_file_path)
-        vcf = pysam.VariantFile(str(vcf_file))
-        samples = list(vcf.header.samples)
-        vcf.close()
-        
-        sample_name = samples[0] if samples else vcf_file.stem.replace('.vcf', '')
-        return {
-            'sample_name': sample_name,
-            'file_path': str(vcf_file)
-        }
-    except Exception as e:
-        print(f"Warning: Could not read header from {vcf_file_path}: {e}")
-        return None
-
 @app.get("/api/population/region/{region_str}/ids")
-async def get_population_region_ids(region_str: str, folder_path: str, mode: str = 'cohort-read'):
-    """Get sample IDs by loading one sample first, then return all sample names from folder"""
+async def get_population_region_ids(region_str: str, folder_path: str, mode: str = 'cohort-read', paired: bool = False):
+    """
+    Get sample IDs by loading one sample first, then return all sample names from folder.
+    With paired, haplotype files are listed once per base sample (file_paths has h1 and h2)
+    and first_record is that sample's diploid-shaped record.
+    """
     import time
     start_time = time.time()
     
@@ -1430,37 +1892,17 @@ async def get_population_region_ids(region_str: str, folder_path: str, mode: str
         if not folder.exists():
             raise HTTPException(status_code=404, detail="Population folder not found")
         
-        # Try to use cached sample info first (from /api/population/load)
-        sample_ids = []
-        if str(folder_path) in cohort_sample_cache:
-            # Use cached sample info (much faster!)
-            cached_info = cohort_sample_cache[str(folder_path)]
-            sample_ids = [{'sample_name': info['sample_name'], 'file_path': info['path']} 
-                         for info in cached_info]
-            print(f"Using cached sample info: {len(sample_ids)} samples")
+        # sample info cached by /api/population/load, or from the cohort manifest
+        # (which only re-reads headers of files that changed since it was written)
+        # (joint-called files list every sample in their header)
+        if paired:
+            entries = pair_haplotype_files(_cohort_sample_info(folder_path))
+            sample_ids = [{'sample_name': pair['sample_name'], 'file_path': pair['paths'][0] or pair['paths'][1],
+                           'file_paths': pair['paths']}
+                          for pair in entries]
         else:
-            # Fallback: find all VCF files and read headers in parallel
-            vcf_files = list(folder.glob("*.vcf.gz")) + list(folder.glob("*.vcf"))
-            
-            if not vcf_files:
-                raise HTTPException(status_code=404, detail="No VCF files found in the folder")
-            
-            file_paths = [str(f) for f in vcf_files]
-            
-            # Use ProcessPoolExecutor to read headers in parallel
-            with ProcessPoolExecutor(max_workers=COHORT_WORKERS) as executor:
-                future_to_file = {executor.submit(get_sample_name_from_file, file_path): file_path 
-                                for file_path in file_paths}
-                
-                for future in as_completed(future_to_file):
-                    try:
-                        result = future.result()
-                        if result is not None:
-                            sample_ids.append(result)
-                    except Exception as e:
-                        file_path = future_to_file[future]
-                        print(f"Error getting sample name from {file_path}: {e}")
-                        continue
+            entries = sample_files(_cohort_sample_info(folder_path))
+            sample_ids = [{'sample_name': entry['sample_name'], 'file_path': entry['paths'][0]} for entry in entries]
         
         if not sample_ids:
             raise HTTPException(status_code=404, detail="No samples found")
@@ -1471,17 +1913,21 @@ async def get_population_region_ids(region_str: str, folder_path: str, mode: str
         first_sample_name = sample_ids[0]['sample_name']
         
         first_sample_start = time.time()
+        # sample of a multi-sample file is picked by name, else the file's only sample
+        first_sample = first_sample_name if entries[0]['multi_sample'] else 0
         try:
             # Use the mode parameter to determine parsing
-            if mode == 'cohort-read':
-                record = parse_record(first_file_path, region_str)
+            if paired and len(sample_ids[0]['file_paths']) == 2:
+                record = parse_haplotype_pair(*sample_ids[0]['file_paths'], region_str)
+            elif mode == 'cohort-read':
+                record = parse_record(first_file_path, region_str, first_sample)
             elif mode == 'cohort-assembly':
-                record = parse_record_assembly(first_file_path, region_str)
+                record = parse_record_assembly(first_file_path, region_str, first_sample)
             else:
                 # Fallback: try both
-                record = parse_record_assembly(first_file_path, region_str)
+                record = parse_record_assembly(first_file_path, region_str, first_sample)
                 if not record:
-                    record = parse_record(first_file_path, region_str)
+                    record = parse_record(first_file_path, region_str, first_sample)
             
             if record:
                 first_record = record
@@ -1504,13 +1950,79 @@ async def get_population_region_ids(region_str: str, folder_path: str, mode: str
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# formats the cohort record endpoints can stream in
+COHORT_STREAM_FORMATS = ('ndjson', 'sse')
+
+def _check_stream_format(stream: Optional[str]):
+    if stream is not None and stream not in COHORT_STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"stream must be one of {', '.join(COHORT_STREAM_FORMATS)}")
+
+def _stream_cohort_records(jobs: List[Tuple[Any, tuple, str]], stream: str,
+                           requested: Optional[List[str]] = None) -> StreamingResponse:
+    """
+    Send each sample's record the moment its worker finishes, then a summary. ndjson: one
+    {"sample", "record"} line per sample and a {"done": true, ...} line; sse: "sample" events
+    and a final "done" event. Tasks not started yet are cancelled if the client goes away.
+    """
+    import time
+
+    def frame(event: str, payload: Dict[str, Any]) -> str:
+        if stream == 'sse':
+            return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps(payload) + "\n"
+
+    async def records():
+        start_time = time.time()
+        pending = {asyncio.wrap_future(future): path for future, path in _submit_cohort_tasks(jobs).items()}
+        found = []
+        failed = 0
+        try:
+            while pending:
+                done, _ = await asyncio.wait(set(pending), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    file_path = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Error processing {file_path}: {e}")
+                        failed += 1
+                        continue
+                    for sample_name, record in result:
+                        found.append(sample_name)
+                        yield frame("sample", {"sample": sample_name, "record": record})
+            summary = {
+                "done": True,
+                "count": len(found),
+                "files": _task_files(jobs),
+                "failed": failed,
+                "elapsed_seconds": round(time.time() - start_time, 3)
+            }
+            if requested is not None:
+                found_names = set(found)
+                summary["missing"] = [name for name in requested if name not in found_names]
+            print(f"Streamed {len(found)} samples in {summary['elapsed_seconds']:.2f}s")
+            yield frame("done", summary)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    media_type = "text/event-stream" if stream == 'sse' else "application/x-ndjson"
+    return StreamingResponse(records(), media_type=media_type)
+
 @app.get("/api/population/region/{region_str}/samples")
-async def get_population_region_samples(region_str: str, folder_path: str, sample_names: str = "", mode: str = 'cohort-read'):
-    """Get full records for specific sample names (lazy loading) using multiprocessing"""
+async def get_population_region_samples(region_str: str, folder_path: str, sample_names: str = "", mode: str = 'cohort-read',
+                                        stream: Optional[str] = None, paired: bool = False):
+    """
+    Get full records for specific sample names (lazy loading) using multiprocessing.
+    With stream=ndjson or stream=sse each record is sent as soon as its file is parsed.
+    With paired, names are base sample names (as /ids returns them with paired) and each
+    sample's h1/h2 files come back as one diploid-shaped record.
+    """
     import time
     start_time = time.time()
     
     try:
+        _check_stream_format(stream)
         folder = Path(folder_path)
         if not folder.exists():
             raise HTTPException(status_code=404, detail="Population folder not found")
@@ -1521,29 +2033,10 @@ async def get_population_region_samples(region_str: str, folder_path: str, sampl
         if not requested_samples:
             raise HTTPException(status_code=400, detail="No sample names provided")
         
-        # Use cached sample info if available (much faster!)
-        sample_to_file = {}
-        if str(folder_path) in cohort_sample_cache:
-            cached_info = cohort_sample_cache[str(folder_path)]
-            for info in cached_info:
-                if info['sample_name'] in requested_samples:
-                    sample_to_file[info['sample_name']] = info['path']
-        else:
-            # Fallback: scan files (slow)
-            vcf_files = list(folder.glob("*.vcf.gz")) + list(folder.glob("*.vcf"))
-            for vcf_file in vcf_files:
-                try:
-                    vcf = pysam.VariantFile(str(vcf_file))
-                    samples = list(vcf.header.samples)
-                    vcf.close()
-                    
-                    sample_name = samples[0] if samples else vcf_file.stem.replace('.vcf', '')
-                    if sample_name in requested_samples:
-                        sample_to_file[sample_name] = str(vcf_file)
-                except Exception:
-                    continue
+        # Use cached sample info if available, else the cohort manifest
+        jobs = _cohort_tasks(folder_path, region_str, mode, paired, requested_samples)
         
-        if not sample_to_file:
+        if not jobs and stream is None:
             return {
                 "success": True,
                 "records": {}
@@ -1551,23 +2044,21 @@ async def get_population_region_samples(region_str: str, folder_path: str, sampl
         
         population_records = {}
         
-        # Process only requested samples using ProcessPoolExecutor for true parallelism
-        file_args = [(sample_to_file[sample], region_str, mode) for sample in requested_samples if sample in sample_to_file]
+        if stream is not None:
+            return _stream_cohort_records(jobs, stream, requested_samples)
         
-        # Use ProcessPoolExecutor for CPU-bound parsing tasks
-        with ProcessPoolExecutor(max_workers=COHORT_WORKERS) as executor:
-            future_to_file = {executor.submit(process_single_vcf_file, args): args[0] for args in file_args}
-            
-            for future in as_completed(future_to_file):
-                try:
-                    result = future.result()
-                    if result is not None:
-                        sample_name, record = result
-                        population_records[sample_name] = record
-                except Exception as e:
-                    file_path = future_to_file[future]
-                    print(f"Error processing {file_path}: {e}")
-                    continue
+        # CPU-bound parsing tasks go to the worker processes
+        # same file -> same worker, so its open handle (and loaded index) is reused across regions
+        future_to_file = _submit_cohort_tasks(jobs)
+        
+        for future in as_completed(future_to_file):
+            try:
+                for sample_name, record in future.result():
+                    population_records[sample_name] = record
+            except Exception as e:
+                file_path = future_to_file[future]
+                print(f"Error processing {file_path}: {e}")
+                continue
         
         elapsed = time.time() - start_time
         print(f"Loaded {len(population_records)} samples in {elapsed:.2f}s")
@@ -1582,9 +2073,15 @@ async def get_population_region_samples(region_str: str, folder_path: str, sampl
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/population/region/{region_str}")
-async def get_population_region_data(region_str: str, folder_path: str):
-    """Get population/cohort data for a specific region using parallel processing (legacy - loads all at once)"""
+async def get_population_region_data(region_str: str, folder_path: str, stream: Optional[str] = None,
+                                     paired: bool = False):
+    """
+    Get population/cohort data for a specific region using parallel processing (legacy - loads all at once).
+    With stream=ndjson or stream=sse each record is sent as soon as its file is parsed.
+    With paired, each sample's h1/h2 files come back as one diploid-shaped record.
+    """
     try:
+        _check_stream_format(stream)
         folder = Path(folder_path)
         if not folder.exists():
             raise HTTPException(status_code=404, detail="Population folder not found")
@@ -1599,24 +2096,26 @@ async def get_population_region_data(region_str: str, folder_path: str):
         
         # Prepare arguments for parallel processing (3 args: file_path, region_str, cohort_mode)
         # Use None for cohort_mode to auto-detect format (individual mode has no explicit mode)
-        file_args = [(str(vcf_file), region_str, None) for vcf_file in vcf_files]
+        if paired:
+            jobs = _cohort_tasks(folder_path, region_str, None, True)
+        else:
+            jobs = [(process_single_vcf_file, (str(vcf_file), region_str, None), str(vcf_file)) for vcf_file in vcf_files]
+        if stream is not None:
+            return _stream_cohort_records(jobs, stream)
         
-        # Use ProcessPoolExecutor for true parallel processing (CPU-bound parsing)
-        with ProcessPoolExecutor(max_workers=COHORT_WORKERS) as executor:
-            # Submit all tasks
-            future_to_file = {executor.submit(process_single_vcf_file, args): args[0] for args in file_args}
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_file):
-                try:
-                    result = future.result()
-                    if result is not None:
-                        sample_name, record = result
-                        population_records[sample_name] = record
-                except Exception as e:
-                    file_path = future_to_file[future]
-                    print(f"Error processing {file_path}: {e}")
-                    continue
+        # Use the worker processes for true parallel processing (CPU-bound parsing)
+        # Submit all tasks, each to the worker that owns the file
+        future_to_file = _submit_cohort_tasks(jobs)
+        
+        # Collect results as they complete
+        for future in as_completed(future_to_file):
+            try:
+                for sample_name, record in future.result():
+                    population_records[sample_name] = record
+            except Exception as e:
+                file_path = future_to_file[future]
+                print(f"Error processing {file_path}: {e}")
+                continue
         
         # Return after processing all files
         return {
@@ -1628,15 +2127,81 @@ async def get_population_region_data(region_str: str, folder_path: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _cohort_frequencies(folder_path: str, region: str) -> Tuple[Dict[str, Any], bool]:
+    """Allele/CN counts at region over every file of the cohort, and whether they came from the cache"""
+    # a stat pass, so files added or changed since the cohort was loaded change the key
+    manifest = _refresh_cohort_manifest(folder_path)[0]
+    key = (manifest.content_key(), region)
+    frequencies = frequency_cache.get(key)
+    if frequencies is not None:
+        return frequencies, True
+
+    samples = {info['path']: file_samples(info) for info in manifest.samples()}
+    future_to_file = {worker_pool.submit(region_alleles, path, region, affinity=path): path for path in samples}
+    per_sample = []
+    for future in as_completed(future_to_file):
+        try:
+            per_sample.extend(zip(samples[future_to_file[future]], future.result()))
+        except Exception as e:
+            print(f"Warning: Could not read {future_to_file[future]} for region {region}: {e}")
+    frequencies = locus_frequencies(per_sample)
+    frequency_cache.put(key, frequencies)
+    return frequencies, False
+
+@app.get("/api/population/frequency")
+async def get_population_frequency(chr: str, start: int, end: int, folder_path: str,
+                                   alleles: Optional[str] = None, rare_threshold: float = RARE_ALLELE_FREQUENCY):
+    """
+    Allele and CN frequencies at a locus across all haplotypes of a cohort. alleles is a
+    comma-separated list of the viewed sample's allele sequences; those not seen in the
+    cohort are returned as novel_alleles. Counts are cached per cohort content and region.
+    """
+    try:
+        folder = Path(folder_path)
+        if not folder.exists() or not folder.is_dir():
+            raise HTTPException(status_code=404, detail="Population folder not found")
+        region = f"{chr}:{start}-{end}"
+        loop = asyncio.get_running_loop()
+        frequencies, cached = await loop.run_in_executor(None, _cohort_frequencies, folder_path, region)
+        if frequencies['total_samples'] == 0:
+            raise HTTPException(status_code=404, detail=f"No cohort sample has a record at {region}")
+        sample_alleles = [a.strip() for a in alleles.split(',')] if alleles else []
+        rare_alleles, novel_alleles = flag_alleles(frequencies, sample_alleles, rare_threshold)
+        return {
+            "success": True,
+            "region": region,
+            **frequencies,
+            "rare_alleles": rare_alleles,
+            "novel_alleles": novel_alleles,
+            "rare_threshold": rare_threshold,
+            "cached": cached
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Pathogenic catalog cache
 _pathogenic_catalog = None
+# sorted per-chromosome interval index over the catalog, built together with it
+_pathogenic_index = None
 
 def load_pathogenic_catalog():
-    """Load pathogenic TR catalog from BED file - works with or without pandas"""
-    global _pathogenic_catalog
-    if _pathogenic_catalog is not None:
-        return _pathogenic_catalog
-    
+    """Load pathogenic TR catalog (cached) and build its interval index"""
+    global _pathogenic_catalog, _pathogenic_index
+    if _pathogenic_catalog is None:
+        catalog = _read_pathogenic_catalog()
+        _pathogenic_index = PathogenicIndex.from_catalog(catalog)
+        _pathogenic_catalog = catalog
+    return _pathogenic_catalog
+
+def get_pathogenic_index() -> PathogenicIndex:
+    """Interval index over the pathogenic catalog (loads the catalog on first use)"""
+    load_pathogenic_catalog()
+    return _pathogenic_index
+
+def _read_pathogenic_catalog():
+    """Read pathogenic TR catalog from BED file - works with or without pandas"""
     # try to find where the pathogenic catalog file is
     backend_dir = Path(__file__).parent
     catalog_paths = [
@@ -1658,26 +2223,26 @@ def load_pathogenic_catalog():
         # try pandas if we have it, otherwise just use a list
         try:
             import pandas as pd
-            _pathogenic_catalog = pd.DataFrame()
+            catalog = pd.DataFrame()
         except ImportError:
-            _pathogenic_catalog = []
-        return _pathogenic_catalog
+            catalog = []
+        return catalog
     
     print(f"Loading pathogenic catalog from: {catalog_path}")
     
     # try pandas first since its faster
     try:
         import pandas as pd
-        _pathogenic_catalog = pd.read_csv(catalog_path, sep="\t", header=None)
-        _pathogenic_catalog.columns = ["chrom", "start", "end", "motif", "pathogenic_min", "inheritance", "disease", "gene"]
-        _pathogenic_catalog["region"] = (
-            _pathogenic_catalog["chrom"].astype(str) + ":" + 
-            _pathogenic_catalog["start"].astype(str) + "-" + 
-            _pathogenic_catalog["end"].astype(str)
+        catalog = pd.read_csv(catalog_path, sep="\t", header=None)
+        catalog.columns = ["chrom", "start", "end", "motif", "pathogenic_min", "inheritance", "disease", "gene"]
+        catalog["region"] = (
+            catalog["chrom"].astype(str) + ":" + 
+            catalog["start"].astype(str) + "-" + 
+            catalog["end"].astype(str)
         )
-        print(f"Loaded pathogenic catalog with {len(_pathogenic_catalog)} regions (using pandas)")
-        print(f"Sample regions: {_pathogenic_catalog[['chrom', 'start', 'end', 'gene']].head(3).to_string()}")
-        return _pathogenic_catalog
+        print(f"Loaded pathogenic catalog with {len(catalog)} regions (using pandas)")
+        print(f"Sample regions: {catalog[['chrom', 'start', 'end', 'gene']].head(3).to_string()}")
+        return catalog
     except ImportError:
         print("Pandas not available, loading catalog manually...")
     except Exception as e:
@@ -1704,183 +2269,55 @@ def load_pathogenic_catalog():
                         'gene': parts[7] if parts[7] else None,
                         'region': f"{parts[0]}:{parts[1]}-{parts[2]}"
                     })
-        _pathogenic_catalog = catalog_data
+        catalog = catalog_data
         print(f"Loaded pathogenic catalog with {len(catalog_data)} regions (manual load)")
         if len(catalog_data) > 0:
             print(f"Sample region: {catalog_data[0]['region']} (gene: {catalog_data[0].get('gene', 'N/A')})")
-        return _pathogenic_catalog
+        return catalog
     except Exception as e:
         print(f"Error loading pathogenic catalog manually: {e}")
-        _pathogenic_catalog = []
-        return _pathogenic_catalog
+        catalog = []
+        return catalog
 
 @app.get("/api/pathogenic/check")
 async def check_pathogenicity(chr: str, start: int, end: int):
     """Check if a region overlaps with pathogenic catalog"""
     try:
         print(f"Checking pathogenicity for {chr}:{start}-{end}")
-        catalog = load_pathogenic_catalog()
-        
-        # handle both pandas dataframe and list of dicts
-        if catalog is None:
-            print(f"Catalog is None")
-            return {
-                "pathogenic": False
-            }
-        
-        # check if its a list (means we loaded it manually without pandas)
-        if isinstance(catalog, list):
-            if len(catalog) == 0:
-                print(f"Catalog is empty list")
-                return {
-                    "pathogenic": False
-                }
-            
-            print(f"Catalog loaded: {len(catalog)} regions (manual load, no pandas)")
-            
-            # normalize chr name (add 'chr' prefix if missing)
-            chr_normalized = chr if chr.startswith('chr') else f'chr{chr}'
-            
-            # filter by chromosome first
-            chr_matches = [entry for entry in catalog 
-                          if entry['chrom'] == chr_normalized or entry['chrom'] == chr]
-            
-            if len(chr_matches) == 0:
-                print(f"No matches for chromosome {chr} (tried {chr_normalized} and {chr})")
-                return {
-                    "pathogenic": False
-                }
-            
-            print(f"Found {len(chr_matches)} entries for chromosome {chr}")
-            
-            # find the best matching region (with some flexibility on coordinates)
-            best_match = None
-            best_distance = float('inf')
-            
-            for entry in chr_matches:
-                start_diff = abs(entry['start'] - start)
-                end_diff = abs(entry['end'] - end)
-                total_distance = start_diff + end_diff
-                
-                # check if it matches (overlaps or is within 10bp)
-                is_overlap = (entry['start'] <= end) and (entry['end'] >= start)
-                is_close = (start_diff <= 10) and (end_diff <= 10)
-                
-                if (is_overlap or is_close) and total_distance < best_distance:
-                    best_match = entry
-                    best_distance = total_distance
-            
-            if best_match:
-                pathogenic_min_val = best_match.get('pathogenic_min')
-                pathogenic_threshold = int(float(pathogenic_min_val)) if pathogenic_min_val is not None else None
-                
-                print(f"Found match for {chr}:{start}-{end} with catalog entry {best_match['chrom']}:{best_match['start']}-{best_match['end']} (distance={best_distance}bp): threshold={pathogenic_threshold}, gene={best_match.get('gene', 'N/A')}")
-                return {
-                    "pathogenic": True,
-                    "chr": str(best_match["chrom"]),
-                    "start": int(best_match["start"]),
-                    "end": int(best_match["end"]),
-                    "gene": best_match.get("gene"),
-                    "disease": best_match.get("disease"),
-                    "inheritance": best_match.get("inheritance"),
-                    "pathogenic_threshold": pathogenic_threshold,
-                    "motif": best_match.get("motif")
-                }
-            
-            print(f"No pathogenic match found for {chr}:{start}-{end} (checked {len(chr_matches)} entries)")
-            return {
-                "pathogenic": False
-            }
-        
-        # Handle pandas DataFrame
-        try:
-            import pandas as pd
-        except ImportError:
-            print("Pandas not available and catalog is not a list")
-            return {
-                "pathogenic": False
-            }
-        
-        if not isinstance(catalog, pd.DataFrame):
-            print(f"Catalog is unexpected type: {type(catalog)}")
-            return {
-                "pathogenic": False
-            }
-        
-        if catalog.empty:
-            print(f"Catalog DataFrame is empty (shape: {catalog.shape})")
+        pathogenic_index = get_pathogenic_index()
+
+        if pathogenic_index is None or len(pathogenic_index) == 0:
+            print("Pathogenic catalog is empty")
             return {
                 "pathogenic": False
             }
-        
-        print(f"Catalog loaded: {len(catalog)} regions (pandas DataFrame)")
-        
-        # Normalize chromosome name (handle both 'chr13' and '13')
-        chr_normalized = chr if chr.startswith('chr') else f'chr{chr}'
-        
-        # Check if region overlaps with any pathogenic entry
-        # First try exact chromosome match
-        chr_matches = catalog[catalog["chrom"] == chr_normalized]
-        if len(chr_matches) == 0:
-            # Try without 'chr' prefix
-            chr_matches = catalog[catalog["chrom"] == chr]
-        
-        if len(chr_matches) == 0:
-            print(f"No matches for chromosome {chr} (tried {chr_normalized} and {chr})")
+
+        # best match = overlapping or both ends within 10bp, closest coordinates wins
+        best_match = pathogenic_index.best_match(chr, start, end)
+        if best_match is None:
+            print(f"No pathogenic match found for {chr}:{start}-{end}")
             return {
                 "pathogenic": False
             }
-        
-        print(f"Found {len(chr_matches)} entries for chromosome {chr}")
-        
-        # Check for overlap with tolerance for small coordinate differences
-        # Make a copy to avoid SettingWithCopyWarning
-        chr_matches = chr_matches.copy()
-        chr_matches["start_diff"] = abs(chr_matches["start"] - start)
-        chr_matches["end_diff"] = abs(chr_matches["end"] - end)
-        chr_matches["total_distance"] = chr_matches["start_diff"] + chr_matches["end_diff"]
-        
-        # Find overlaps: standard overlap OR coordinates within 10bp
-        overlaps = chr_matches[
-            (
-                # Standard overlap check
-                (chr_matches["start"] <= end) & (chr_matches["end"] >= start)
-            ) | (
-                # Allow matches if start and end are both within 10bp
-                (chr_matches["start_diff"] <= 10) & (chr_matches["end_diff"] <= 10)
-            )
-        ]
-        
-        if not overlaps.empty:
-            # Find the best match (closest coordinates)
-            best_match = overlaps.loc[overlaps["total_distance"].idxmin()]
-            row = best_match
-            
-            # Handle pathogenic_min which might be float or None
-            pathogenic_min_val = row["pathogenic_min"]
-            if pd.notna(pathogenic_min_val):
-                # Convert to int, handling float values
-                pathogenic_threshold = int(float(pathogenic_min_val))
-            else:
-                pathogenic_threshold = None
-            
-            print(f"Found overlap for {chr}:{start}-{end} with catalog entry {row['chrom']}:{row['start']}-{row['end']} (distance={row['total_distance']}bp): threshold={pathogenic_threshold}, gene={row.get('gene', 'N/A')}")
-            return {
-                "pathogenic": True,
-                "chr": str(row["chrom"]),
-                "start": int(row["start"]),
-                "end": int(row["end"]),
-                "gene": str(row["gene"]) if pd.notna(row["gene"]) else None,
-                "disease": str(row["disease"]) if pd.notna(row["disease"]) else None,
-                "inheritance": str(row["inheritance"]) if pd.notna(row["inheritance"]) else None,
-                "pathogenic_threshold": pathogenic_threshold,
-                "motif": str(row["motif"]) if pd.notna(row["motif"]) else None
-            }
-        
-        print(f"No pathogenic match found for {chr}:{start}-{end} (checked {len(chr_matches)} entries)")
-        
+
+        pathogenic_min_val = best_match.get("pathogenic_min")
+        pathogenic_threshold = int(float(pathogenic_min_val)) if pathogenic_min_val is not None else None
+
+        def _text(key):
+            value = best_match.get(key)
+            return str(value) if value is not None else None
+
+        print(f"Found match for {chr}:{start}-{end} with catalog entry {best_match['chrom']}:{best_match['start']}-{best_match['end']} (distance={best_match['distance']}bp): threshold={pathogenic_threshold}, gene={best_match.get('gene', 'N/A')}")
         return {
-            "pathogenic": False
+            "pathogenic": True,
+            "chr": str(best_match["chrom"]),
+            "start": int(best_match["start"]),
+            "end": int(best_match["end"]),
+            "gene": _text("gene"),
+            "disease": _text("disease"),
+            "inheritance": _text("inheritance"),
+            "pathogenic_threshold": pathogenic_threshold,
+            "motif": _text("motif")
         }
     except Exception as e:
         print(f"Error checking pathogenicity: {e}")
@@ -0,0 +1,170 @@
+"""
+Sorted per-chromosome interval index over the pathogenic TR catalog.
+
+Built once when the catalog is loaded, so overlap checks and the +-10 bp
+nearest-match lookup are a binary search instead of a scan of the whole
+catalog. Chromosome names are normalized to the 'chr' prefix at build time.
+join() annotates a whole loaded VCF against the catalog in one pass.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# coordinates within this many bp on both ends count as the same locus
+MATCH_TOLERANCE_BP = 10
+
+
+def normalize_chrom(chrom: str) -> str:
+    chrom = str(chrom)
+    return chrom if chrom.startswith('chr') else f'chr{chrom}'
+
+
+def _clean(value):
+    """pandas gives NaN for empty cells, turn that into None like the manual loader does"""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class PathogenicIndex:
+    """Catalog entries grouped by chromosome and sorted by start, with a running max of the ends"""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.entries = [{k: _clean(v) for k, v in entry.items()} for entry in entries]
+        self._by_chrom: Dict[str, Dict[str, Any]] = {}
+        grouped: Dict[str, List[int]] = {}
+        for entry_id, entry in enumerate(self.entries):
+            grouped.setdefault(normalize_chrom(entry['chrom']), []).append(entry_id)
+        for chrom, ids in grouped.items():
+            # stable sort keeps catalog order for equal starts (ties resolve like the old linear scan)
+            ids = sorted(ids, key=lambda i: int(self.entries[i]['start']))
+            ends = [int(self.entries[i]['end']) for i in ids]
+            self._by_chrom[chrom] = {
+                'ids': ids,
+                'starts': [int(self.entries[i]['start']) for i in ids],
+                'ends': ends,
+                # max end of everything up to here, lets the overlap walk stop early
+                'max_end': list(accumulate(ends, max)),
+            }
+
+    @classmethod
+    def from_catalog(cls, catalog) -> 'PathogenicIndex':
+        """Build from either catalog flavour: list of dicts (manual load) or pandas DataFrame"""
+        if catalog is None:
+            return cls([])
+        if isinstance(catalog, list):
+            return cls(catalog)
+        if getattr(catalog, 'empty', True):
+            return cls([])
+        return cls(catalog.to_dict('records'))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def chromosomes(self) -> List[str]:
+        return list(self._by_chrom)
+
+    def overlapping(self, chrom: str, start: int, end: int) -> List[int]:
+        """Ids of entries with entry.start <= end and entry.end >= start, in catalog order"""
+        tree = self._by_chrom.get(normalize_chrom(chrom))
+        if tree is None:
+            return []
+        hits = []
+        j = bisect_right(tree['starts'], end) - 1
+        while j >= 0 and tree['max_end'][j] >= start:
+            if tree['ends'][j] >= start:
+                hits.append(tree['ids'][j])
+            j -= 1
+        return sorted(hits)
+
+    def best_match(self, chrom: str, start: int, end: int,
+                   tolerance: int = MATCH_TOLERANCE_BP) -> Optional[Dict[str, Any]]:
+        """
+        Closest entry that overlaps the region or has both ends within tolerance bp,
+        by total distance of the two ends. Returns a copy of the entry plus 'distance'.
+        """
+        tree = self._by_chrom.get(normalize_chrom(chrom))
+        if tree is None:
+            return None
+        candidates = set(self.overlapping(chrom, start, end))
+        lo = bisect_left(tree['starts'], start - tolerance)
+        hi = bisect_right(tree['starts'], start + tolerance)
+        for j in range(lo, hi):
+            if abs(tree['ends'][j] - end) <= tolerance:
+                candidates.add(tree['ids'][j])
+        best_id = None
+        best_distance = None
+        for entry_id in sorted(candidates):
+            entry = self.entries[entry_id]
+            distance = abs(int(entry['start']) - start) + abs(int(entry['end']) - end)
+            if best_distance is None or distance < best_distance:
+                best_id, best_distance = entry_id, distance
+        if best_id is None:
+            return None
+        return {**self.entries[best_id], 'entry_id': best_id, 'distance': best_distance}
+
+    def threshold(self, entry_id: int) -> Optional[float]:
+        thresh = self.entries[entry_id].get('pathogenic_min')
+        return float(thresh) if thresh is not None else None
+
+    def join(self, chroms: List[str], chrom_codes: np.ndarray, pos: np.ndarray, stop: np.ndarray,
+             cn: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Match every row of a region table against the catalog in one sorted sweep.
+
+        Returns (hit, exceeds): hit is the id of the overlapping entry with the lowest
+        pathogenic threshold (-1 when nothing overlaps), exceeds is cn >= that threshold,
+        so a row exceeds when its cn reaches the pathogenic_min of any entry it overlaps.
+        """
+        n = len(pos)
+        hit = np.full(n, -1, dtype=np.int32)
+        best = np.full(n, np.inf)
+        for code, chrom in enumerate(chroms):
+            tree = self._by_chrom.get(normalize_chrom(chrom))
+            if tree is None:
+                continue
+            rows = np.flatnonzero(chrom_codes == code)
+            if not len(rows):
+                continue
+            rows = rows[np.argsort(pos[rows], kind='stable')]
+            row_starts = pos[rows]
+            # running max of the row ends, so rows that can reach an entry form one contiguous slice
+            row_reach = np.maximum.accumulate(stop[rows])
+            for entry_id, start, end in zip(tree['ids'], tree['starts'], tree['ends']):
+                lo = np.searchsorted(row_reach, start, side='left')
+                hi = np.searchsorted(row_starts, end, side='right')
+                if lo >= hi:
+                    continue
+                cand = rows[lo:hi]
+                cand = cand[stop[cand] >= start]
+                thresh = self.threshold(entry_id)
+                thresh = np.inf if thresh is None else thresh
+                better = (hit[cand] == -1) | (thresh < best[cand]) | ((thresh == best[cand]) & (entry_id < hit[cand]))
+                cand = cand[better]
+                hit[cand] = entry_id
+                best[cand] = thresh
+        exceeds = np.asarray(cn, dtype=np.float64) >= best
+        return hit, exceeds
+
+    def find_genes(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Ids of entries whose gene name starts with query, then those that only contain it (case-insensitive)"""
+        query = query.strip().lower()
+        if not query:
+            return []
+        prefix, contains = [], []
+        for entry_id, entry in enumerate(self.entries):
+            gene = entry.get('gene')
+            if gene is None:
+                continue
+            gene = str(gene).lower()
+            if gene.startswith(query):
+                prefix.append(entry_id)
+            elif query in gene:
+                contains.append(entry_id)
+        hits = prefix + contains
+        return hits[:limit] if limit is not None else hits
@@ -0,0 +1,91 @@
+"""
+Size-bounded LRU cache of parsed region records (the dicts parse_record returns).
+
+Keys are (file fingerprint, region) so a rewritten VCF never serves stale
+records. The backend also prefetches the neighbours of the region being
+viewed into this cache, claim()/release() make sure the same region isn't
+parsed by two prefetch tasks at once.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+# parsed records kept in memory, can be overridden with PROLETRACT_RECORD_CACHE_SIZE
+RECORD_CACHE_SIZE = int(os.environ.get("PROLETRACT_RECORD_CACHE_SIZE", "4096"))
+# regions prefetched on each side of the one being viewed (in the current filtered order)
+PREFETCH_NEIGHBOURS = 5
+
+
+def fingerprint_key(fingerprint: Dict[str, Any]) -> Tuple:
+    """Hashable form of sidecar.file_fingerprint()"""
+    vcf = fingerprint['vcf']
+    index = fingerprint.get('index') or {}
+    return (vcf['path'], vcf['size'], vcf['mtime_ns'], index.get('size'), index.get('mtime_ns'))
+
+
+class RecordCache:
+    """Thread-safe LRU mapping (fingerprint key, region) -> parsed record, with hit/miss counters"""
+
+    def __init__(self, max_entries: int = RECORD_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._records: 'OrderedDict[Hashable, Dict[str, Any]]' = OrderedDict()
+        self._pending: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                self.misses += 1
+                return None
+            self._records.move_to_end(key)
+            self.hits += 1
+            return record
+
+    def put(self, key: Hashable, record: Dict[str, Any], prefetched: bool = False):
+        with self._lock:
+            self._records[key] = record
+            self._records.move_to_end(key)
+            if prefetched:
+                self.prefetched += 1
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+
+    def claim(self, key: Hashable) -> bool:
+        """True if key is neither cached nor being fetched already (caller must release() it)"""
+        with self._lock:
+            if key in self._records or key in self._pending:
+                return False
+            self._pending.add(key)
+            return True
+
+    def release(self, key: Hashable):
+        with self._lock:
+            self._pending.discard(key)
+
+    def clear(self, path: Optional[str] = None):
+        """Drop everything, or only the records of one file"""
+        with self._lock:
+            if path is None:
+                self._records.clear()
+                return
+            resolved = os.path.realpath(path)
+            for key in [k for k in self._records if k[0][0] == resolved]:
+                del self._records[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._records),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'prefetched': self.prefetched,
+                'prefetch_pending': len(self._pending),
+            }
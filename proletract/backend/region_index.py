@@ -0,0 +1,632 @@
+"""
+Columnar region index for loaded VCF files.
+
+Instead of keeping one Python dict per record (which costs several GB for
+genome-wide TandemTwister VCFs), the per-record summary that the filter and
+navigation endpoints need is stored as a handful of numpy columns:
+
+- chromosome and genotype are categorical (small code + lookup table)
+- positions are int32, copy numbers float32
+- record IDs are interned into one bytes blob plus an offsets array
+- file-wide aggregates the statistics need but that aren't per row (motif
+  length histogram) are collected during the same scan
+"""
+import functools
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pysam
+
+from proletract.backend.sketches import IntCounter, QuantileSketch, RunningStats
+
+MISSING_GENOTYPE = './.'
+
+# allele lengths buffered by the index builder before they are added to the sketches
+ALLELE_BATCH_SIZE = 65536
+
+# contigs longer than this are split into coordinate windows for the parallel scan
+SCAN_WINDOW_BP = 40_000_000
+# below this (compressed) size a single sequential pass is faster than starting workers
+PARALLEL_SCAN_MIN_BYTES = 16 * 1024 * 1024
+# how many filter result sets to keep per loaded file
+FILTER_CACHE_SIZE = 32
+
+
+def chrom_sort_key(c):
+    """Natural sort: chr1, chr2, ..., chr22, chrX, chrY, chrM"""
+    s = str(c).replace('chr', '').replace('Chr', '')
+    if s == 'X': return (23, 'X')
+    if s == 'Y': return (24, 'Y')
+    if s in ('M', 'MT'): return (25, s)
+    try: return (int(s), s)
+    except ValueError: return (999, s)
+
+
+def parse_region(region_str: str) -> Optional[Tuple[str, int, int]]:
+    """Split 'chr:pos-stop' into its parts, None if it doesn't look like a region"""
+    chrom, sep, span = region_str.rpartition(':')
+    if not sep or not chrom:
+        return None
+    start, sep, stop = span.replace(',', '').partition('-')
+    try:
+        start_val = int(start)
+        stop_val = int(stop) if sep else start_val
+    except ValueError:
+        return None
+    return chrom, start_val, stop_val
+
+
+def _to_float_list(value) -> List[float]:
+    """CN fields are declared as strings by TandemTwister so they can come back as '16', ('16', '16') or '16,16'"""
+    if value is None:
+        return []
+    if not isinstance(value, (tuple, list)):
+        value = str(value).split(',')
+    out = []
+    for v in value:
+        if v is None or v == '' or v == '.':
+            continue
+        try:
+            out.append(float(v))
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+def genotype_string(gt) -> str:
+    """Format a pysam GT tuple the same way everywhere ('0/1', './.' for missing)"""
+    if gt is None:
+        return MISSING_GENOTYPE
+    if isinstance(gt, (tuple, list)):
+        if len(gt) == 0:
+            return MISSING_GENOTYPE
+        return '/'.join([str(g) if g is not None else '.' for g in gt])
+    return str(gt)
+
+
+def summarize_record(rec) -> Tuple[str, int, int, int, float, float, float, str, str, List[int], List[int]]:
+    """
+    Pull out the summary columns for one pysam record:
+    (chrom, pos, stop, motif_size, cn_ref, cn_h1, cn_h2, genotype, id, motif_lengths, allele_lengths)
+    Missing copy numbers are NaN. motif_lengths are the lengths of all motifs in INFO,
+    allele_lengths the lengths (bp) of the alleles called on each haplotype.
+    """
+    # motif size (max length of motifs in INFO)
+    motifs = rec.info.get('MOTIFS', [])
+    if isinstance(motifs, tuple):
+        motifs = list(motifs)
+    elif not isinstance(motifs, list):
+        motifs = [motifs] if motifs else []
+    motif_sizes = [len(str(m)) for m in motifs if m]
+    motif_size = max(motif_sizes) if motif_sizes else 0
+
+    # copy numbers for ref and both haplotypes
+    cn_ref = cn_h1 = cn_h2 = float('nan')
+    gt_str = MISSING_GENOTYPE
+    allele_lengths: List[int] = []
+    try:
+        ref_vals = _to_float_list(rec.info.get('CN_ref'))
+        if ref_vals:
+            cn_ref = ref_vals[0]
+    except (TypeError, ValueError, KeyError):
+        pass
+    if len(rec.samples) > 0:
+        sample = rec.samples[0]
+        try:
+            cn_vals = _to_float_list(sample.get('CN'))
+            if cn_vals:
+                cn_h1 = cn_vals[0]
+                cn_h2 = cn_vals[1] if len(cn_vals) > 1 else cn_vals[0]
+        except (TypeError, ValueError, KeyError, IndexError):
+            pass
+        try:
+            gt = sample.get('GT')
+            gt_str = genotype_string(gt)
+            if gt:
+                alleles = rec.alleles or ()
+                allele_lengths = [len(alleles[a]) for a in gt if a is not None and a < len(alleles)]
+        except (KeyError, IndexError, AttributeError):
+            gt_str = MISSING_GENOTYPE
+
+    return (rec.chrom, rec.pos, rec.stop, motif_size, cn_ref, cn_h1, cn_h2, gt_str, rec.id or '', motif_sizes,
+            allele_lengths)
+
+
+class FilterKey(NamedTuple):
+    """Normalized filter parameters, used as the key of the per-index result cache"""
+    genotypes: Optional[Tuple[str, ...]] = None
+    chromosomes: Optional[Tuple[str, ...]] = None
+    motif_size_min: Optional[int] = None
+    motif_size_max: Optional[int] = None
+    cn_min: Optional[float] = None
+    cn_max: Optional[float] = None
+    pathogenic_only: bool = False
+    annotated_regions: Optional[Tuple[str, ...]] = None
+
+
+def filter_key(genotypes=None, chromosomes=None, motif_size_min=None, motif_size_max=None,
+               cn_min=None, cn_max=None, pathogenic_only=False, annotated_regions=None) -> FilterKey:
+    """Build a FilterKey so that equivalent requests (list order, duplicates, empty lists) share a cache entry"""
+    def as_set(values):
+        return tuple(sorted(set(values))) if values else None
+
+    return FilterKey(
+        genotypes=as_set(genotypes),
+        chromosomes=as_set(chromosomes),
+        motif_size_min=int(motif_size_min) if motif_size_min is not None else None,
+        motif_size_max=int(motif_size_max) if motif_size_max is not None else None,
+        cn_min=float(cn_min) if cn_min is not None else None,
+        cn_max=float(cn_max) if cn_max is not None else None,
+        pathogenic_only=bool(pathogenic_only),
+        annotated_regions=as_set(annotated_regions),
+    )
+
+
+class RegionIndexBuilder:
+    """Accumulates summary rows into compact typed buffers, then freezes them into a RegionIndex"""
+
+    def __init__(self):
+        self._chrom_lookup: Dict[str, int] = {}
+        self._genotype_lookup: Dict[str, int] = {}
+        self.chroms: List[str] = []
+        self.genotypes: List[str] = []
+        self._chrom_codes = array('h')
+        self._pos = array('i')
+        self._stop = array('i')
+        self._motif_size = array('i')
+        self._cn_ref = array('f')
+        self._cn_h1 = array('f')
+        self._cn_h2 = array('f')
+        self._genotype_codes = array('h')
+        self._id_blob = bytearray()
+        self._id_offsets = array('q', [0])
+        # whole-file aggregates for the statistics (fixed size, not per row)
+        self._motif_lengths = IntCounter()
+        self._allele_lengths = QuantileSketch()
+        self._allele_length_stats = RunningStats()
+        # allele lengths go into the sketches in vectorized batches of up to this many
+        self._allele_batch = array('i')
+
+    def __len__(self):
+        return len(self._pos)
+
+    def _code(self, lookup: Dict[str, int], table: List[str], value: str) -> int:
+        code = lookup.get(value)
+        if code is None:
+            code = len(table)
+            lookup[value] = code
+            table.append(value)
+        return code
+
+    def add(self, chrom, pos, stop, motif_size, cn_ref, cn_h1, cn_h2, genotype, record_id, motif_lengths=(),
+            allele_lengths=()):
+        self._chrom_codes.append(self._code(self._chrom_lookup, self.chroms, chrom))
+        self._pos.append(pos)
+        self._stop.append(stop)
+        self._motif_size.append(motif_size)
+        self._cn_ref.append(cn_ref)
+        self._cn_h1.append(cn_h1)
+        self._cn_h2.append(cn_h2)
+        self._genotype_codes.append(self._code(self._genotype_lookup, self.genotypes, genotype))
+        self._id_blob += record_id.encode()
+        self._id_offsets.append(len(self._id_blob))
+        for length in motif_lengths:
+            self._motif_lengths.add(length)
+        self._allele_batch.extend(allele_lengths)
+        if len(self._allele_batch) >= ALLELE_BATCH_SIZE:
+            self._flush_allele_batch()
+
+    def _flush_allele_batch(self):
+        if self._allele_batch:
+            batch = np.frombuffer(self._allele_batch, dtype=np.int32)
+            self._allele_lengths.add_many(batch)
+            self._allele_length_stats.add_many(batch)
+            self._allele_batch = array('i')
+
+    def add_record(self, rec):
+        self.add(*summarize_record(rec))
+
+    def build(self) -> 'RegionIndex':
+        self._flush_allele_batch()
+        return RegionIndex(
+            chroms=list(self.chroms),
+            chrom_codes=np.frombuffer(self._chrom_codes, dtype=np.int16).copy(),
+            pos=np.frombuffer(self._pos, dtype=np.int32).copy(),
+            stop=np.frombuffer(self._stop, dtype=np.int32).copy(),
+            motif_size=np.frombuffer(self._motif_size, dtype=np.int32).copy(),
+            cn_ref=np.frombuffer(self._cn_ref, dtype=np.float32).copy(),
+            cn_h1=np.frombuffer(self._cn_h1, dtype=np.float32).copy(),
+            cn_h2=np.frombuffer(self._cn_h2, dtype=np.float32).copy(),
+            genotypes=list(self.genotypes),
+            genotype_codes=np.frombuffer(self._genotype_codes, dtype=np.int16).copy(),
+            id_blob=np.frombuffer(bytes(self._id_blob), dtype=np.uint8),
+            id_offsets=np.frombuffer(self._id_offsets, dtype=np.int64).copy(),
+            motif_length_counts=self._motif_lengths.to_array(),
+            allele_length_sketch=self._allele_lengths.to_array(),
+            allele_length_stats=self._allele_length_stats.to_array(),
+        )
+
+
+class RegionIndex:
+    """Column store with the per-record summary of one loaded VCF (rows are in file order)"""
+
+    # numpy arrays, in the order they are written to the sidecar file (all per row, except
+    # the last three which are whole-file aggregates in their sketches.py to_array() form)
+    COLUMNS = ('chrom_codes', 'pos', 'stop', 'motif_size', 'cn_ref', 'cn_h1', 'cn_h2',
+               'cn_max', 'genotype_codes', 'id_blob', 'id_offsets', 'motif_length_counts',
+               'allele_length_sketch', 'allele_length_stats')
+
+    def __init__(self, chroms, chrom_codes, pos, stop, motif_size, cn_ref, cn_h1, cn_h2,
+                 genotypes, genotype_codes, id_blob, id_offsets, cn_max=None, motif_length_counts=None,
+                 allele_length_sketch=None, allele_length_stats=None):
+        self.chroms: List[str] = chroms
+        self.chrom_codes = chrom_codes
+        self.pos = pos
+        self.stop = stop
+        self.motif_size = motif_size
+        self.cn_ref = cn_ref
+        self.cn_h1 = cn_h1
+        self.cn_h2 = cn_h2
+        self.genotypes: List[str] = genotypes
+        self.genotype_codes = genotype_codes
+        self.id_blob = id_blob
+        self.id_offsets = id_offsets
+        if cn_max is None:
+            # max of CN from the sample or CN_ref from INFO, 0 when nothing is set (same as before)
+            cn_max = np.fmax(np.fmax(cn_ref, cn_h1), cn_h2)
+            cn_max = np.where(np.isnan(cn_max), 0, np.maximum(cn_max, 0)).astype(np.float32)
+        self.cn_max = cn_max
+        # number of motifs per motif length (index = length), for the statistics
+        self.motif_length_counts = motif_length_counts if motif_length_counts is not None else np.zeros(0, dtype=np.int64)
+        # quantile sketch and count/sum/min/max of the called allele lengths
+        self.allele_length_sketch = (allele_length_sketch if allele_length_sketch is not None
+                                     else QuantileSketch().to_array())
+        self.allele_length_stats = (allele_length_stats if allele_length_stats is not None
+                                    else RunningStats().to_array())
+        # identity of the file this was built from (set by the loader, see sidecar.file_fingerprint)
+        self.fingerprint: Optional[Dict[str, Any]] = None
+        # True for the snapshots published while a background load is still scanning
+        self.loading = False
+        # per-row join against the pathogenic catalog, filled in after load (depends on
+        # the catalog, so it is not part of COLUMNS / the sidecar): entry id or -1, and
+        # whether cn_max reaches that entry's threshold
+        self.pathogenic_hit: Optional[np.ndarray] = None
+        self.pathogenic_exceeds: Optional[np.ndarray] = None
+        self._available_genotypes: Optional[List[str]] = None
+        # FilterKey -> matching row numbers (ascending), least recently used first
+        self._filter_cache: 'OrderedDict[FilterKey, np.ndarray]' = OrderedDict()
+        self._filter_lock = threading.Lock()
+        # sorted (chrom, pos) keys for region -> row lookups, see _locus_keys()
+        self._locus_lookup: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __len__(self):
+        return len(self.pos)
+
+    def motif_lengths(self) -> IntCounter:
+        return IntCounter.from_array(self.motif_length_counts)
+
+    def allele_lengths(self) -> QuantileSketch:
+        return QuantileSketch.from_array(self.allele_length_sketch)
+
+    def allele_length_summary(self) -> RunningStats:
+        return RunningStats.from_array(self.allele_length_stats)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.COLUMNS)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    @classmethod
+    def from_columns(cls, chroms: List[str], genotypes: List[str], columns: Dict[str, np.ndarray]) -> 'RegionIndex':
+        return cls(chroms=chroms, genotypes=genotypes, **columns)
+
+    def __reduce__(self):
+        # pickled when scan workers send their chunk back: just the columns, caches and locks are rebuilt
+        return (RegionIndex.from_columns, (self.chroms, self.genotypes, self.columns()))
+
+    # --- row accessors ---
+
+    def chrom(self, row: int) -> str:
+        return self.chroms[self.chrom_codes[row]]
+
+    def region(self, row: int) -> str:
+        return f"{self.chroms[self.chrom_codes[row]]}:{self.pos[row]}-{self.stop[row]}"
+
+    def record_id(self, row: int) -> str:
+        return bytes(self.id_blob[self.id_offsets[row]:self.id_offsets[row + 1]]).decode()
+
+    def genotype(self, row: int) -> str:
+        return self.genotypes[self.genotype_codes[row]]
+
+    def row_info(self, row: int) -> Dict[str, Any]:
+        """id/region/genotype for one row (shape of the RegionInfo response model)"""
+        region = self.region(row)
+        return {
+            'id': self.record_id(row) or region,
+            'region': region,
+            'genotype': self.genotype(row),
+        }
+
+    def regions(self, rows=None) -> List[str]:
+        if rows is None:
+            rows = range(len(self))
+        return [self.region(int(r)) for r in rows]
+
+    # --- categorical helpers ---
+
+    @property
+    def available_genotypes(self) -> List[str]:
+        if self._available_genotypes is None:
+            used = np.unique(self.genotype_codes)
+            self._available_genotypes = sorted(self.genotypes[int(c)] for c in used)
+        return self._available_genotypes
+
+    @property
+    def available_chromosomes(self) -> List[str]:
+        used = np.unique(self.chrom_codes)
+        return sorted((self.chroms[int(c)] for c in used), key=chrom_sort_key)
+
+    def genotype_mask(self, genotypes) -> np.ndarray:
+        # lookup table over the categorical codes, one gather instead of string compares
+        wanted = set(genotypes)
+        lut = np.array([g in wanted for g in self.genotypes] or [False], dtype=bool)
+        return lut[self.genotype_codes]
+
+    def chromosome_mask(self, chromosomes) -> np.ndarray:
+        wanted = set(chromosomes)
+        lut = np.array([c in wanted for c in self.chroms] or [False], dtype=bool)
+        return lut[self.chrom_codes]
+
+    def set_pathogenic_flags(self, hit: np.ndarray, exceeds: np.ndarray):
+        """Store the catalog join and drop cached results that depended on the old one"""
+        hit.setflags(write=False)
+        exceeds.setflags(write=False)
+        with self._filter_lock:
+            self.pathogenic_hit = hit
+            self.pathogenic_exceeds = exceeds
+            for key in [k for k in self._filter_cache if k.pathogenic_only]:
+                del self._filter_cache[key]
+
+    def filter_mask(self, key: FilterKey) -> np.ndarray:
+        """Boolean mask of the rows passing the filters in key"""
+        mask = np.ones(len(self), dtype=bool)
+        if key.genotypes:
+            mask &= self.genotype_mask(key.genotypes)
+        if key.chromosomes:
+            mask &= self.chromosome_mask(key.chromosomes)
+        if key.motif_size_min is not None:
+            mask &= self.motif_size >= key.motif_size_min
+        if key.motif_size_max is not None:
+            mask &= self.motif_size <= key.motif_size_max
+        if key.cn_min is not None:
+            mask &= self.cn_max >= key.cn_min
+        if key.cn_max is not None:
+            mask &= self.cn_max <= key.cn_max
+        if key.pathogenic_only:
+            if self.pathogenic_exceeds is None:
+                raise ValueError("pathogenic flags have not been computed for this index")
+            mask &= self.pathogenic_exceeds
+        if key.annotated_regions:
+            # every row at an annotated region, several records can share one chr:pos-stop
+            annotated = np.zeros(len(self), dtype=bool)
+            for r in key.annotated_regions:
+                annotated[self.rows_at(r)] = True
+            mask &= annotated
+        return mask
+
+    def filtered_rows(self, key: FilterKey) -> np.ndarray:
+        """Row numbers matching key, cached per key so paging through the result is just a slice"""
+        with self._filter_lock:
+            rows = self._filter_cache.get(key)
+            if rows is not None:
+                self._filter_cache.move_to_end(key)
+                return rows
+
+        if key == FilterKey():
+            rows = np.arange(len(self))
+        else:
+            rows = np.flatnonzero(self.filter_mask(key))
+        rows.setflags(write=False)
+
+        with self._filter_lock:
+            self._filter_cache[key] = rows
+            while len(self._filter_cache) > FILTER_CACHE_SIZE:
+                self._filter_cache.popitem(last=False)
+        return rows
+
+    def _locus_keys(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorted chrom/pos keys, row of each key) for binary-search lookups, built on first use"""
+        with self._filter_lock:
+            if self._locus_lookup is None:
+                keys = (self.chrom_codes.astype(np.int64) << 32) | self.pos.astype(np.int64)
+                # stable, so rows sharing a key stay in file order
+                order = np.argsort(keys, kind='stable')
+                self._locus_lookup = (keys[order], order)
+            return self._locus_lookup
+
+    def rows_at(self, region_str: str) -> np.ndarray:
+        """Rows whose region is exactly region_str (ascending), O(log n)"""
+        parsed = parse_region(region_str)
+        if parsed is None or parsed[0] not in self.chroms:
+            return np.zeros(0, dtype=np.int64)
+        chrom, pos, stop = parsed
+        keys, order = self._locus_keys()
+        key = (self.chroms.index(chrom) << 32) | pos
+        rows = order[np.searchsorted(keys, key, side='left'):np.searchsorted(keys, key, side='right')]
+        return rows[self.stop[rows] == stop]
+
+    def find_row(self, region_str: str, rows: Optional[np.ndarray] = None) -> Optional[int]:
+        """
+        Position of region_str in rows (or in the whole index), None if not there.
+        rows must be ascending (like filtered_rows() returns), so a row's rank in it is
+        a binary search rather than a scan.
+        """
+        hits = self.rows_at(region_str)
+        if rows is None:
+            return int(hits[0]) if len(hits) else None
+        ranks = np.searchsorted(rows, hits)
+        found = ranks < len(rows)
+        ranks = ranks[found]
+        ranks = ranks[rows[ranks] == hits[found]]
+        return int(ranks[0]) if len(ranks) else None
+
+
+def compressed_offset(vcf) -> int:
+    """Bytes of the (compressed) file consumed so far by an open VariantFile"""
+    try:
+        offset = vcf.tell()
+    except (OSError, ValueError):
+        return 0
+    # BGZF tell() is a virtual offset: compressed block start in the upper 48 bits
+    return offset >> 16 if vcf.compression == 'BGZF' else offset
+
+
+def scan_vcf(vcf, on_progress=None, on_partial=None, progress_every: int = 10000,
+             partial_every: int = 200000) -> RegionIndex:
+    """
+    Read every record of an open pysam.VariantFile into a RegionIndex.
+
+    on_progress(records_scanned=, current_contig=, bytes_read=) is called every
+    progress_every records and on_partial(index) with a snapshot of what has been
+    read so far every partial_every records, so callers can serve partial results.
+    """
+    builder = RegionIndexBuilder()
+    for rec in vcf.fetch():
+        builder.add_record(rec)
+        n = len(builder)
+        if n % progress_every == 0:
+            # print progress every 100k records
+            if n % 100000 == 0:
+                print(f"  Loaded {n:,} regions...")
+            if on_progress is not None:
+                on_progress(records_scanned=n, current_contig=rec.chrom, bytes_read=compressed_offset(vcf))
+            if on_partial is not None and n % partial_every == 0:
+                on_partial(builder.build())
+    return builder.build()
+
+
+def concat_indexes(parts: List[RegionIndex]) -> RegionIndex:
+    """Concatenate indexes built from consecutive parts of a file, remapping the categorical codes"""
+    chrom_lookup: Dict[str, int] = {}
+    genotype_lookup: Dict[str, int] = {}
+    chroms: List[str] = []
+    genotypes: List[str] = []
+    chrom_codes, genotype_codes, id_offsets = [], [], [np.zeros(1, dtype=np.int64)]
+    blob_len = 0
+    for part in parts:
+        chrom_map = np.array([chrom_lookup.setdefault(c, len(chrom_lookup)) for c in part.chroms], dtype=np.int16)
+        genotype_map = np.array([genotype_lookup.setdefault(g, len(genotype_lookup)) for g in part.genotypes], dtype=np.int16)
+        chrom_codes.append(chrom_map[part.chrom_codes] if len(part) else part.chrom_codes)
+        genotype_codes.append(genotype_map[part.genotype_codes] if len(part) else part.genotype_codes)
+        id_offsets.append(part.id_offsets[1:] + blob_len)
+        blob_len += int(part.id_offsets[-1])
+    chroms = list(chrom_lookup)
+    genotypes = list(genotype_lookup)
+
+    def cat(name, dtype):
+        cols = [getattr(p, name) for p in parts]
+        return np.concatenate(cols).astype(dtype, copy=False) if cols else np.zeros(0, dtype=dtype)
+
+    return RegionIndex(
+        chroms=chroms,
+        chrom_codes=np.concatenate(chrom_codes).astype(np.int16, copy=False) if parts else np.zeros(0, dtype=np.int16),
+        pos=cat('pos', np.int32),
+        stop=cat('stop', np.int32),
+        motif_size=cat('motif_size', np.int32),
+        cn_ref=cat('cn_ref', np.float32),
+        cn_h1=cat('cn_h1', np.float32),
+        cn_h2=cat('cn_h2', np.float32),
+        cn_max=cat('cn_max', np.float32),
+        genotypes=genotypes,
+        genotype_codes=np.concatenate(genotype_codes).astype(np.int16, copy=False) if parts else np.zeros(0, dtype=np.int16),
+        id_blob=cat('id_blob', np.uint8),
+        id_offsets=np.concatenate(id_offsets),
+        motif_length_counts=functools.reduce(
+            IntCounter.merge, (IntCounter.from_array(p.motif_length_counts) for p in parts), IntCounter()).to_array(),
+        allele_length_sketch=functools.reduce(
+            QuantileSketch.merge, (p.allele_lengths() for p in parts), QuantileSketch()).to_array(),
+        allele_length_stats=functools.reduce(
+            RunningStats.merge, (p.allele_length_summary() for p in parts), RunningStats()).to_array(),
+    )
+
+
+def plan_scan_chunks(vcf_path: str, window_bp: int = SCAN_WINDOW_BP) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Split an indexed VCF into (contig, start, end) pieces for a parallel scan, in file order.
+    Contigs longer than window_bp are cut into 0-based half-open coordinate windows.
+    Returns [] if the file has no tabix/CSI index (caller should fall back to a sequential scan).
+    """
+    vcf = pysam.VariantFile(vcf_path)
+    try:
+        if vcf.index is None:
+            return []
+        chunks = []
+        # the index only lists contigs that actually have records, in file order
+        for contig in vcf.index.keys():
+            length = vcf.header.contigs[contig].length if contig in vcf.header.contigs else None
+            if not length or length <= window_bp:
+                chunks.append((contig, None, None))
+                continue
+            for start in range(0, length, window_bp):
+                chunks.append((contig, start, min(start + window_bp, length)))
+        return chunks
+    except (ValueError, AttributeError):
+        return []
+    finally:
+        vcf.close()
+
+
+def scan_chunk(args) -> Tuple[RegionIndex, int]:
+    """
+    Worker for the parallel scan: build the index for one (vcf_path, contig, start, end) piece.
+    Returns the partial index and how many compressed bytes the piece covered.
+    """
+    vcf_path, contig, start, end = args
+    vcf = pysam.VariantFile(vcf_path)
+    builder = RegionIndexBuilder()
+    first_offset = None
+    records = vcf.fetch(contig, start, end) if contig is not None else vcf.fetch()
+    for rec in records:
+        # fetch() returns everything overlapping the window, records starting
+        # before it were already picked up by the previous window
+        if start is not None and rec.start < start:
+            continue
+        if first_offset is None:
+            first_offset = compressed_offset(vcf)
+        builder.add_record(rec)
+    bytes_read = compressed_offset(vcf) - first_offset if first_offset is not None else 0
+    vcf.close()
+    return builder.build(), max(0, bytes_read)
+
+
+def scan_vcf_parallel(vcf_path: str, chunks: List[Tuple[str, Optional[int], Optional[int]]], executor,
+                      on_progress=None, on_partial=None, partial_interval: float = 2.0) -> RegionIndex:
+    """
+    Scan the planned chunks on a process pool and stitch the pieces back together in file order.
+    Progress is reported per finished chunk (same keywords as scan_vcf plus units_done/units_total),
+    and a merged snapshot of the finished chunks is published at most every partial_interval seconds.
+    """
+    parts: List[Optional[RegionIndex]] = [None] * len(chunks)
+    records = bytes_read = done = 0
+    last_publish = time.time()
+    future_to_chunk = {executor.submit(scan_chunk, (vcf_path,) + tuple(chunk)): i for i, chunk in enumerate(chunks)}
+    for future in as_completed(future_to_chunk):
+        i = future_to_chunk[future]
+        parts[i], chunk_bytes = future.result()
+        records += len(parts[i])
+        bytes_read += chunk_bytes
+        done += 1
+        if on_progress is not None:
+            on_progress(records_scanned=records, current_contig=chunks[i][0], bytes_read=bytes_read,
+                        units_done=done, units_total=len(chunks))
+        if on_partial is not None and done < len(chunks) and time.time() - last_publish >= partial_interval:
+            on_partial(concat_indexes([p for p in parts if p is not None]))
+            last_publish = time.time()
+    return concat_indexes(parts)
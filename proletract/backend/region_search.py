@@ -0,0 +1,246 @@
+"""
+Server-side region search for the autocomplete boxes.
+
+Instead of sending every region string of a file or cohort to the browser,
+the frontend sends what the user typed and gets the top matches back:
+
+    chr4:31          regions on chr4 whose start position begins with 31
+    chr4:3100-3200   regions on chr4 overlapping that range
+    chr4             the first regions of the contigs starting with chr4
+    HTT, TR_0001...  pathogenic catalog genes (passed in by the caller) and
+                     TandemTwister record IDs, by prefix
+
+Everything is a binary search over rows sorted by (contig, position) or over
+the sorted record IDs, so a query costs O(log n + k).
+"""
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from proletract.backend.region_index import chrom_sort_key, parse_region
+
+DEFAULT_RESULTS = 20
+# hard cap on results per query, keeps responses small whatever the client asks for
+MAX_RESULTS = 200
+# positions fit in int32, so a prefix can be followed by at most this many more digits
+_MAX_POS_DIGITS = 10
+
+_POSITION_QUERY = re.compile(r'^([^:\s]+):([\d,]*)(?:-([\d,]*))?$')
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if limit is None or limit <= 0:
+        return DEFAULT_RESULTS
+    return min(limit, MAX_RESULTS)
+
+
+class RegionSearch:
+    """Sorted per-contig coordinate index and (optional) sorted record-ID index over a set of regions"""
+
+    def __init__(self, chroms: List[str], chrom_codes: np.ndarray, pos: np.ndarray, stop: np.ndarray,
+                 id_blob: Optional[np.ndarray] = None, id_offsets: Optional[np.ndarray] = None):
+        self.chroms = chroms
+        self.chrom_codes = chrom_codes
+        self.pos = pos
+        self.stop = stop
+        self.id_blob = id_blob
+        self.id_offsets = id_offsets
+
+        keys = (chrom_codes.astype(np.int64) << 32) | pos.astype(np.int64)
+        order = np.argsort(keys, kind='stable')
+        sorted_codes = chrom_codes[order]
+        # contig -> (rows sorted by start, their starts, longest region) for range lookups
+        self._contigs: Dict[str, Tuple[np.ndarray, np.ndarray, int]] = {}
+        for code, chrom in enumerate(chroms):
+            lo = np.searchsorted(sorted_codes, code, side='left')
+            hi = np.searchsorted(sorted_codes, code, side='right')
+            if hi > lo:
+                rows = order[lo:hi]
+                self._contigs[chrom] = (rows, pos[rows], int((stop[rows] - pos[rows]).max()))
+        self._contig_names = sorted(self._contigs, key=chrom_sort_key)
+
+        # sorted record IDs, built on the first ID query
+        self._ids: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._ids_lock = threading.Lock()
+
+    @classmethod
+    def from_index(cls, index) -> 'RegionSearch':
+        """Search over a loaded RegionIndex (coordinates and record IDs)"""
+        return cls(index.chroms, index.chrom_codes, index.pos, index.stop, index.id_blob, index.id_offsets)
+
+    @classmethod
+    def from_regions(cls, regions: Sequence[str]) -> 'RegionSearch':
+        """Search over plain 'chrom:start-end' strings (cohort region lists, no IDs)"""
+        lookup: Dict[str, int] = {}
+        chroms: List[str] = []
+        codes, starts, stops = [], [], []
+        for region in regions:
+            parsed = parse_region(region)
+            if parsed is None:
+                continue
+            chrom, start, stop = parsed
+            if chrom not in lookup:
+                lookup[chrom] = len(chroms)
+                chroms.append(chrom)
+            codes.append(lookup[chrom])
+            starts.append(start)
+            stops.append(stop)
+        return cls(chroms, np.array(codes, dtype=np.int16), np.array(starts, dtype=np.int32),
+                   np.array(stops, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.pos)
+
+    def region(self, row: int) -> str:
+        return f"{self.chroms[self.chrom_codes[row]]}:{self.pos[row]}-{self.stop[row]}"
+
+    def record_id(self, row: int) -> Optional[str]:
+        if self.id_offsets is None:
+            return None
+        return bytes(self.id_blob[self.id_offsets[row]:self.id_offsets[row + 1]]).decode() or None
+
+    def _resolve_contig(self, name: str) -> Optional[str]:
+        """Contig as spelled in the file, accepting the name with or without the 'chr' prefix"""
+        for candidate in (name, name[3:] if name.lower().startswith('chr') else f'chr{name}'):
+            if candidate in self._contigs:
+                return candidate
+        return None
+
+    # --- lookups, each returns at most limit row numbers ---
+
+    def by_position_prefix(self, chrom: str, digits: str, limit: int) -> np.ndarray:
+        """Rows on chrom whose start, written out in decimal, begins with digits (in position order)"""
+        rows, starts, _ = self._contigs[chrom]
+        if not digits:
+            return rows[:limit]
+        if digits.startswith('0') or len(digits) > _MAX_POS_DIGITS:
+            return rows[:0]
+        # starts beginning with 31 are 31, 310-319, 3100-3199, ...: one sorted slice per length
+        prefix = int(digits)
+        hits = []
+        for extra in range(_MAX_POS_DIGITS - len(digits) + 1):
+            low = prefix * 10 ** extra
+            if low > starts[-1]:
+                break
+            lo = np.searchsorted(starts, low, side='left')
+            hi = np.searchsorted(starts, (prefix + 1) * 10 ** extra, side='left')
+            hits.append(rows[lo:min(hi, lo + limit)])
+        if not hits:
+            return rows[:0]
+        found = np.concatenate(hits)
+        return found[np.argsort(self.pos[found], kind='stable')][:limit]
+
+    def overlapping(self, chrom: str, start: int, end: int, limit: int) -> np.ndarray:
+        """Rows on chrom overlapping [start, end] (in position order)"""
+        rows, starts, longest = self._contigs[chrom]
+        lo = np.searchsorted(starts, start - longest, side='left')
+        hi = np.searchsorted(starts, end, side='right')
+        found = rows[lo:hi]
+        return found[self.stop[found] >= start][:limit]
+
+    def by_contig_prefix(self, text: str, limit: int) -> np.ndarray:
+        """First rows of the contigs whose name starts with text (exact contig first)"""
+        exact = self._resolve_contig(text)
+        names = [exact] if exact else []
+        lowered = text.lower()
+        names += [c for c in self._contig_names if c != exact and c.lower().startswith(lowered)]
+        found = []
+        remaining = limit
+        for name in names:
+            if remaining <= 0:
+                break
+            rows = self._contigs[name][0][:remaining]
+            found.append(rows)
+            remaining -= len(rows)
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+    def _sorted_ids(self) -> Tuple[np.ndarray, np.ndarray]:
+        with self._ids_lock:
+            if self._ids is None:
+                blob = bytes(self.id_blob)
+                bounds = self.id_offsets.tolist()
+                ids = np.array([blob[a:b] for a, b in zip(bounds[:-1], bounds[1:])], dtype=bytes)
+                order = np.argsort(ids, kind='stable')
+                self._ids = (ids[order], order)
+            return self._ids
+
+    def by_id_prefix(self, prefix: str, limit: int) -> np.ndarray:
+        """Rows whose record ID starts with prefix (in ID order)"""
+        if self.id_offsets is None or not prefix or len(self) == 0:
+            return np.zeros(0, dtype=np.int64)
+        ids, order = self._sorted_ids()
+        key = prefix.encode()
+        # keep the keys in the array's own fixed width, otherwise numpy recasts the whole array
+        if len(key) > ids.dtype.itemsize:
+            return order[:0]
+        lo = np.searchsorted(ids, np.array(key, dtype=ids.dtype), side='left')
+        if len(key) == ids.dtype.itemsize:
+            hi = np.searchsorted(ids, np.array(key, dtype=ids.dtype), side='right')
+        else:
+            hi = np.searchsorted(ids, np.array(key + b'\xff', dtype=ids.dtype), side='left')
+        return order[lo:min(hi, lo + limit)]
+
+    def rows_with_id(self, record_id: str) -> np.ndarray:
+        """Rows whose record ID is exactly record_id"""
+        if self.id_offsets is None or not record_id or len(self) == 0:
+            return np.zeros(0, dtype=np.int64)
+        ids, order = self._sorted_ids()
+        key = record_id.encode()
+        if len(key) > ids.dtype.itemsize:
+            return order[:0]
+        key = np.array(key, dtype=ids.dtype)
+        return order[np.searchsorted(ids, key, side='left'):np.searchsorted(ids, key, side='right')]
+
+    # --- combined query ---
+
+    def search(self, query: str, limit: int = DEFAULT_RESULTS,
+               genes: Sequence[Dict[str, Any]] = ()) -> List[Dict[str, Any]]:
+        """
+        Top matches for a partial query. genes are catalog entries (chrom/start/end/gene)
+        that matched the query by name; regions overlapping them are included.
+        """
+        query = query.strip()
+        limit = clamp_limit(limit)
+        if not query or len(self) == 0:
+            return []
+
+        results: List[Dict[str, Any]] = []
+        seen = set()
+
+        def add(rows, match, gene=None):
+            for row in rows:
+                row = int(row)
+                if len(results) >= limit:
+                    return
+                if row in seen:
+                    continue
+                seen.add(row)
+                hit = {'region': self.region(row), 'id': self.record_id(row), 'match': match}
+                if gene is not None:
+                    hit['gene'] = gene
+                results.append(hit)
+
+        # coordinates: contig:start prefix or contig:start-end range
+        position = _POSITION_QUERY.match(query)
+        chrom = self._resolve_contig(position.group(1)) if position else None
+        if chrom is not None:
+            start_digits = position.group(2).replace(',', '')
+            end_digits = (position.group(3) or '').replace(',', '')
+            if position.group(3) is not None and start_digits and end_digits:
+                start, end = int(start_digits), int(end_digits)
+                add(self.overlapping(chrom, min(start, end), max(start, end), limit), 'range')
+            else:
+                add(self.by_position_prefix(chrom, start_digits, limit), 'position')
+
+        # TandemTwister IDs often look like coordinates too, so these fill up whatever is left
+        add(self.by_id_prefix(query, limit), 'id')
+        for entry in genes:
+            entry_chrom = self._resolve_contig(str(entry['chrom']))
+            if entry_chrom is not None:
+                add(self.overlapping(entry_chrom, int(entry['start']), int(entry['end']), limit), 'gene',
+                    gene=entry.get('gene'))
+        if ':' not in query:
+            add(self.by_contig_prefix(query, limit), 'contig')
+        return results
@@ -0,0 +1,68 @@
+"""
+Motif / interruption segments of an allele sequence, decoded on the server.
+
+TandemTwister writes where each motif copy sits in an allele as an SP string,
+"(1-3)_(4-6)_(10-12)", 1-based and inclusive, with the motif of each copy in
+MI ("0_0_1"). The browser used to re-run a regex over these strings for every
+track it drew. segment_sequence decodes them once, when the record is parsed,
+into flat integer arrays that are cached and sent with the record:
+
+    motifs         [start, end, motif id] per motif copy, 0-based inclusive
+    interruptions  [start, end] per run of sequence not covered by a motif
+
+in the order the browser drew them (an interruption before the motif it
+precedes, plus one after the last motif up to the end of the sequence).
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+_SPAN = re.compile(r'\((\d+)-(\d+)\)')
+# motif id of a span whose MI entry isn't a number
+UNKNOWN_MOTIF = -1
+
+
+def decode_spans(spans: Any) -> List[int]:
+    """Flat 0-based [start, end, ...] of an SP string"""
+    if not spans:
+        return []
+    if isinstance(spans, (tuple, list)):
+        spans = "_".join(str(x) for x in spans if x is not None)
+    out: List[int] = []
+    for m in _SPAN.finditer(str(spans)):
+        out.append(int(m.group(1)) - 1)
+        out.append(int(m.group(2)) - 1)
+    return out
+
+
+def _motif_id(value: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return UNKNOWN_MOTIF
+
+
+def segment_sequence(sequence: Optional[str], spans: Any, motif_ids: Sequence[str]) -> Dict[str, Any]:
+    """Segments of one allele (see the module docstring), plus its length and motif coverage in percent"""
+    length = len(sequence) if sequence and sequence != '.' else 0
+    bounds = decode_spans(spans)
+    motifs: List[int] = []
+    interruptions: List[int] = []
+    pointer = 0
+    covered = 0
+    for idx in range(len(bounds) // 2):
+        start, end = bounds[2 * idx], bounds[2 * idx + 1]
+        if start > pointer:
+            interruptions += (pointer, start - 1)
+        # a span without an MI entry is drawn as motif 0
+        motifs += (start, end, _motif_id(motif_ids[idx]) if idx < len(motif_ids) else 0)
+        covered += end - start + 1
+        pointer = end + 1
+    if pointer < length:
+        interruptions += (pointer, length - 1)
+    return {
+        'length': length,
+        'motifs': motifs,
+        'interruptions': interruptions,
+        # rounded half up like Math.round in the browser
+        'coverage': int(covered * 100 / length + 0.5) if length else 0,
+    }
@@ -0,0 +1,166 @@
+"""
+Persistent on-disk sidecar for the columnar region index.
+
+A ``.proletract`` file holds the RegionIndex columns of one VCF so that
+reopening a known file doesn't need a full pysam scan. Layout:
+
+    8 bytes   magic (b'PTRIDX01')
+    8 bytes   little-endian header length
+    N bytes   JSON header (format version, fingerprint, lookup tables, array table)
+    ...       raw column arrays, each starting on a 64-byte boundary
+              (offsets in the header are relative to the end of the header)
+
+The arrays are memory-mapped on load. The sidecar is only used when the
+fingerprint (path, size, mtime of the VCF and of its .tbi/.csi index) still
+matches, otherwise the file is rescanned and the sidecar rewritten.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from proletract.backend.region_index import RegionIndex
+
+MAGIC = b'PTRIDX01'
+# bump this whenever the RegionIndex columns change so old sidecars get rebuilt
+FORMAT_VERSION = 3
+SUFFIX = '.proletract'
+_ALIGN = 64
+
+
+def _stat_entry(path: Path) -> Dict[str, Any]:
+    st = path.stat()
+    return {'path': str(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def find_index_file(vcf_path: str) -> Optional[Path]:
+    """Return the tabix/CSI index next to the VCF, if there is one"""
+    for ext in ('.csi', '.tbi'):
+        candidate = Path(vcf_path + ext)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def file_fingerprint(vcf_path: str) -> Dict[str, Any]:
+    """Identity of a VCF on disk: resolved path, size and mtime of the file and its index"""
+    path = Path(vcf_path).resolve()
+    index_file = find_index_file(str(path))
+    return {
+        'version': FORMAT_VERSION,
+        'vcf': _stat_entry(path),
+        'index': _stat_entry(index_file) if index_file is not None else None,
+    }
+
+
+def _cache_dir() -> Path:
+    env_dir = os.environ.get("PROLETRACT_CACHE_DIR")
+    if env_dir:
+        return Path(env_dir)
+    return Path.home() / ".cache" / "proletract"
+
+
+def sidecar_candidates(vcf_path: str) -> List[Path]:
+    """
+    Places a sidecar may live, in order of preference: the cache dir when
+    PROLETRACT_CACHE_DIR is set, next to the VCF, then ~/.cache/proletract
+    (for read-only data folders).
+    """
+    path = Path(vcf_path).resolve()
+    digest = hashlib.sha1(str(path).encode()).hexdigest()[:16]
+    in_cache = _cache_dir() / f"{path.name}.{digest}{SUFFIX}"
+    next_to_vcf = path.with_name(path.name + SUFFIX)
+    if os.environ.get("PROLETRACT_CACHE_DIR"):
+        return [in_cache, next_to_vcf]
+    return [next_to_vcf, in_cache]
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _read_header(f):
+    """Return (header, data_start) or (None, 0) if this isn't a sidecar file"""
+    if f.read(len(MAGIC)) != MAGIC:
+        return None, 0
+    (header_len,) = struct.unpack('<Q', f.read(8))
+    header = json.loads(f.read(header_len).decode())
+    return header, _aligned(len(MAGIC) + 8 + header_len)
+
+
+def load_sidecar(vcf_path: str, fingerprint: Optional[Dict[str, Any]] = None) -> Optional[RegionIndex]:
+    """Memory-map the sidecar index for vcf_path, None if there is no valid one"""
+    if fingerprint is None:
+        fingerprint = file_fingerprint(vcf_path)
+    for candidate in sidecar_candidates(vcf_path):
+        if not candidate.exists():
+            continue
+        try:
+            with open(candidate, 'rb') as f:
+                header, data_start = _read_header(f)
+            if header is None or header.get('fingerprint') != fingerprint:
+                continue
+            mm = np.memmap(candidate, dtype=np.uint8, mode='r')
+            columns = {}
+            for name, meta in header['arrays'].items():
+                dtype = np.dtype(meta['dtype'])
+                start = data_start + meta['offset']
+                columns[name] = mm[start:start + dtype.itemsize * meta['length']].view(dtype)
+            index = RegionIndex.from_columns(header['chroms'], header['genotypes'], columns)
+            index.fingerprint = fingerprint
+            return index
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: ignoring unreadable sidecar {candidate}: {e}")
+            continue
+    return None
+
+
+def write_sidecar(vcf_path: str, index: RegionIndex, fingerprint: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+    """Write index to the first writable sidecar location, returns the path (None if nowhere was writable)"""
+    if fingerprint is None:
+        fingerprint = file_fingerprint(vcf_path)
+    columns = index.columns()
+
+    # lay out the arrays after the header, each one aligned for the memmap views
+    # (offsets are relative to the first aligned byte after the header)
+    arrays = {}
+    offset = 0
+    for name, col in columns.items():
+        arrays[name] = {'dtype': col.dtype.str, 'length': int(len(col)), 'offset': offset}
+        offset += _aligned(col.nbytes)
+    header = {
+        'fingerprint': fingerprint,
+        'chroms': index.chroms,
+        'genotypes': index.genotypes,
+        'arrays': arrays,
+    }
+    header_bytes = json.dumps(header).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    for target in sidecar_candidates(vcf_path):
+        tmp_path = None
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temp file and rename so readers never see a half-written sidecar
+            fd, tmp_path = tempfile.mkstemp(prefix=target.name, suffix='.tmp', dir=str(target.parent))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                f.write(struct.pack('<Q', len(header_bytes)))
+                f.write(header_bytes)
+                for name, col in columns.items():
+                    f.seek(data_start + arrays[name]['offset'])
+                    f.write(np.ascontiguousarray(col).tobytes())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+            return target
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            continue
+    print(f"Warning: could not write a sidecar index for {vcf_path}")
+    return None
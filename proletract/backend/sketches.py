@@ -0,0 +1,225 @@
+"""
+Fixed-memory streaming aggregates for the statistics.
+
+All of them can be filled record by record during a scan and merged
+exactly: merging the partial aggregates of the parallel chunk scans gives
+the same result as one sequential pass, in any order. Each one also
+round-trips through a flat numpy array so it can be stored in the sidecar.
+
+- IntCounter: exact counts of small non-negative integers (motif lengths)
+- QuantileSketch: log-bucketed histogram with bounded relative error
+  (DDSketch style), for quantiles of unbounded values like allele lengths
+- RunningStats: count/sum/min/max, for exact mean and max
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+class IntCounter:
+    """Dense counts of small non-negative integers (index = value)"""
+
+    def __init__(self, counts: Optional[np.ndarray] = None):
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self._pending: Dict[int, int] = {}
+
+    def add(self, value: int, count: int = 1):
+        # buffered in a dict, numpy per single increment is slow
+        self._pending[value] = self._pending.get(value, 0) + count
+
+    def _flush(self):
+        if not self._pending:
+            return
+        size = max(len(self.counts), max(self._pending) + 1)
+        counts = np.zeros(size, dtype=np.int64)
+        counts[:len(self.counts)] = self.counts
+        for value, count in self._pending.items():
+            counts[value] += count
+        self.counts = counts
+        self._pending = {}
+
+    def merge(self, other: 'IntCounter') -> 'IntCounter':
+        self._flush()
+        other._flush()
+        size = max(len(self.counts), len(other.counts))
+        counts = np.zeros(size, dtype=np.int64)
+        counts[:len(self.counts)] += self.counts
+        counts[:len(other.counts)] += other.counts
+        self.counts = counts
+        return self
+
+    def to_array(self) -> np.ndarray:
+        self._flush()
+        return self.counts
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'IntCounter':
+        return cls(np.array(array, dtype=np.int64))
+
+    def items(self) -> Dict[int, int]:
+        """{value: count} for the values that occur, ascending"""
+        self._flush()
+        return {int(v): int(self.counts[v]) for v in np.flatnonzero(self.counts)}
+
+    @property
+    def total(self) -> int:
+        self._flush()
+        return int(self.counts.sum())
+
+    def mean(self) -> float:
+        self._flush()
+        total = self.counts.sum()
+        return float(np.dot(np.arange(len(self.counts)), self.counts) / total) if total else 0.0
+
+    def max(self) -> int:
+        self._flush()
+        nonzero = np.flatnonzero(self.counts)
+        return int(nonzero[-1]) if len(nonzero) else 0
+
+
+class QuantileSketch:
+    """
+    Quantiles of non-negative values with relative error <= alpha. Value v > 0 goes
+    to bucket ceil(log_gamma(v)), gamma = (1 + alpha) / (1 - alpha); zeros are counted
+    apart. Memory is one counter per occupied bucket: a few hundred for anything from
+    1 bp to 1 Gb at the default 1%.
+    """
+
+    DEFAULT_ALPHA = 0.01
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA):
+        self.alpha = alpha
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+
+    def add(self, value: float, count: int = 1):
+        if value is None or value != value or value < 0:
+            return
+        if value == 0:
+            self.zero_count += count
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def add_many(self, values: np.ndarray):
+        """Vectorized add() for a batch of values"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[values >= 0]
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        if other.alpha != self.alpha:
+            raise ValueError("can only merge sketches with the same alpha")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.buckets.values())
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # midpoint of the bucket (gamma^(key-1), gamma^key] in relative terms
+                return 2 * math.exp(key * self._log_gamma) / (1 + (1 + self.alpha) / (1 - self.alpha))
+        return math.exp(max(self.buckets) * self._log_gamma)
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[str, Optional[float]]:
+        """{'p50': ..} for each q in qs"""
+        out = {}
+        for q in qs:
+            value = self.quantile(q)
+            out[f"p{int(round(q * 100))}"] = round(value, 2) if value is not None else None
+        return out
+
+    def to_array(self) -> np.ndarray:
+        """[alpha * 1e6, zero_count, min_key, counts from min_key up...] as int64"""
+        if not self.buckets:
+            return np.array([round(self.alpha * 1e6), self.zero_count, 0], dtype=np.int64)
+        lo, hi = min(self.buckets), max(self.buckets)
+        counts = np.zeros(hi - lo + 1, dtype=np.int64)
+        for key, count in self.buckets.items():
+            counts[key - lo] = count
+        return np.concatenate([np.array([round(self.alpha * 1e6), self.zero_count, lo], dtype=np.int64), counts])
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'QuantileSketch':
+        if len(array) < 3:
+            return cls()
+        sketch = cls(alpha=int(array[0]) / 1e6)
+        sketch.zero_count = int(array[1])
+        lo = int(array[2])
+        for offset in np.flatnonzero(array[3:]):
+            sketch.buckets[lo + int(offset)] = int(array[3 + offset])
+        return sketch
+
+
+class RunningStats:
+    """Exact count, sum, min and max"""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float):
+        if value is None or value != value:
+            return
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def add_many(self, values: np.ndarray):
+        """Vectorized add() for a batch of values"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            batch = RunningStats()
+            batch.count, batch.sum = len(values), float(values.sum())
+            batch.min, batch.max = float(values.min()), float(values.max())
+            self.merge(batch)
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        if other.count:
+            self.count += other.count
+            self.sum += other.sum
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_array(self) -> np.ndarray:
+        if not self.count:
+            return np.zeros(0, dtype=np.float64)
+        return np.array([self.count, self.sum, self.min, self.max], dtype=np.float64)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'RunningStats':
+        stats = cls()
+        if len(array) == 4:
+            stats.count = int(array[0])
+            stats.sum = float(array[1])
+            stats.min = float(array[2])
+            stats.max = float(array[3])
+        return stats
+
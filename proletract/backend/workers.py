@@ -0,0 +1,126 @@
+"""
+Application-lifetime worker processes for the CPU-bound work (cohort parsing,
+parallel VCF scans).
+
+Spawning a ProcessPoolExecutor per request costs a fork plus module imports
+per worker, which for a small cohort request is more than the parsing itself.
+The backend starts the workers when the app starts (see the lifespan handler
+in main.py), every endpoint submits to them, and they are shut down with the app.
+
+Each worker is its own single-process executor (a shard). Tasks about one file
+are always sent to the same shard, picked by crc32(path), so the VariantFile
+handles that worker keeps open (handles.variant_files, with the CSI/TBI index
+already loaded) get reused on the next region instead of every worker
+reopening every file. Tasks without a file go to the least busy shard.
+
+The number of workers comes from PROLETRACT_WORKERS (set by `proletract` from
+--workers), falling back to the number of CPUs.
+"""
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from proletract.backend import handles
+
+# open VCF handles each worker keeps (a cohort is spread over all workers),
+# can be overridden with PROLETRACT_WORKER_MAX_OPEN_VCFS
+WORKER_MAX_OPEN_FILES = int(os.environ.get("PROLETRACT_WORKER_MAX_OPEN_VCFS", "128"))
+
+
+def configured_workers() -> int:
+    """PROLETRACT_WORKERS if it is a positive integer, otherwise the number of CPUs"""
+    try:
+        workers = int(os.environ.get("PROLETRACT_WORKERS", ""))
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else multiprocessing.cpu_count()
+
+
+def _init_worker(max_open: int):
+    handles.variant_files.max_open = max_open
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+class WorkerPool:
+    """
+    max_workers single-process executors, created on start() (or first use). submit() has
+    the ProcessPoolExecutor signature, so the pool can be passed where an executor is expected.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_open_per_worker: int = WORKER_MAX_OPEN_FILES):
+        self.max_workers = max_workers or configured_workers()
+        self.max_open_per_worker = max_open_per_worker
+        self._shards: List[Optional[ProcessPoolExecutor]] = [None] * self.max_workers
+        # tasks submitted to each shard that haven't finished yet
+        self._pending = [0] * self.max_workers
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def start(self, warm: bool = True):
+        """Create the workers; with warm, fork them now instead of on the first request"""
+        futures = [self._submit_to(i, _warm_up) for i in range(self.max_workers)]
+        if warm:
+            for future in futures:
+                future.result()
+
+    def _shard(self, i: int) -> ProcessPoolExecutor:
+        # caller holds self._lock
+        shard = self._shards[i]
+        # a worker that died (OOM, segfault in htslib) breaks its executor for good
+        if shard is not None and getattr(shard, '_broken', False):
+            print(f"Worker {i} is broken, starting a new one")
+            shard.shutdown(wait=False, cancel_futures=True)
+            shard = None
+            self.restarts += 1
+        if shard is None:
+            shard = ProcessPoolExecutor(max_workers=1, initializer=_init_worker,
+                                        initargs=(self.max_open_per_worker,))
+            self._shards[i] = shard
+        return shard
+
+    def _submit_to(self, i: int, fn, *args) -> Future:
+        with self._lock:
+            future = self._shard(i).submit(fn, *args)
+            self._pending[i] += 1
+        future.add_done_callback(lambda _: self._finished(i))
+        return future
+
+    def _finished(self, i: int):
+        with self._lock:
+            self._pending[i] -= 1
+
+    def shard_for(self, path: str) -> int:
+        """Worker that handles tasks for this file"""
+        return zlib.crc32(str(path).encode()) % self.max_workers
+
+    def submit(self, fn, *args, affinity: Optional[str] = None) -> Future:
+        """Run fn(*args) on a worker: the file's own worker if affinity is a path, else the least busy one"""
+        if affinity is not None:
+            i = self.shard_for(affinity)
+        else:
+            with self._lock:
+                i = min(range(self.max_workers), key=self._pending.__getitem__)
+        return self._submit_to(i, fn, *args)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            shards, self._shards = self._shards, [None] * self.max_workers
+        for shard in shards:
+            if shard is not None:
+                shard.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'running': sum(shard is not None for shard in self._shards),
+                'pending': list(self._pending),
+                'max_open_per_worker': self.max_open_per_worker,
+                'restarts': self.restarts,
+            }
@@ -112,6 +112,7 @@ def check_dependencies():
         import fastapi
         import uvicorn
         import pysam
+        import numpy
     except ImportError as e:
         issues.append(f"Missing Python dependency: {e.name}")
     
@@ -32,6 +32,14 @@ const combinedPlotCache = new Map<string, {
 // Cache for parsed motif ranges
 const parsedRangeCache = new Map<string, Array<[number, number]>>();
 
+// motif/interruption segments the backend decodes from SP and MI (flat [start, end, motifId] and [start, end], 0-based)
+interface SegmentData {
+  length: number;
+  motifs: number[];
+  interruptions: number[];
+  coverage: number;
+}
+
 interface PopulationRecord {
   chr: string;
   pos: number;
@@ -56,6 +64,7 @@ interface PopulationRecord {
   original_sample_name?: string;
   base_sample_name?: string;
   haplotype?: string;
+  segments?: { h?: SegmentData; ref?: SegmentData; h1?: SegmentData; h2?: SegmentData };
 }
 
 type CohortMode = 'cohort-read' | 'cohort-assembly';
@@ -114,30 +123,34 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
   // Create sequences data from population records
   const sequencesData = useMemo(() => {
     if (!publicVcfFolder || Object.keys(populationRecords).length === 0) {
-      return { sequences: [], spanList: [], motifIdsList: [], sortedSamples: [] };
+      return { sequences: [], spanList: [], motifIdsList: [], segmentsList: [], sortedSamples: [] };
     }
 
     const sequences: Array<{ name: string; sequence: string }> = [];
     const spanList: string[] = [];
     const motifIdsList: string[][] = [];
+    // backend segments per sequence (undefined where the record has none, the span string is parsed then)
+    const segmentsList: Array<SegmentData | undefined> = [];
 
     // Extract reference from first available record (all records have the same ref_allele for the same region)
     // Priority: 1) record prop, 2) firstSampleRecord, 3) first loaded population record
-    let refData: { ref_allele: string; spans: string | string[]; motif_ids_ref: string[] } | null = null;
+    let refData: { ref_allele: string; spans: string | string[]; motif_ids_ref: string[]; segments?: SegmentData } | null = null;
     
     if (record && record.ref_allele) {
       // Use record prop if available
       refData = {
         ref_allele: record.ref_allele,
         spans: record.spans || [],
-        motif_ids_ref: record.motif_ids_ref || []
+        motif_ids_ref: record.motif_ids_ref || [],
+        segments: record.segments?.ref
       };
     } else if (firstSampleRecord && firstSampleRecord.ref_allele) {
       // Use first sample record from backend
       refData = {
         ref_allele: firstSampleRecord.ref_allele,
         spans: firstSampleRecord.spans || '',
-        motif_ids_ref: firstSampleRecord.motif_ids_ref || []
+        motif_ids_ref: firstSampleRecord.motif_ids_ref || [],
+        segments: firstSampleRecord.segments?.ref
       };
     } else {
       // Extract from first loaded population record
@@ -146,7 +159,8 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
         refData = {
           ref_allele: firstRecord.ref_allele,
           spans: firstRecord.spans || '',
-          motif_ids_ref: firstRecord.motif_ids_ref || []
+          motif_ids_ref: firstRecord.motif_ids_ref || [],
+          segments: firstRecord.segments?.ref
         };
       }
     }
@@ -157,6 +171,7 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
       const spansValue = Array.isArray(refData.spans) ? refData.spans[0] || '' : (refData.spans || '');
       spanList.push(spansValue);
       motifIdsList.push(refData.motif_ids_ref || []);
+      segmentsList.push(refData.segments);
     }
 
     // Process population samples - now using sample names from VCF headers
@@ -179,6 +194,7 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
         const spansValue = Array.isArray(popRecord.spans) ? popRecord.spans[0] || '' : (popRecord.spans || '');
         spanList.push(spansValue);
         motifIdsList.push(popRecord.motif_ids_h || []);
+        segmentsList.push(popRecord.segments?.h);
       } else if (recordAny.alt_allele1 !== undefined) {
         // Regular format - may have multiple haplotypes
         // #region agent log
@@ -191,6 +207,7 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
           sequences.push({ name: `${sampleName}_h1`, sequence: recordAny.alt_allele1 });
           spanList.push(Array.isArray(recordAny.spans) ? recordAny.spans[1] || '' : (recordAny.spans || ''));
           motifIdsList.push(recordAny.motif_ids_h1 || []);
+          segmentsList.push(popRecord.segments?.h1);
         }
         if (recordAny.alt_allele2 && recordAny.alt_allele2 !== '') {
           // #region agent log
@@ -199,6 +216,7 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
           sequences.push({ name: `${sampleName}_h2`, sequence: recordAny.alt_allele2 });
           spanList.push(Array.isArray(recordAny.spans) ? recordAny.spans[2] || '' : (recordAny.spans || ''));
           motifIdsList.push(recordAny.motif_ids_h2 || []);
+          segmentsList.push(popRecord.segments?.h2);
         }
       } else {
         // #region agent log
@@ -221,7 +239,7 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
       sortedSamples: sortedSamples.slice(0, 5)
     });
 
-    return { sequences, spanList, motifIdsList, sortedSamples };
+    return { sequences, spanList, motifIdsList, segmentsList, sortedSamples };
   }, [populationRecords, publicVcfFolder, record, firstSampleRecord]);
 
   // Genotype comparison data
@@ -507,7 +525,8 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
         // #endregion
         
         const response = await axios.get(url, {
-          params: { folder_path: publicVcfFolder, mode: mode }
+          // assembly cohorts: one diploid record per sample from its h1/h2 files
+          params: { folder_path: publicVcfFolder, mode: mode, paired: mode === 'cohort-assembly' }
         });
         
         const apiTime = Date.now() - apiStartTime;
@@ -602,7 +621,8 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
             params: { 
               folder_path: publicVcfFolder,
               sample_names: toLoad.join(','),
-              mode: mode
+              mode: mode,
+              paired: mode === 'cohort-assembly'
             }
           });
           // #region agent log
@@ -1234,11 +1254,13 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
                   // Reorder spanList and motifIdsList to match sorted sequences
                   const sortedFilteredSpanList: string[] = [];
                   const sortedFilteredMotifIdsList: string[][] = [];
+                  const sortedFilteredSegmentsList: Array<SegmentData | undefined> = [];
                   sortedFilteredSequences.forEach(seq => {
                     const originalIdx = sequencesData.sequences.findIndex(s => s.name === seq.name);
                     if (originalIdx >= 0) {
                       sortedFilteredSpanList.push(sequencesData.spanList[originalIdx] || '');
                       sortedFilteredMotifIdsList.push(sequencesData.motifIdsList[originalIdx] || []);
+                      sortedFilteredSegmentsList.push(sequencesData.segmentsList[originalIdx]);
                     }
                   });
                   
@@ -1276,6 +1298,7 @@ const CohortAnalysis: React.FC<CohortAnalysisProps> = ({ mode, region, publicVcf
                       sequences={sortedFilteredSequences}
                       spanList={sortedFilteredSpanList}
                       motifIdsList={sortedFilteredMotifIdsList}
+                      segmentsList={sortedFilteredSegmentsList}
                       sortedSamples={matchingSequenceNames}
                       pathogenicThreshold={pathogenicInfo?.pathogenic_threshold}
                     />
@@ -1602,6 +1625,17 @@ interface Record {
   supported_reads_h1: number;
   supported_reads_h2: number;
   id: string;
+  segments?: { ref?: SegmentData; h1?: SegmentData; h2?: SegmentData };
+}
+
+// 0-based inclusive motif ranges of a sequence, from the backend segments when present
+function motifRanges(span: string, segments?: SegmentData): Array<[number, number]> {
+  if (!segments) return parseMotifRange(span);
+  const ranges: Array<[number, number]> = [];
+  for (let m = 0; m < segments.motifs.length; m += 3) {
+    ranges.push([segments.motifs[m], segments.motifs[m + 1]]);
+  }
+  return ranges;
 }
 
 // Combined Stack Plot and Heatmap Component
@@ -1610,6 +1644,7 @@ interface CombinedStackHeatmapProps {
   sequences: Array<{ name: string; sequence: string }>;
   spanList: string[];
   motifIdsList: string[][];
+  segmentsList?: Array<SegmentData | undefined>;
   sortedSamples: string[];
   pathogenicThreshold?: number;
 }
@@ -1619,6 +1654,7 @@ const CombinedStackHeatmap: React.FC<CombinedStackHeatmapProps> = memo(({
   sequences, 
   spanList, 
   motifIdsList, 
+  segmentsList,
   sortedSamples,
   pathogenicThreshold
 }) => {
@@ -1673,7 +1709,8 @@ const CombinedStackHeatmap: React.FC<CombinedStackHeatmapProps> = memo(({
       const seq = sequences[seqIdx];
       const span = spanList[seqIdx] || '';
       const motifIds = motifIdsList[seqIdx] || [];
-      const ranges = parseMotifRange(span);
+      const segments = segmentsList ? segmentsList[seqIdx] : undefined;
+      const ranges = motifRanges(span, segments);
       
       if (ranges.length === 0 && (!seq.sequence || seq.sequence.length === 0)) {
         stackData.push({
@@ -1702,7 +1739,7 @@ const CombinedStackHeatmap: React.FC<CombinedStackHeatmapProps> = memo(({
           });
         }
         
-        const motifId = parseInt(motifIds[rangeIdx] || '0');
+        const motifId = segments ? segments.motifs[rangeIdx * 3 + 2] : parseInt(motifIds[rangeIdx] || '0');
         const motifName = (record.motifs && record.motifs.length > 0 && record.motifs[motifId]) 
           ? record.motifs[motifId] 
           : 'Unknown';
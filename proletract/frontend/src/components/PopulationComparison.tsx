@@ -746,6 +746,7 @@ const PopulationComparison: React.FC<PopulationComparisonProps> = ({ record, reg
           pos={record.pos}
           stop={record.stop}
           region={region}
+          folderPath={publicVcfFolder}
           currentAlleles={currentAlleles}
         />
       )}
@@ -24,6 +24,7 @@ interface PopulationFrequencyPanelProps {
   pos: number;
   stop: number;
   region: string;
+  folderPath?: string;
   currentAlleles?: string[];
 }
 
@@ -32,6 +33,7 @@ const PopulationFrequencyPanel: React.FC<PopulationFrequencyPanelProps> = ({
   pos,
   stop,
   region,
+  folderPath,
   currentAlleles = [],
 }) => {
   const [frequencyData, setFrequencyData] = useState<PopulationFrequencyData | null>(null);
@@ -43,17 +45,18 @@ const PopulationFrequencyPanel: React.FC<PopulationFrequencyPanelProps> = ({
       setLoading(true);
       setError(null);
       try {
-        // This endpoint would need to be implemented in the backend
         const response = await axios.get(`${API_BASE}/api/population/frequency`, {
           params: {
             chr: chr,
             start: pos,
             end: stop,
+            folder_path: folderPath,
+            alleles: currentAlleles.join(','),
           },
         });
         setFrequencyData(response.data);
       } catch (err: any) {
-        // Silently fail if endpoint doesn't exist yet
+        // 404 means no cohort sample has this locus, just hide the panel
         if (err.response?.status !== 404) {
           console.error('Error fetching population frequency:', err);
           setError(err.response?.data?.detail || 'Failed to load population frequency data');
@@ -64,10 +67,11 @@ const PopulationFrequencyPanel: React.FC<PopulationFrequencyPanelProps> = ({
       }
     };
 
-    if (chr && pos && stop) {
+    if (chr && pos && stop && folderPath) {
       fetchFrequencyData();
     }
-  }, [chr, pos, stop]);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [chr, pos, stop, folderPath, currentAlleles.join(',')]);
 
   const maxFrequency = useMemo(() => {
     if (!frequencyData) return 0;
@@ -8,6 +8,14 @@ import RegionInfoCard from './RegionInfoCard';
 
 const API_BASE = process.env.REACT_APP_API_URL || 'http://localhost:8502';
 
+// motif/interruption segments the backend decodes from SP and MI (flat [start, end, motifId] and [start, end], 0-based)
+interface SegmentData {
+  length: number;
+  motifs: number[];
+  interruptions: number[];
+  coverage: number;
+}
+
 interface Record {
   chr: string;
   pos: number;
@@ -27,6 +35,7 @@ interface Record {
   supported_reads_h1: number;
   supported_reads_h2: number;
   id: string;
+  segments?: { ref?: SegmentData; h1?: SegmentData; h2?: SegmentData };
 }
 
 interface RegionVisualizationProps {
@@ -616,7 +625,28 @@ const parseMotifRange = (spans: string): Array<[number, number]> => {
   return ranges;
 };
 
-const calculateMotifCoverage = (sequence: string, spans: string): number => {
+type Segment = { start: number; end: number; type: 'motif' | 'interruption'; motifId?: number };
+
+// server segments in drawing order, each interruption comes right before the motif it precedes
+const segmentsFromData = (data: SegmentData): Segment[] => {
+  const segments: Segment[] = [];
+  const { motifs, interruptions } = data;
+  let i = 0;
+  for (let m = 0; m < motifs.length; m += 3) {
+    while (i < interruptions.length && interruptions[i] < motifs[m]) {
+      segments.push({ start: interruptions[i], end: interruptions[i + 1], type: 'interruption' });
+      i += 2;
+    }
+    segments.push({ start: motifs[m], end: motifs[m + 1], type: 'motif', motifId: motifs[m + 2] });
+  }
+  for (; i < interruptions.length; i += 2) {
+    segments.push({ start: interruptions[i], end: interruptions[i + 1], type: 'interruption' });
+  }
+  return segments;
+};
+
+const calculateMotifCoverage = (sequence: string, spans: string, segments?: SegmentData): number => {
+  if (segments) return segments.coverage;
   if (!sequence || !spans) return 0;
   const ranges = parseMotifRange(spans);
   let motifLength = 0;
@@ -643,6 +673,7 @@ interface SequenceTrackProps {
   sequence: string;
   motifIds: string[];
   spans: string;
+  segments?: SegmentData;
   label: string;
   metadata: SequenceMetadata;
   motifColors: { [key: number]: string };
@@ -657,6 +688,7 @@ const SequenceTrack: React.FC<SequenceTrackProps> = ({
   sequence,
   motifIds,
   spans,
+  segments: segmentData,
   label,
   metadata,
   motifColors,
@@ -683,21 +715,23 @@ const SequenceTrack: React.FC<SequenceTrackProps> = ({
     );
   }
 
-  const ranges = parseMotifRange(spans);
-  const segments: Array<{ start: number; end: number; type: 'motif' | 'interruption'; motifId?: number }> = [];
-  
-  let pointer = 0;
-  ranges.forEach(([start, end], idx) => {
-    if (start > pointer) {
-      segments.push({ start: pointer, end: start - 1, type: 'interruption' });
+  // use the backend's segments when the record has them, else parse the span string
+  const segments: Segment[] = segmentData ? segmentsFromData(segmentData) : [];
+  if (!segmentData) {
+    const ranges = parseMotifRange(spans);
+    let pointer = 0;
+    ranges.forEach(([start, end], idx) => {
+      if (start > pointer) {
+        segments.push({ start: pointer, end: start - 1, type: 'interruption' });
+      }
+      const motifId = idx < motifIds.length ? parseInt(motifIds[idx]) : 0;
+      segments.push({ start, end, type: 'motif', motifId });
+      pointer = end + 1;
+    });
+
+    if (pointer < sequence.length) {
+      segments.push({ start: pointer, end: sequence.length - 1, type: 'interruption' });
     }
-    const motifId = idx < motifIds.length ? parseInt(motifIds[idx]) : 0;
-    segments.push({ start, end, type: 'motif', motifId });
-    pointer = end + 1;
-  });
-  
-  if (pointer < sequence.length) {
-    segments.push({ start: pointer, end: sequence.length - 1, type: 'interruption' });
   }
 
   // Calculate scale markers (every 25% and endpoints)
@@ -929,20 +963,20 @@ const RegionDisplay: React.FC<RegionDisplayProps> = ({ record, pathogenicThresho
 
   const refMetadata: SequenceMetadata = {
     length: record.ref_allele?.length || 0,
-    motifCoverage: calculateMotifCoverage(record.ref_allele, record.spans[0] || ''),
+    motifCoverage: calculateMotifCoverage(record.ref_allele, record.spans[0] || '', record.segments?.ref),
     motifCount: calculateMotifCount(record.motif_ids_ref),
   };
 
   const h1Metadata: SequenceMetadata = {
     length: record.alt_allele1?.length || 0,
-    motifCoverage: calculateMotifCoverage(record.alt_allele1, record.spans[1] || ''),
+    motifCoverage: calculateMotifCoverage(record.alt_allele1, record.spans[1] || '', record.segments?.h1),
     motifCount: calculateMotifCount(record.motif_ids_h1),
     supportingReads: record.supported_reads_h1,
   };
 
   const h2Metadata: SequenceMetadata = {
     length: record.alt_allele2?.length || 0,
-    motifCoverage: calculateMotifCoverage(record.alt_allele2, record.spans[2] || ''),
+    motifCoverage: calculateMotifCoverage(record.alt_allele2, record.spans[2] || '', record.segments?.h2),
     motifCount: calculateMotifCount(record.motif_ids_h2),
     supportingReads: record.supported_reads_h2,
   };
@@ -1021,6 +1055,7 @@ const RegionDisplay: React.FC<RegionDisplayProps> = ({ record, pathogenicThresho
           sequence={record.ref_allele}
           motifIds={record.motif_ids_ref}
           spans={record.spans[0] || ''}
+          segments={record.segments?.ref}
           label="Reference"
           metadata={refMetadata}
           motifColors={motifColorMap}
@@ -1065,6 +1100,7 @@ const RegionDisplay: React.FC<RegionDisplayProps> = ({ record, pathogenicThresho
                 sequence={record.alt_allele1}
                 motifIds={record.motif_ids_h1}
                 spans={record.spans[1] || ''}
+                segments={record.segments?.h1}
                 label="Allele 1"
                 metadata={h1Metadata}
                 motifColors={motifColorMap}
@@ -1114,6 +1150,7 @@ const RegionDisplay: React.FC<RegionDisplayProps> = ({ record, pathogenicThresho
                 sequence={record.alt_allele2}
                 motifIds={record.motif_ids_h2}
                 spans={record.spans[2] || ''}
+                segments={record.segments?.h2}
                 label="Allele 2"
                 metadata={h2Metadata}
                 motifColors={motifColorMap}